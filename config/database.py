@@ -14,6 +14,29 @@ DB_CONFIG = {
     'charset': 'utf8mb4'
 }
 
+# 数据库连接池配置（DBUtils PooledDB）
+POOL_CONFIG = {
+    'mincached': 2,         # 启动时创建的空闲连接数（桌面客户端并发低，少量预热即可）
+    'maxcached': 10,        # 池中最多保留的空闲连接数
+    'maxconnections': 20,   # 允许的最大连接数（避免单个客户端占用过多服务器连接）
+    'blocking': True,       # 连接数达到上限时阻塞等待，而不是报错
+    'ping': 1,              # 从池中取出连接时检查连接是否可用
+    'reset': False          # 归还连接时只回滚未结束的显式事务（连接为自动提交模式）
+}
+
+# 多语句查询专用连接池配置（只供BaseDAO.multi_fetch使用，连接数很少）
+MULTI_STATEMENT_POOL_CONFIG = {
+    'mincached': 0,         # 首次多语句查询时才创建连接
+    'maxcached': 2,         # 池中最多保留的空闲连接数
+    'maxconnections': 4,    # 允许的最大连接数
+    'blocking': True,       # 连接数达到上限时阻塞等待，而不是报错
+    'ping': 1,              # 从池中取出连接时检查连接是否可用
+    'reset': False          # 只执行查询，归还时无需回滚
+}
+
+# 数据库连接必需的配置项（validate_config校验）
+REQUIRED_KEYS = ('host', 'port', 'user', 'password', 'database', 'charset')
+
 
 def get_db_config():
     """
@@ -25,6 +48,26 @@ def get_db_config():
     return DB_CONFIG.copy()
 
 
+def get_pool_config():
+    """
+    获取数据库连接池配置信息
+    
+    Returns:
+        dict: 连接池配置字典
+    """
+    return POOL_CONFIG.copy()
+
+
+def get_multi_statement_pool_config():
+    """
+    获取多语句查询专用连接池配置信息
+    
+    Returns:
+        dict: 连接池配置字典
+    """
+    return MULTI_STATEMENT_POOL_CONFIG.copy()
+
+
 def validate_config():
     """
     验证配置信息是否完整
@@ -35,9 +78,7 @@ def validate_config():
     Raises:
         ValueError: 配置项缺失时抛出异常
     """
-    required_keys = ['host', 'port', 'user', 'password', 'database', 'charset']
-    
-    for key in required_keys:
+    for key in REQUIRED_KEYS:
         if key not in DB_CONFIG:
             raise ValueError(f"数据库配置缺少必要项: {key}")
         if DB_CONFIG[key] is None or DB_CONFIG[key] == '':
@@ -2,29 +2,230 @@
 """
 DAO基类
 提供通用的数据库操作方法
+
+批量写入时优先把数据交给 execute_many / execute_batch，而不是在
+execute_transaction 的回调里逐行 cursor.execute：前者把同一条 INSERT
+合并为多行VALUES一次发送，后者每行一次网络往返。例如：
+
+    dao.execute_batch([
+        (sql_insert_record, [(...), (...)]),
+        (sql_update_inventory, [(...)]),
+    ])
+    
+跨方法、跨DAO的多步写入使用 transaction() 合并为一个事务，只在退出时提交一次：
+
+    with dao.transaction():
+        user_dao.update(user)
+        warehouse_dao.update(warehouse)
 """
 
-from typing import List, Dict, Any, Optional, Callable
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Callable, Iterator, Tuple
+import pymysql
 from dao.db_connection import DatabaseConnection
 from utils.logger import Logger
 
 logger = Logger.get_logger(__name__)
 
+# 单条批量INSERT语句的字节上限（与pymysql executemany拆分语句的阈值一致）
+_MAX_STMT_LENGTH = pymysql.cursors.Cursor.max_stmt_length
+
+# 可重试的事务错误：1205-锁等待超时，1213-死锁（InnoDB已回滚事务，整体重试即可）
+_RETRYABLE_ERROR_CODES = (1205, 1213)
+# 重试退避的初始等待秒数（每次重试翻倍）
+_RETRY_BACKOFF = 0.05
+
+# 编号序列（code_sequence表）：按前缀原子自增，LAST_INSERT_ID(expr)使新序号随语句结果返回（cursor.lastrowid）
+_SQL_INCREMENT_SEQUENCE = "UPDATE code_sequence SET next_val=LAST_INSERT_ID(next_val + %s) WHERE prefix=%s"
+# 前缀首次使用时插入初始序号；并发首次插入时后到者走ON DUPLICATE KEY分支继续自增
+_SQL_INIT_SEQUENCE = """
+    INSERT INTO code_sequence (prefix, next_val) VALUES (%s, LAST_INSERT_ID(%s))
+    ON DUPLICATE KEY UPDATE next_val=LAST_INSERT_ID(next_val + %s)
+"""
+
 
 class BaseDAO:
     """DAO基类"""
     
+    # 当前线程进行中的事务连接（所有DAO实例共享，见transaction）
+    _local = threading.local()
+    # 各DAO类的共享实例（见instance）
+    _instances: Dict[type, 'BaseDAO'] = {}
+    _instances_lock = threading.Lock()
+    
     def __init__(self):
         """初始化DAO"""
         self.db_connection = DatabaseConnection
     
-    def execute_query(self, sql: str, params: tuple = None) -> List[Dict[str, Any]]:
+    @classmethod
+    def instance(cls) -> 'BaseDAO':
+        """
+        获取该DAO类的共享实例（DAO不保存实例状态，各Service共用同一实例，不再各自构造）
+        
+        Returns:
+            BaseDAO: 调用类（如ProductDAO）的共享实例
+        """
+        dao = cls._instances.get(cls)
+        if dao is None:
+            with cls._instances_lock:
+                dao = cls._instances.get(cls)
+                if dao is None:
+                    dao = cls._instances[cls] = cls()
+        return dao
+    
+    @contextmanager
+    def transaction(self) -> Iterator[Any]:
+        """
+        工作单元事务上下文：块内所有DAO的操作复用同一连接，退出时统一提交一次，异常时回滚
+        
+        事务连接保存在线程局部变量中，块内调用任意DAO的方法都会自动加入该事务；
+        嵌套调用时加入外层事务，由最外层负责提交或回滚。
+        
+        Yields:
+            Connection: 事务使用的数据库连接（需要直接执行SQL时使用）
+            
+        Raises:
+            Exception: 块内抛出的异常在回滚后原样抛出
+        """
+        connection = self._active_connection()
+        if connection is not None:
+            yield connection
+            return
+        
+        connection = self.db_connection.get_connection()
+        BaseDAO._local.connection = connection
+        try:
+            connection.begin()
+            yield connection
+            connection.commit()
+        except BaseException:
+            try:
+                connection.rollback()
+            except Exception as e:
+                logger.error("事务回滚失败: %s", e)
+            raise
+        finally:
+            BaseDAO._local.connection = None
+            self.db_connection.close_connection(connection)
+    
+    def run_in_transaction(self, work: Callable[[Any], Any], retries: int = 3) -> Any:
+        """
+        在事务中执行work(cursor)，遇到死锁或锁等待超时时回滚并整体重试（指数退避）
+        
+        处于外层transaction中时直接加入外层事务且不重试（此时外层事务已被回滚，须由最外层处理）。
+        work中可以直接使用游标，也可以调用DAO方法：DAO包装后的异常以 raise ... from e 保留原始错误，
+        沿异常链判断是否为可重试的错误。
+        
+        Args:
+            work: 接收数据库游标的函数，须可安全地重复执行
+            retries: 最大重试次数
+            
+        Returns:
+            work的返回值
+            
+        Raises:
+            Exception: work抛出的异常，或重试次数用尽后的死锁/锁等待超时异常
+        """
+        nested = self._active_connection() is not None
+        attempt = 0
+        while True:
+            try:
+                with self.transaction() as connection, connection.cursor() as cursor:
+                    return work(cursor)
+            except Exception as e:
+                if nested or attempt >= retries or not self._is_retryable(e):
+                    raise
+                attempt += 1
+                logger.warning("事务锁冲突，第%s次重试: %s", attempt, e)
+                time.sleep(_RETRY_BACKOFF * 2 ** (attempt - 1))
+    
+    @staticmethod
+    def _is_retryable(error: BaseException) -> bool:
+        """
+        判断异常（含其异常链上的原始异常）是否为死锁或锁等待超时
+        
+        Args:
+            error: 捕获的异常
+            
+        Returns:
+            bool: 是否可以重试
+        """
+        while error is not None:
+            if isinstance(error, pymysql.err.OperationalError) and error.args \
+                    and error.args[0] in _RETRYABLE_ERROR_CODES:
+                return True
+            error = error.__cause__
+        return False
+    
+    @staticmethod
+    def _active_connection():
+        """
+        获取当前线程进行中的事务连接
+        
+        Returns:
+            Connection: 事务连接，不在事务中时返回None
+        """
+        return getattr(BaseDAO._local, 'connection', None)
+    
+    def _acquire_connection(self):
+        """
+        获取执行语句用的连接（处于transaction中时复用事务连接）
+        
+        Returns:
+            Connection: 数据库连接
+        """
+        connection = self._active_connection()
+        return connection if connection is not None else self.db_connection.get_connection()
+    
+    def _release_connection(self, connection):
+        """
+        归还连接（事务连接由transaction在退出时归还，这里不关闭）
+        
+        Args:
+            connection: 数据库连接
+        """
+        if connection is not self._active_connection():
+            self.db_connection.close_connection(connection)
+    
+    @staticmethod
+    def escape_like(keyword: str) -> str:
+        """
+        转义关键词中的LIKE通配符（\\、%、_），避免用户输入%或_导致全表匹配
+        
+        包含匹配的SQL在服务端拼接通配符：LIKE CONCAT('%%', %s, '%%')，参数传入本方法的返回值
+        
+        Args:
+            keyword: 搜索关键词
+            
+        Returns:
+            str: 转义后的关键词
+        """
+        return keyword.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    
+    @staticmethod
+    def like_prefix(keyword: str) -> str:
+        """
+        构造前缀匹配的LIKE参数（可使用该列上的B-tree索引做范围扫描）
+        
+        Args:
+            keyword: 搜索关键词
+            
+        Returns:
+            str: 形如 keyword% 的LIKE参数
+        """
+        return BaseDAO.escape_like(keyword) + '%'
+    
+    def execute_query(self, sql: str, params: tuple = None, cursorclass=None) -> List[Dict[str, Any]]:
         """
         执行查询操作
         
         Args:
             sql: SQL查询语句
             params: 查询参数
+            cursorclass: 游标类型（默认DictCursor，传入pymysql.cursors.Cursor时返回元组行）
             
         Returns:
             list: 查询结果列表
@@ -34,22 +235,64 @@ class BaseDAO:
         """
         connection = None
         try:
-            connection = self.db_connection.get_connection()
-            with connection.cursor() as cursor:
+            connection = self._acquire_connection()
+            with connection.cursor(cursorclass) as cursor:
                 cursor.execute(sql, params)
                 results = cursor.fetchall()
-                logger.debug(f"执行查询: {sql}, 参数: {params}, 结果数: {len(results)}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("执行查询: %s, 参数: %s, 结果数: %d", sql, params, len(results))
                 return results
         except Exception as e:
-            logger.error(f"查询执行失败: {sql}, 错误: {str(e)}")
-            raise Exception(f"查询执行失败: {str(e)}")
+            logger.error("查询执行失败: %s, 错误: %s", sql, e)
+            raise Exception(f"查询执行失败: {str(e)}") from e
         finally:
             if connection:
-                self.db_connection.close_connection(connection)
+                self._release_connection(connection)
+    
+    def execute_query_iter(self, sql: str, params: tuple = None,
+                           row_factory: Optional[Callable[[tuple], Any]] = None) -> Iterator[Any]:
+        """
+        以流式方式执行查询（服务端游标，逐行返回，不在内存中缓存整个结果集）
+        
+        注意：迭代器在遍历结束（或被关闭）前会一直占用一个数据库连接，
+        遍历期间不要在同一线程中长时间停顿；在transaction中使用时，遍历结束前
+        不能在该事务中执行其他语句。
+        
+        Args:
+            sql: SQL查询语句
+            params: 查询参数
+            row_factory: 行构造函数（如Model.from_row），传入时使用元组游标SSCursor
+            
+        Yields:
+            dict: 逐行返回的查询结果（传入row_factory时为其返回值）
+            
+        Raises:
+            Exception: 查询失败时抛出异常
+        """
+        connection = None
+        try:
+            connection = self._acquire_connection()
+            cursorclass = pymysql.cursors.SSCursor if row_factory else pymysql.cursors.SSDictCursor
+            with connection.cursor(cursorclass) as cursor:
+                cursor.execute(sql, params)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("执行流式查询: %s, 参数: %s", sql, params)
+                if row_factory:
+                    for row in cursor:
+                        yield row_factory(row)
+                else:
+                    for row in cursor:
+                        yield row
+        except Exception as e:
+            logger.error("查询执行失败: %s, 错误: %s", sql, e)
+            raise Exception(f"查询执行失败: {str(e)}") from e
+        finally:
+            if connection:
+                self._release_connection(connection)
     
     def execute_update(self, sql: str, params: tuple = None) -> int:
         """
-        执行更新操作（INSERT、UPDATE、DELETE）
+        执行更新操作（INSERT、UPDATE、DELETE，单条语句自动提交；处于transaction中时随事务提交）
         
         Args:
             sql: SQL更新语句
@@ -63,24 +306,321 @@ class BaseDAO:
         """
         connection = None
         try:
-            connection = self.db_connection.get_connection()
+            connection = self._acquire_connection()
             with connection.cursor() as cursor:
                 affected_rows = cursor.execute(sql, params)
-                connection.commit()
-                logger.info(f"执行更新: {sql}, 参数: {params}, 影响行数: {affected_rows}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("执行更新: %s, 参数: %s, 影响行数: %d", sql, params, affected_rows)
                 return affected_rows
         except Exception as e:
+            logger.error("更新执行失败: %s, 错误: %s", sql, e)
+            raise Exception(f"更新执行失败: {str(e)}") from e
+        finally:
+            if connection:
+                self._release_connection(connection)
+    
+    def execute_insert(self, sql: str, params: tuple = None) -> int:
+        """
+        执行单条插入操作（自动提交；处于transaction中时随事务提交）
+        
+        Args:
+            sql: SQL插入语句
+            params: 插入参数
+            
+        Returns:
+            int: 插入记录的自增ID
+            
+        Raises:
+            Exception: 插入失败时抛出异常
+        """
+        connection = None
+        try:
+            connection = self._acquire_connection()
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("执行插入: %s, 参数: %s, ID: %s", sql, params, cursor.lastrowid)
+                return cursor.lastrowid
+        except Exception as e:
+            logger.error("插入执行失败: %s, 错误: %s", sql, e)
+            raise Exception(f"插入执行失败: {str(e)}") from e
+        finally:
+            if connection:
+                self._release_connection(connection)
+    
+    def next_sequence(self, prefix: str, table: str, column: str, count: int = 1) -> int:
+        """
+        取指定前缀的下一个编号序号（code_sequence表原子自增，取号与自增在同一条语句中完成，
+        并发取号不会重复；处于transaction中时随事务提交）
+        
+        count大于1时一次预留count个连续序号，返回其中第一个。
+        
+        前缀首次取号时从table.column中该前缀已有编号的最大序号接续（兼容启用序列表之前生成的编号），
+        之后取号不再扫描业务表。
+        
+        Args:
+            prefix: 编号前缀（如RK20240101）
+            table: 编号所在的表名（由DAO传入的固定值，不接受用户输入）
+            column: 编号字段名（编号格式为 前缀 + 数字序号）
+            count: 预留的序号个数
+            
+        Returns:
+            int: 新序号（count大于1时为预留的第一个序号）
+            
+        Raises:
+            Exception: 取号失败时抛出异常
+        """
+        connection = None
+        try:
+            connection = self._acquire_connection()
+            with connection.cursor() as cursor:
+                if cursor.execute(_SQL_INCREMENT_SEQUENCE, (count, prefix)) == 0:
+                    cursor.execute(
+                        f"SELECT MAX(CAST(SUBSTRING({column}, %s) AS UNSIGNED)) AS max_sequence "
+                        f"FROM {table} WHERE {column} LIKE %s",
+                        (len(prefix) + 1, self.like_prefix(prefix))
+                    )
+                    result = cursor.fetchone()
+                    cursor.execute(_SQL_INIT_SEQUENCE,
+                                   (prefix, int(result['max_sequence'] or 0) + count, count))
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("取编号序号: 前缀=%s, 序号=%s, 个数=%s", prefix, cursor.lastrowid, count)
+                return cursor.lastrowid - count + 1
+        except Exception as e:
+            logger.error("取编号序号失败: 前缀=%s, 错误: %s", prefix, e)
+            raise Exception(f"取编号序号失败: {str(e)}") from e
+        finally:
             if connection:
+                self._release_connection(connection)
+    
+    def execute_many(self, sql: str, params_list: List[tuple], page_size: int = 1000) -> int:
+        """
+        批量执行更新操作（使用executemany，INSERT语句会被合并为多行VALUES）
+        
+        Args:
+            sql: SQL语句，批量插入时须为 INSERT ... VALUES (%s, ...) 形式且不带注释
+            params_list: 参数元组列表
+            page_size: 每批执行的行数，用于控制单条语句大小不超过max_allowed_packet
+            
+        Returns:
+            int: 受影响的行数
+            
+        Raises:
+            Exception: 执行失败时抛出异常（整批回滚）
+        """
+        return self.execute_batch([(sql, params_list)], page_size)
+    
+    def execute_insert_many(self, sql: str, params_list: List[tuple], page_size: int = 1000) -> List[int]:
+        """
+        批量插入并返回各行的自增ID（自行拼接多行VALUES，单个事务提交）
+        
+        每条语句的ID由其首个自增ID连续推算：依赖InnoDB为行数已知的简单INSERT分配连续ID。
+        语句按行数（page_size）和字节数（不超过max_stmt_length，约1MB）两个上限切分，
+        每条语句执行后立即读取lastrowid，长文本字段较多时同样得到正确的ID。
+        
+        Args:
+            sql: SQL语句，须为 INSERT ... VALUES (%s, ...) 形式且不带注释
+            params_list: 参数元组列表
+            page_size: 每条语句最多插入的行数
+            
+        Returns:
+            list: 与params_list顺序一致的自增ID列表
+            
+        Raises:
+            ValueError: SQL不是 INSERT ... VALUES (%s, ...) 形式时抛出异常
+            Exception: 执行失败时抛出异常（整批回滚；处于transaction中时由外层事务回滚）
+        """
+        if not params_list:
+            return []
+        
+        match = pymysql.cursors.RE_INSERT_VALUES.match(sql)
+        if not match:
+            raise ValueError("批量插入的SQL须为 INSERT ... VALUES (%s, ...) 形式")
+        prefix = match.group(1) % ()
+        values = match.group(2).rstrip()
+        postfix = match.group(3) or ''
+        base_length = len(prefix.encode('utf-8')) + len(postfix.encode('utf-8'))
+        
+        connection = None
+        owns_transaction = self._active_connection() is None
+        try:
+            connection = self._acquire_connection()
+            ids = []
+            if owns_transaction:
+                connection.begin()
+            with connection.cursor() as cursor:
+                rows = []
+                length = base_length
+                for params in params_list:
+                    row = cursor.mogrify(values, params)
+                    row_length = len(row.encode('utf-8')) + 1
+                    if rows and (len(rows) >= page_size or length + row_length > _MAX_STMT_LENGTH):
+                        ids.extend(self._insert_rows(cursor, prefix, rows, postfix))
+                        rows = []
+                        length = base_length
+                    rows.append(row)
+                    length += row_length
+                ids.extend(self._insert_rows(cursor, prefix, rows, postfix))
+            if owns_transaction:
+                connection.commit()
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("批量插入: %s, 记录数: %d", sql, len(params_list))
+            return ids
+        except Exception as e:
+            if connection and owns_transaction:
                 connection.rollback()
-            logger.error(f"更新执行失败: {sql}, 错误: {str(e)}")
-            raise Exception(f"更新执行失败: {str(e)}")
+            logger.error("批量插入失败: %s, 错误: %s", sql, e)
+            raise Exception(f"批量插入失败: {str(e)}") from e
+        finally:
+            if connection:
+                self._release_connection(connection)
+    
+    @staticmethod
+    def _insert_rows(cursor, prefix: str, rows: List[str], postfix: str) -> range:
+        """
+        执行一条多行INSERT并返回各行的自增ID（内部方法）
+        
+        Args:
+            cursor: 数据库游标
+            prefix: INSERT ... VALUES 部分
+            rows: 已转义的各行VALUES
+            postfix: VALUES之后的部分（如ON DUPLICATE KEY UPDATE）
+            
+        Returns:
+            range: 各行的自增ID
+        """
+        # 各行已转义，不再传参数，避免值中的%被再次格式化
+        cursor.execute(prefix + ','.join(rows) + postfix)
+        first_id = cursor.lastrowid
+        return range(first_id, first_id + len(rows))
+    
+    def multi_fetch(self, statements: List[Tuple[str, Optional[tuple]]], as_tuples: bool = False) -> List[List[Any]]:
+        """
+        一次网络往返执行多条相互独立的查询（多语句请求，依次读取各结果集）
+        
+        使用多语句专用连接池的连接执行，不加入进行中的transaction（只用于读取相互独立的数据）。
+        
+        Args:
+            statements: (SQL查询语句, 查询参数) 列表，SQL不能以分号结尾
+            as_tuples: 是否以元组返回各行（配合Model.from_rows使用；默认返回字典）
+            
+        Returns:
+            list: 与statements顺序一致的结果列表，每项为该查询的记录列表
+            
+        Raises:
+            Exception: 查询失败时抛出异常
+        """
+        if not statements:
+            return []
+        
+        connection = None
+        try:
+            connection = self.db_connection.get_multi_statement_connection()
+            with connection.cursor(pymysql.cursors.Cursor if as_tuples else None) as cursor:
+                sql = ';\n'.join(cursor.mogrify(sql, params) for sql, params in statements)
+                cursor.execute(sql)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("执行多语句查询: %s", sql)
+                results = [list(cursor.fetchall())]
+                while cursor.nextset():
+                    results.append(list(cursor.fetchall()))
+                return results
+        except Exception as e:
+            logger.error("多语句查询失败: 语句数=%s, 错误: %s", len(statements), e)
+            raise Exception(f"多语句查询失败: {str(e)}") from e
         finally:
             if connection:
                 self.db_connection.close_connection(connection)
     
+    def execute_batch(self, statements: List[Tuple[str, List[tuple]]], page_size: int = 1000) -> int:
+        """
+        在一个事务中批量执行多条语句（每条语句使用executemany），最后统一提交
+        
+        Args:
+            statements: (SQL语句, 参数元组列表) 组成的列表，按顺序执行
+            page_size: 每批执行的行数，用于控制单条语句大小不超过max_allowed_packet
+            
+        Returns:
+            int: 受影响的总行数
+            
+        Raises:
+            Exception: 执行失败时抛出异常（整批回滚）
+        """
+        statements = [(sql, params_list) for sql, params_list in statements if params_list]
+        if not statements:
+            return 0
+        
+        connection = None
+        owns_transaction = self._active_connection() is None
+        try:
+            connection = self._acquire_connection()
+            affected_rows = 0
+            if owns_transaction:
+                connection.begin()
+            with connection.cursor() as cursor:
+                for sql, params_list in statements:
+                    for start in range(0, len(params_list), page_size):
+                        affected_rows += cursor.executemany(sql, params_list[start:start + page_size])
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("批量执行: %s, 记录数: %d", sql, len(params_list))
+            if owns_transaction:
+                connection.commit()
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("批量执行完成，语句数: %d, 影响行数: %d", len(statements), affected_rows)
+            return affected_rows
+        except Exception as e:
+            if connection and owns_transaction:
+                connection.rollback()
+            logger.error("批量执行失败: %s", e)
+            raise Exception(f"批量执行失败: {str(e)}") from e
+        finally:
+            if connection:
+                self._release_connection(connection)
+    
+    def load_data_local(self, table: str, columns: List[str], file_path: str,
+                        line_terminator: str = '\r\n', ignore_lines: int = 1) -> int:
+        """
+        使用 LOAD DATA LOCAL INFILE 从本地CSV文件批量导入数据（适合一次性大批量导入）
+        
+        文件格式：UTF-8编码，逗号分隔，字段可用双引号包裹，空值写作 \\N。
+        使用单独的连接执行，不加入进行中的transaction。
+        
+        Args:
+            table: 表名（由DAO传入的固定值，不接受用户输入）
+            columns: 文件中各列对应的字段名（须为调用方校验过的字段）
+            file_path: 本地CSV文件路径
+            line_terminator: 行结束符（Excel/Windows导出的CSV为\\r\\n）
+            ignore_lines: 跳过的表头行数
+            
+        Returns:
+            int: 导入的行数
+            
+        Raises:
+            Exception: 导入失败时抛出异常
+        """
+        sql = (
+            f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} CHARACTER SET utf8mb4 "
+            f"FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' "
+            f"LINES TERMINATED BY %s IGNORE {int(ignore_lines)} LINES "
+            f"({', '.join(columns)})"
+        )
+        connection = None
+        try:
+            connection = self.db_connection.get_local_infile_connection()
+            with connection.cursor() as cursor:
+                affected_rows = cursor.execute(sql, (file_path, line_terminator))
+            logger.info("批量导入成功: 表=%s, 文件=%s, 行数=%s", table, file_path, affected_rows)
+            return affected_rows
+        except Exception as e:
+            logger.error("批量导入失败: 表=%s, 文件=%s, 错误: %s", table, file_path, e)
+            raise Exception(f"批量导入失败: {str(e)}") from e
+        finally:
+            if connection:
+                connection.close()
+    
     def execute_transaction(self, operations: List[Callable]) -> bool:
         """
-        执行事务操作
+        执行事务操作（回调方式，适合需要读取中间结果的逻辑；纯批量写入请使用execute_batch）
         
         Args:
             operations: 操作函数列表，每个函数接收connection参数
@@ -92,46 +632,59 @@ class BaseDAO:
             Exception: 事务执行失败时抛出异常
         """
         connection = None
+        owns_transaction = self._active_connection() is None
         try:
-            connection = self.db_connection.get_connection()
+            connection = self._acquire_connection()
+            if owns_transaction:
+                connection.begin()
             for operation in operations:
                 operation(connection)
-            connection.commit()
-            logger.info(f"事务执行成功，操作数: {len(operations)}")
+            if owns_transaction:
+                connection.commit()
+            logger.info("事务执行成功，操作数: %s", len(operations))
             return True
         except Exception as e:
-            if connection:
+            if connection and owns_transaction:
                 connection.rollback()
-            logger.error(f"事务执行失败: {str(e)}")
-            raise Exception(f"事务执行失败: {str(e)}")
+            logger.error("事务执行失败: %s", e)
+            raise Exception(f"事务执行失败: {str(e)}") from e
         finally:
             if connection:
-                self.db_connection.close_connection(connection)
+                self._release_connection(connection)
     
-    def fetch_one(self, sql: str, params: tuple = None) -> Optional[Dict[str, Any]]:
+    def fetch_one(self, sql: str, params: tuple = None,
+                  row_factory: Optional[Callable[[tuple], Any]] = None) -> Optional[Any]:
         """
         获取单条记录
         
         Args:
             sql: SQL查询语句
             params: 查询参数
+            row_factory: 行构造函数（如Model.from_row），传入时使用元组游标并返回构造结果
             
         Returns:
-            dict: 单条记录，如果不存在返回None
+            dict: 单条记录（传入row_factory时为其返回值），如果不存在返回None
         """
+        if row_factory:
+            results = self.execute_query(sql, params, pymysql.cursors.Cursor)
+            return row_factory(results[0]) if results else None
         results = self.execute_query(sql, params)
         return results[0] if results else None
     
-    def fetch_all(self, sql: str, params: tuple = None) -> List[Dict[str, Any]]:
+    def fetch_all(self, sql: str, params: tuple = None,
+                  row_factory: Optional[Callable[[tuple], Any]] = None) -> List[Any]:
         """
         获取多条记录
         
         Args:
             sql: SQL查询语句
             params: 查询参数
+            row_factory: 行构造函数（如Model.from_row），传入时使用元组游标并返回构造结果列表
             
         Returns:
             list: 记录列表
         """
+        if row_factory:
+            return [row_factory(row) for row in self.execute_query(sql, params, pymysql.cursors.Cursor)]
         return self.execute_query(sql, params)
 
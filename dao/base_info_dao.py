@@ -4,17 +4,52 @@
 实现base_info表的所有数据库操作
 """
 
-from typing import List, Optional
+import copy
+from typing import Dict, List, Optional, Iterable, Iterator
 from dao.base_dao import BaseDAO
 from model.base_info import BaseInfo
+from utils.cache import TTLCache
 from utils.logger import Logger
 
 logger = Logger.get_logger(__name__)
 
+# 依赖的索引（见 sql/init_database.sql）：
+#   base_info: PRIMARY(id) -> get_by_id / get_by_ids, idx_info_type_status(info_type, status) -> get_by_type
+#   product:   idx_category_id(category_id), idx_unit_id(unit_id) -> delete / check_reference
+
+# SQL语句常量（模块级复用，避免每次调用重复构造）
+_COLUMNS = ', '.join(BaseInfo.COLUMNS)
+_SQL_INSERT = """
+    INSERT INTO base_info (info_type, info_name, info_code, description, status)
+    VALUES (%s, %s, %s, %s, %s)
+"""
+_SQL_UPDATE = """
+    UPDATE base_info 
+    SET info_type=%s, info_name=%s, info_code=%s, description=%s, status=%s
+    WHERE id=%s
+"""
+_SQL_DELETE = """
+    DELETE FROM base_info WHERE id=%s
+        AND NOT EXISTS (SELECT 1 FROM product WHERE category_id=%s)
+        AND NOT EXISTS (SELECT 1 FROM product WHERE unit_id=%s)
+"""
+_SQL_EXISTS = "SELECT 1 AS found FROM base_info WHERE id=%s LIMIT 1"
+_SQL_GET_BY_ID = f"SELECT {_COLUMNS} FROM base_info WHERE id=%s"
+_SQL_GET_BY_IDS = f"SELECT {_COLUMNS} FROM base_info WHERE id IN ({{placeholders}})"
+_SQL_GET_BY_TYPE = f"SELECT {_COLUMNS} FROM base_info WHERE info_type=%s AND status=1 ORDER BY id"
+_SQL_GET_ALL = f"SELECT {_COLUMNS} FROM base_info ORDER BY id"
+_SQL_CHECK_REFERENCE = """
+    SELECT EXISTS(SELECT 1 FROM product WHERE category_id=%s)
+        OR EXISTS(SELECT 1 FROM product WHERE unit_id=%s) AS referenced
+"""
+
 
 class BaseInfoDAO(BaseDAO):
     """基础信息DAO类"""
     
+    # 基础信息变更少、读取频繁，所有实例共享读缓存，写操作后清空
+    _cache = TTLCache(maxsize=512, ttl=60)
+    
     def insert(self, base_info: BaseInfo) -> int:
         """
         插入基础信息
@@ -25,10 +60,7 @@ class BaseInfoDAO(BaseDAO):
         Returns:
             int: 插入记录的ID
         """
-        sql = """
-            INSERT INTO base_info (info_type, info_name, info_code, description, status)
-            VALUES (%s, %s, %s, %s, %s)
-        """
+        sql = _SQL_INSERT
         params = (
             base_info.info_type,
             base_info.info_name,
@@ -37,23 +69,48 @@ class BaseInfoDAO(BaseDAO):
             base_info.status
         )
         
-        connection = None
         try:
-            connection = self.db_connection.get_connection()
-            with connection.cursor() as cursor:
-                cursor.execute(sql, params)
-                connection.commit()
-                base_info.id = cursor.lastrowid
-                logger.info(f"插入基础信息成功: ID={base_info.id}, info_name={base_info.info_name}")
-                return base_info.id
+            base_info.id = self.execute_insert(sql, params)
+            self._cache.clear()
+            logger.info("插入基础信息成功: ID=%s, info_name=%s", base_info.id, base_info.info_name)
+            return base_info.id
+        except Exception as e:
+            logger.error("插入基础信息失败: %s", e)
+            raise Exception(f"插入基础信息失败: {str(e)}") from e
+    
+    def insert_many(self, base_infos: List[BaseInfo]) -> int:
+        """
+        批量插入基础信息
+        
+        Args:
+            base_infos: 基础信息对象列表
+            
+        Returns:
+            int: 插入的记录数（插入成功后回填各对象的id）
+        """
+        sql = _SQL_INSERT
+        params_list = [
+            (
+                base_info.info_type,
+                base_info.info_name,
+                base_info.info_code,
+                base_info.description,
+                base_info.status
+            )
+            for base_info in base_infos
+        ]
+        
+        try:
+            ids = self.execute_insert_many(sql, params_list)
+            for base_info, id in zip(base_infos, ids):
+                base_info.id = id
+            count = len(ids)
+            self._cache.clear()
+            logger.info("批量插入基础信息成功: 记录数=%s", count)
+            return count
         except Exception as e:
-            if connection:
-                connection.rollback()
-            logger.error(f"插入基础信息失败: {str(e)}")
-            raise Exception(f"插入基础信息失败: {str(e)}")
-        finally:
-            if connection:
-                self.db_connection.close_connection(connection)
+            logger.error("批量插入基础信息失败: %s", e)
+            raise Exception(f"批量插入基础信息失败: {str(e)}") from e
     
     def update(self, base_info: BaseInfo) -> bool:
         """
@@ -65,11 +122,7 @@ class BaseInfoDAO(BaseDAO):
         Returns:
             bool: 是否更新成功
         """
-        sql = """
-            UPDATE base_info 
-            SET info_type=%s, info_name=%s, info_code=%s, description=%s, status=%s
-            WHERE id=%s
-        """
+        sql = _SQL_UPDATE
         params = (
             base_info.info_type,
             base_info.info_name,
@@ -81,36 +134,44 @@ class BaseInfoDAO(BaseDAO):
         
         try:
             affected_rows = self.execute_update(sql, params)
-            logger.info(f"更新基础信息成功: ID={base_info.id}")
+            self._cache.clear()
+            logger.info("更新基础信息成功: ID=%s", base_info.id)
             return affected_rows > 0
         except Exception as e:
-            logger.error(f"更新基础信息失败: {str(e)}")
+            logger.error("更新基础信息失败: %s", e)
             raise
     
     def delete(self, id: int) -> bool:
         """
-        删除基础信息（需要检查是否被引用）
+        删除基础信息（被引用时不删除，引用检查与删除在同一条语句中完成）
         
         Args:
             id: 基础信息ID
             
         Returns:
-            bool: 是否删除成功
+            bool: 是否删除成功（记录不存在时返回False）
+            
+        Raises:
+            Exception: 基础信息已被引用时抛出异常
         """
-        # 先检查是否被引用
-        if self.check_reference(id):
-            raise Exception("该基础信息已被其他表引用，无法删除")
-        
-        sql = "DELETE FROM base_info WHERE id=%s"
-        params = (id,)
+        sql = _SQL_DELETE
+        params = (id, id, id)
         
         try:
             affected_rows = self.execute_update(sql, params)
-            logger.info(f"删除基础信息成功: ID={id}")
-            return affected_rows > 0
         except Exception as e:
-            logger.error(f"删除基础信息失败: {str(e)}")
+            logger.error("删除基础信息失败: %s", e)
             raise
+        
+        if affected_rows > 0:
+            self._cache.clear()
+            logger.info("删除基础信息成功: ID=%s", id)
+            return True
+        
+        # 未删除任何行：记录仍存在说明被引用
+        if self.fetch_one(_SQL_EXISTS, (id,)):
+            raise Exception("该基础信息已被其他表引用，无法删除")
+        return False
     
     def get_by_id(self, id: int) -> Optional[BaseInfo]:
         """
@@ -122,14 +183,43 @@ class BaseInfoDAO(BaseDAO):
         Returns:
             BaseInfo: 基础信息对象，如果不存在返回None
         """
-        sql = "SELECT * FROM base_info WHERE id=%s"
-        params = (id,)
+        cache_key = ('id', id)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return copy.copy(cached)
         
-        result = self.fetch_one(sql, params)
-        if result:
-            return BaseInfo.from_dict(result)
+        base_info = self.fetch_one(_SQL_GET_BY_ID, (id,), BaseInfo.from_row)
+        if base_info:
+            self._cache.set(cache_key, base_info)
+            return copy.copy(base_info)
         return None
     
+    def get_by_ids(self, ids: Iterable[int]) -> Dict[int, BaseInfo]:
+        """
+        根据ID批量查询（缓存未命中的ID合并为一次IN查询）
+        
+        Args:
+            ids: 基础信息ID集合（重复ID只查询一次）
+            
+        Returns:
+            dict: 基础信息ID -> 基础信息对象（不存在的ID不出现在结果中）
+        """
+        result = {}
+        missing = []
+        for id in set(ids):
+            cached = self._cache.get(('id', id))
+            if cached is not None:
+                result[id] = copy.copy(cached)
+            else:
+                missing.append(id)
+        
+        if missing:
+            sql = _SQL_GET_BY_IDS.format(placeholders=', '.join(['%s'] * len(missing)))
+            for base_info in self.fetch_all(sql, tuple(missing), BaseInfo.from_row):
+                self._cache.set(('id', base_info.id), base_info)
+                result[base_info.id] = copy.copy(base_info)
+        return result
+    
     def get_by_type(self, info_type: str) -> List[BaseInfo]:
         """
         根据类型查询
@@ -140,11 +230,15 @@ class BaseInfoDAO(BaseDAO):
         Returns:
             list: 基础信息对象列表
         """
-        sql = "SELECT * FROM base_info WHERE info_type=%s AND status=1 ORDER BY id"
-        params = (info_type,)
-        
-        results = self.fetch_all(sql, params)
-        return [BaseInfo.from_dict(row) for row in results]
+        cache_key = ('type', info_type)
+        cached = self._cache.get(cache_key)
+        if cached is None:
+            sql = _SQL_GET_BY_TYPE
+            params = (info_type,)
+            
+            cached = self.fetch_all(sql, params, BaseInfo.from_row)
+            self._cache.set(cache_key, cached)
+        return [copy.copy(base_info) for base_info in cached]
     
     def get_all(self) -> List[BaseInfo]:
         """
@@ -153,9 +247,19 @@ class BaseInfoDAO(BaseDAO):
         Returns:
             list: 基础信息对象列表
         """
-        sql = "SELECT * FROM base_info ORDER BY id"
-        results = self.fetch_all(sql)
-        return [BaseInfo.from_dict(row) for row in results]
+        return list(self.iter_all())
+    
+    def iter_all(self) -> Iterator[BaseInfo]:
+        """
+        流式查询所有记录（逐条返回，适合大数据量遍历）
+        
+        注意：遍历结束前会一直占用一个数据库连接
+        
+        Yields:
+            BaseInfo: 基础信息对象
+        """
+        sql = _SQL_GET_ALL
+        yield from self.execute_query_iter(sql, row_factory=BaseInfo.from_row)
     
     def check_reference(self, id: int) -> bool:
         """
@@ -167,13 +271,10 @@ class BaseInfoDAO(BaseDAO):
         Returns:
             bool: 是否被引用
         """
-        # 检查是否被product表的category_id或unit_id引用
-        sql = """
-            SELECT COUNT(*) as count FROM product 
-            WHERE category_id=%s OR unit_id=%s
-        """
+        # 检查是否被product表的category_id或unit_id引用（EXISTS命中第一条即返回）
+        sql = _SQL_CHECK_REFERENCE
         params = (id, id)
         
         result = self.fetch_one(sql, params)
-        return result['count'] > 0 if result else False
+        return bool(result['referenced']) if result else False
 
@@ -1,11 +1,15 @@
 # -*- coding: utf-8 -*-
 """
 数据库连接工具
-封装PyMySQL数据库连接操作
+封装PyMySQL数据库连接操作（基于DBUtils连接池）
 """
 
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import pymysql
-from config.database import get_db_config, validate_config
+from pymysql.constants import CLIENT
+from dbutils.pooled_db import PooledDB
+from config.database import get_db_config, get_pool_config, get_multi_statement_pool_config, validate_config
 from utils.logger import Logger
 
 logger = Logger.get_logger(__name__)
@@ -14,13 +18,171 @@ logger = Logger.get_logger(__name__)
 class DatabaseConnection:
     """数据库连接管理类"""
     
+    # 进程级共享的连接池，首次获取连接时创建
+    _pool = None
+    # 允许多语句请求的独立连接池（只供multi_fetch使用，普通连接不开启CLIENT.MULTI_STATEMENTS）
+    _multi_statement_pool = None
+    _pool_lock = threading.Lock()
+    
+    @classmethod
+    def _get_pool(cls) -> PooledDB:
+        """
+        获取连接池（不存在时创建）
+        
+        配置校验只在创建连接池时执行一次，之后获取连接不再重复校验和复制配置
+        
+        Returns:
+            PooledDB: 数据库连接池
+        """
+        if cls._pool is None:
+            with cls._pool_lock:
+                if cls._pool is None:
+                    cls._pool = cls._create_pool(get_pool_config())
+        return cls._pool
+    
+    @classmethod
+    def _get_multi_statement_pool(cls) -> PooledDB:
+        """
+        获取多语句查询专用连接池（不存在时创建）
+        
+        Returns:
+            PooledDB: 开启CLIENT.MULTI_STATEMENTS的连接池
+        """
+        if cls._multi_statement_pool is None:
+            with cls._pool_lock:
+                if cls._multi_statement_pool is None:
+                    cls._multi_statement_pool = cls._create_pool(get_multi_statement_pool_config(),
+                                                                 client_flag=CLIENT.MULTI_STATEMENTS)
+        return cls._multi_statement_pool
+    
+    @staticmethod
+    def _create_pool(pool_config: dict, client_flag: int = 0) -> PooledDB:
+        """
+        按数据库配置创建连接池（校验配置）
+        
+        Args:
+            pool_config: 连接池配置
+            client_flag: 连接的客户端标志（如CLIENT.MULTI_STATEMENTS）
+            
+        Returns:
+            PooledDB: 数据库连接池
+        """
+        validate_config()
+        config = get_db_config()
+        
+        pool = PooledDB(
+            creator=pymysql,
+            host=config['host'],
+            port=config['port'],
+            user=config['user'],
+            password=config['password'],
+            database=config['database'],
+            charset=config['charset'],
+            cursorclass=pymysql.cursors.DictCursor,
+            autocommit=True,
+            client_flag=client_flag,
+            **pool_config
+        )
+        logger.info("数据库连接池创建成功: %s:%s/%s", config['host'], config['port'], config['database'])
+        return pool
+    
+    @classmethod
+    def init_pool(cls) -> PooledDB:
+        """
+        显式创建连接池（程序启动时调用，把建立连接的开销前移到初始化阶段）
+        
+        Returns:
+            PooledDB: 数据库连接池
+            
+        Raises:
+            Exception: 创建失败时抛出异常
+        """
+        try:
+            return cls._get_pool()
+        except Exception as e:
+            logger.error("创建数据库连接池失败: %s", e)
+            raise Exception(f"创建数据库连接池失败: {str(e)}") from e
+    
+    @classmethod
+    def warm_pool(cls, n: int = 3) -> int:
+        """
+        预热连接池：并发借出n个连接各执行一次SELECT 1后归还，使首次界面查询直接使用已建立的连接
+        
+        Args:
+            n: 预热的连接数（不超过连接池的maxcached时全部保留在池中）
+            
+        Returns:
+            int: 预热成功的连接数
+        """
+        def borrow(_):
+            connection = cls.get_connection()
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            return connection
+        
+        connections = []
+        try:
+            # 先全部借出再统一归还，保证建立的是n个不同的连接
+            with ThreadPoolExecutor(max_workers=n) as executor:
+                futures = [executor.submit(borrow, i) for i in range(n)]
+                for future in futures:
+                    try:
+                        connections.append(future.result())
+                    except Exception as e:
+                        logger.warning("预热数据库连接失败: %s", e)
+        finally:
+            for connection in connections:
+                cls.close_connection(connection)
+        logger.info("数据库连接池预热完成: %s/%s", len(connections), n)
+        return len(connections)
+    
     @staticmethod
     def get_connection():
         """
-        获取数据库连接对象
+        从连接池获取数据库连接对象
         
         Returns:
-            pymysql.Connection: 数据库连接对象
+            PooledDedicatedDBConnection: 数据库连接对象（调用close()归还连接池）
+            
+        Raises:
+            Exception: 连接失败时抛出异常
+        """
+        try:
+            return DatabaseConnection._get_pool().connection()
+        except Exception as e:
+            logger.error("数据库连接失败: %s", e)
+            raise Exception(f"数据库连接失败: {str(e)}") from e
+    
+    @staticmethod
+    def get_multi_statement_connection():
+        """
+        获取允许多语句请求的连接（来自独立的小连接池）
+        
+        仅用于BaseDAO.multi_fetch：多语句请求一旦遇到拼接SQL的缺陷即可被用来叠加执行任意语句，
+        因此不在主连接池的普通连接上开启。
+        
+        Returns:
+            PooledDedicatedDBConnection: 数据库连接对象（调用close()归还连接池）
+            
+        Raises:
+            Exception: 连接失败时抛出异常
+        """
+        try:
+            return DatabaseConnection._get_multi_statement_pool().connection()
+        except Exception as e:
+            logger.error("数据库连接失败: %s", e)
+            raise Exception(f"数据库连接失败: {str(e)}") from e
+    
+    @staticmethod
+    def get_local_infile_connection():
+        """
+        创建允许 LOAD DATA LOCAL INFILE 的独立连接（不经过连接池）
+        
+        仅用于批量导入：local_infile允许服务器读取客户端文件，因此不在连接池的普通连接上开启。
+        
+        Returns:
+            pymysql.connections.Connection: 数据库连接对象（使用完毕后调用close()关闭）
             
         Raises:
             Exception: 连接失败时抛出异常
@@ -28,8 +190,7 @@ class DatabaseConnection:
         try:
             validate_config()
             config = get_db_config()
-            
-            connection = pymysql.connect(
+            return pymysql.connect(
                 host=config['host'],
                 port=config['port'],
                 user=config['user'],
@@ -37,20 +198,17 @@ class DatabaseConnection:
                 database=config['database'],
                 charset=config['charset'],
                 cursorclass=pymysql.cursors.DictCursor,
-                autocommit=False
+                autocommit=True,
+                local_infile=True
             )
-            
-            logger.info(f"数据库连接成功: {config['host']}:{config['port']}/{config['database']}")
-            return connection
-            
         except Exception as e:
-            logger.error(f"数据库连接失败: {str(e)}")
-            raise Exception(f"数据库连接失败: {str(e)}")
+            logger.error("数据库连接失败: %s", e)
+            raise Exception(f"数据库连接失败: {str(e)}") from e
     
     @staticmethod
     def close_connection(connection):
         """
-        关闭数据库连接
+        归还数据库连接到连接池
         
         Args:
             connection: 数据库连接对象
@@ -58,9 +216,8 @@ class DatabaseConnection:
         if connection:
             try:
                 connection.close()
-                logger.info("数据库连接已关闭")
             except Exception as e:
-                logger.error(f"关闭数据库连接失败: {str(e)}")
+                logger.error("归还数据库连接失败: %s", e)
     
     @staticmethod
     def test_connection():
@@ -79,7 +236,7 @@ class DatabaseConnection:
                 logger.info("数据库连接测试成功")
                 return True
         except Exception as e:
-            logger.error(f"数据库连接测试失败: {str(e)}")
+            logger.error("数据库连接测试失败: %s", e)
             return False
         finally:
             if connection:
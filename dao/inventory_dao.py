@@ -4,18 +4,111 @@
 实现inventory表的所有数据库操作
 """
 
-from typing import List, Optional
+import copy
+from typing import Any, Dict, List, Optional, Iterator, Tuple
 from datetime import datetime
 from dao.base_dao import BaseDAO
 from model.inventory import Inventory
+from model.product import Product
+from utils.cache import TTLCache
 from utils.logger import Logger
 
 logger = Logger.get_logger(__name__)
 
+# 依赖的索引（见 sql/init_database.sql）：
+#   inventory: PRIMARY(id), uk_warehouse_product(warehouse_id, product_id) -> 按仓库+货品查询 / 入库UPSERT / 出库扣减,
+#              idx_product_id_inv(product_id) -> get_by_product
+#   product:   PRIMARY(id) -> 库存预警联表查询
+
+# SQL语句常量（模块级复用，避免每次调用重复构造）
+_COLUMNS = ', '.join(Inventory.COLUMNS)
+_SQL_INSERT = """
+    INSERT INTO inventory (warehouse_id, product_id, quantity, last_in_date, last_out_date)
+    VALUES (%s, %s, %s, %s, %s)
+"""
+# 出库扣减未命中时查询原因：加锁读取当前数量，与失败的条件UPDATE看到同一版本
+_SQL_CHECK_QUANTITY = "SELECT id, quantity FROM inventory WHERE warehouse_id=%s AND product_id=%s FOR UPDATE"
+_SQL_UPSERT_IN = """
+    INSERT INTO inventory (warehouse_id, product_id, quantity, last_in_date)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE quantity=quantity+VALUES(quantity), last_in_date=VALUES(last_in_date),
+                            version=version+1
+"""
+_SQL_DECREASE_OUT = """
+    UPDATE inventory 
+    SET quantity=quantity-%s, last_out_date=%s, version=version+1 
+    WHERE warehouse_id=%s AND product_id=%s AND quantity>=%s
+"""
+_SQL_GET_BY_ID = f"SELECT {_COLUMNS} FROM inventory WHERE id=%s"
+_SQL_GET_BY_WAREHOUSE_PRODUCT = f"SELECT {_COLUMNS} FROM inventory WHERE warehouse_id=%s AND product_id=%s"
+_SQL_GET_BY_WAREHOUSE = f"SELECT {_COLUMNS} FROM inventory WHERE warehouse_id=%s ORDER BY product_id"
+_SQL_GET_BY_PRODUCT = f"SELECT {_COLUMNS} FROM inventory WHERE product_id=%s ORDER BY warehouse_id"
+_SQL_GET_ALL = f"SELECT {_COLUMNS} FROM inventory ORDER BY warehouse_id, product_id"
+_SQL_GET_PAGE = f"SELECT {_COLUMNS} FROM inventory WHERE id>%s ORDER BY id LIMIT %s"
+# 库存统计：一条聚合查询得到总数量、总价值、种类数和预警数（LEFT JOIN保留货品已不存在的库存数量）
+_SQL_GET_STATISTICS = """
+    SELECT COALESCE(SUM(i.quantity), 0) AS total_quantity,
+        COALESCE(SUM(i.quantity * p.price), 0) AS total_value,
+        COUNT(DISTINCT i.product_id) AS product_count,
+        COUNT(DISTINCT i.warehouse_id) AS warehouse_count,
+        COALESCE(SUM(i.quantity < p.min_stock), 0) AS low_stock_count,
+        COALESCE(SUM(p.max_stock > 0 AND i.quantity > p.max_stock), 0) AS over_stock_count
+    FROM inventory i LEFT JOIN product p ON p.id=i.product_id
+"""
+_SQL_GET_STATISTICS_BY_WAREHOUSE = _SQL_GET_STATISTICS + "    WHERE i.warehouse_id=%s\n"
+_SQL_GET_STATISTICS_BY_PRODUCT = _SQL_GET_STATISTICS + "    WHERE i.product_id=%s\n"
+# 分组统计：一次扫描得到每个仓库/货品的统计，替代逐个仓库/货品分别聚合
+_SQL_GET_STATISTICS_GROUP_BY_WAREHOUSE = (
+    _SQL_GET_STATISTICS.replace("SELECT ", "SELECT i.warehouse_id AS group_id, ", 1)
+    + "    GROUP BY i.warehouse_id\n")
+_SQL_GET_STATISTICS_GROUP_BY_PRODUCT = (
+    _SQL_GET_STATISTICS.replace("SELECT ", "SELECT i.product_id AS group_id, ", 1)
+    + "    GROUP BY i.product_id\n")
+# 库存预警：库存连同货品一次联表查出，在数据库端按库存上下限筛选，只返回命中的记录
+_INVENTORY_PRODUCT_COLUMNS = ', '.join(
+    [f'i.{column}' for column in Inventory.COLUMNS] + [f'p.{column}' for column in Product.COLUMNS])
+_SQL_GET_LOW_STOCK = f"""
+    SELECT 'low' AS warning_type, {_INVENTORY_PRODUCT_COLUMNS}
+    FROM inventory i JOIN product p ON p.id=i.product_id
+    WHERE i.quantity < p.min_stock
+    ORDER BY i.warehouse_id, i.product_id
+"""
+_SQL_GET_OVER_STOCK = f"""
+    SELECT 'over' AS warning_type, {_INVENTORY_PRODUCT_COLUMNS}
+    FROM inventory i JOIN product p ON p.id=i.product_id
+    WHERE p.max_stock > 0 AND i.quantity > p.max_stock
+    ORDER BY i.warehouse_id, i.product_id
+"""
+# 低库存优先于超库存（与InventoryService.check_stock_warning的判断顺序一致）
+_SQL_GET_STOCK_WARNINGS = f"""
+    SELECT IF(i.quantity < p.min_stock, 'low', 'over') AS warning_type, {_INVENTORY_PRODUCT_COLUMNS}
+    FROM inventory i JOIN product p ON p.id=i.product_id
+    WHERE i.quantity < p.min_stock OR (p.max_stock > 0 AND i.quantity > p.max_stock)
+    ORDER BY i.warehouse_id, i.product_id
+"""
+
+
+# CSV批量导入默认的列顺序
+_IMPORT_COLUMNS = ('warehouse_id', 'product_id', 'quantity', 'last_in_date', 'last_out_date')
+
 
 class InventoryDAO(BaseDAO):
     """库存DAO类"""
     
+    # (warehouse_id, product_id) -> 库存对象 的进程内读缓存，所有实例共享；
+    # 本进程内的库存变更会立即失效对应条目，短TTL用于限制其他客户端写入造成的过期
+    _cache = TTLCache(maxsize=4096, ttl=5)
+    
+    def invalidate(self, warehouse_id: int, product_id: int):
+        """
+        使指定仓库+货品的库存缓存失效（库存变更提交或回滚后调用）
+        
+        Args:
+            warehouse_id: 仓库ID
+            product_id: 货品ID
+        """
+        self._cache.pop((warehouse_id, product_id))
+    
     def insert(self, inventory: Inventory) -> int:
         """
         插入库存记录
@@ -26,10 +119,7 @@ class InventoryDAO(BaseDAO):
         Returns:
             int: 插入记录的ID
         """
-        sql = """
-            INSERT INTO inventory (warehouse_id, product_id, quantity, last_in_date, last_out_date)
-            VALUES (%s, %s, %s, %s, %s)
-        """
+        sql = _SQL_INSERT
         params = (
             inventory.warehouse_id,
             inventory.product_id,
@@ -38,23 +128,76 @@ class InventoryDAO(BaseDAO):
             inventory.last_out_date
         )
         
-        connection = None
         try:
-            connection = self.db_connection.get_connection()
-            with connection.cursor() as cursor:
-                cursor.execute(sql, params)
-                connection.commit()
-                inventory.id = cursor.lastrowid
-                logger.info(f"插入库存记录成功: ID={inventory.id}, warehouse_id={inventory.warehouse_id}, product_id={inventory.product_id}")
-                return inventory.id
+            inventory.id = self.execute_insert(sql, params)
+            self.invalidate(inventory.warehouse_id, inventory.product_id)
+            logger.info("插入库存记录成功: ID=%s, warehouse_id=%s, product_id=%s", inventory.id, inventory.warehouse_id, inventory.product_id)
+            return inventory.id
         except Exception as e:
-            if connection:
-                connection.rollback()
-            logger.error(f"插入库存记录失败: {str(e)}")
-            raise Exception(f"插入库存记录失败: {str(e)}")
-        finally:
-            if connection:
-                self.db_connection.close_connection(connection)
+            logger.error("插入库存记录失败: %s", e)
+            raise Exception(f"插入库存记录失败: {str(e)}") from e
+    
+    def insert_many(self, inventories: List[Inventory]) -> int:
+        """
+        批量插入库存记录
+        
+        Args:
+            inventories: 库存对象列表
+            
+        Returns:
+            int: 插入的记录数（插入成功后回填各对象的id）
+        """
+        sql = _SQL_INSERT
+        params_list = [
+            (
+                inventory.warehouse_id,
+                inventory.product_id,
+                inventory.quantity,
+                inventory.last_in_date,
+                inventory.last_out_date
+            )
+            for inventory in inventories
+        ]
+        
+        try:
+            ids = self.execute_insert_many(sql, params_list)
+            for inventory, id in zip(inventories, ids):
+                inventory.id = id
+            count = len(ids)
+            self._cache.clear()
+            logger.info("批量插入库存记录成功: 记录数=%s", count)
+            return count
+        except Exception as e:
+            logger.error("批量插入库存记录失败: %s", e)
+            raise Exception(f"批量插入库存记录失败: {str(e)}") from e
+    
+    def bulk_import_csv(self, file_path: str, columns: Optional[List[str]] = None) -> int:
+        """
+        从CSV文件批量导入库存记录（LOAD DATA LOCAL INFILE，适合初始迁移等大批量导入）
+        
+        Args:
+            file_path: 本地CSV文件路径（首行为表头）
+            columns: 文件中各列对应的字段名，默认按 _IMPORT_COLUMNS 顺序
+            
+        Returns:
+            int: 导入的记录数
+            
+        Raises:
+            ValueError: 字段名不属于inventory表时抛出异常
+        """
+        columns = list(columns or _IMPORT_COLUMNS)
+        invalid = [column for column in columns if column not in Inventory.COLUMNS]
+        if invalid:
+            raise ValueError(f"无效的字段名: {', '.join(invalid)}")
+        
+        try:
+            count = self.load_data_local('inventory', columns, file_path)
+            self._cache.clear()
+            logger.info("批量导入库存成功: 记录数=%s", count)
+            return count
+        except Exception as e:
+            logger.error("批量导入库存失败: %s", e)
+            raise Exception(f"批量导入库存失败: {str(e)}") from e
     
     def update_quantity(self, warehouse_id: int, product_id: int, 
                        quantity_change: int, is_in: bool, 
@@ -72,58 +215,69 @@ class InventoryDAO(BaseDAO):
         Returns:
             bool: 是否更新成功
         """
-        connection = None
         try:
-            connection = self.db_connection.get_connection()
-            with connection.cursor() as cursor:
-                # 先查询是否存在库存记录
-                sql_check = "SELECT id, quantity FROM inventory WHERE warehouse_id=%s AND product_id=%s"
-                cursor.execute(sql_check, (warehouse_id, product_id))
-                existing = cursor.fetchone()
-                
-                if existing:
-                    # 更新现有记录
-                    new_quantity = existing['quantity'] + quantity_change
-                    if new_quantity < 0:
-                        raise Exception(f"库存不足，当前库存：{existing['quantity']}，需要：{abs(quantity_change)}")
-                    
-                    if is_in:
-                        sql_update = """
-                            UPDATE inventory 
-                            SET quantity=%s, last_in_date=%s 
-                            WHERE warehouse_id=%s AND product_id=%s
-                        """
-                        cursor.execute(sql_update, (new_quantity, record_date, warehouse_id, product_id))
-                    else:
-                        sql_update = """
-                            UPDATE inventory 
-                            SET quantity=%s, last_out_date=%s 
-                            WHERE warehouse_id=%s AND product_id=%s
-                        """
-                        cursor.execute(sql_update, (new_quantity, record_date, warehouse_id, product_id))
-                else:
-                    # 创建新记录（只允许入库时创建）
-                    if not is_in:
-                        raise Exception("库存不存在，无法出库")
-                    
-                    new_quantity = quantity_change
-                    sql_insert = """
-                        INSERT INTO inventory (warehouse_id, product_id, quantity, last_in_date)
-                        VALUES (%s, %s, %s, %s)
-                    """
-                    cursor.execute(sql_insert, (warehouse_id, product_id, new_quantity, record_date))
-                
-                connection.commit()
-                logger.info(f"更新库存成功: warehouse_id={warehouse_id}, product_id={product_id}, quantity_change={quantity_change}")
-                return True
+            with self.transaction() as connection, connection.cursor() as cursor:
+                self.apply_quantity_change(cursor, warehouse_id, product_id,
+                                           quantity_change, is_in, record_date)
+            logger.info("更新库存成功: warehouse_id=%s, product_id=%s, quantity_change=%s", warehouse_id, product_id, quantity_change)
+            return True
         except Exception as e:
-            if connection:
-                connection.rollback()
-            logger.error(f"更新库存失败: {str(e)}")
+            logger.error("更新库存失败: %s", e)
             raise
         finally:
-            if connection:
-                self.db_connection.close_connection(connection)
+            self.invalidate(warehouse_id, product_id)
+    
+    def apply_quantity_change(self, cursor, warehouse_id: int, product_id: int,
+                              quantity_change: int, is_in: bool,
+                              record_date: Optional[datetime] = None):
+        """
+        在调用方事务中原子地变更库存（不提交）
+        
+        入库使用 INSERT ... ON DUPLICATE KEY UPDATE 一条语句完成新增或累加；
+        出库使用带 quantity>=需求量 条件的UPDATE，影响行数为0时才查询原因。
+        每次变更都会递增version字段，便于调用方做乐观并发校验。
+        依赖inventory表的唯一键 uk_warehouse_product(warehouse_id, product_id)。
+        
+        Args:
+            cursor: 数据库游标
+            warehouse_id: 仓库ID
+            product_id: 货品ID
+            quantity_change: 数量变化（入库为增加量，出库按绝对值扣减）
+            is_in: 是否为入库
+            record_date: 操作日期
+            
+        Raises:
+            Exception: 库存不存在、库存不足或扣减未生效时抛出异常
+        """
+        if is_in:
+            cursor.execute(_SQL_UPSERT_IN, (warehouse_id, product_id, quantity_change, record_date))
+            return
+        
+        quantity = abs(quantity_change)
+        affected_rows = cursor.execute(_SQL_DECREASE_OUT,
+                                       (quantity, record_date, warehouse_id, product_id, quantity))
+        if affected_rows:
+            return
+        
+        # 未更新任何行：查询原因（库存不存在或不足）；扣减未执行，无论原因如何都不能继续提交
+        cursor.execute(_SQL_CHECK_QUANTITY, (warehouse_id, product_id))
+        existing = cursor.fetchone()
+        if not existing:
+            raise Exception("库存不存在，无法出库")
+        if existing['quantity'] < quantity:
+            raise Exception(f"库存不足，当前库存：{existing['quantity']}，需要：{quantity}")
+        raise Exception("库存扣减失败，请重试")
+    
+    def apply_in_quantities(self, cursor, changes: List[Tuple[int, int, int, Optional[datetime]]]):
+        """
+        在调用方事务中批量入库累加库存（不提交；executemany合并为一条多行 INSERT ... ON DUPLICATE KEY UPDATE）
+        
+        Args:
+            cursor: 数据库游标
+            changes: (仓库ID, 货品ID, 增加数量, 入库日期) 列表，同一仓库+货品只应出现一次
+        """
+        if changes:
+            cursor.executemany(_SQL_UPSERT_IN, changes)
     
     def get_by_id(self, id: int) -> Optional[Inventory]:
         """
@@ -135,13 +289,7 @@ class InventoryDAO(BaseDAO):
         Returns:
             Inventory: 库存对象，如果不存在返回None
         """
-        sql = "SELECT * FROM inventory WHERE id=%s"
-        params = (id,)
-        
-        result = self.fetch_one(sql, params)
-        if result:
-            return Inventory.from_dict(result)
-        return None
+        return self.fetch_one(_SQL_GET_BY_ID, (id,), Inventory.from_row)
     
     def get_by_warehouse_product(self, warehouse_id: int, product_id: int) -> Optional[Inventory]:
         """
@@ -154,12 +302,18 @@ class InventoryDAO(BaseDAO):
         Returns:
             Inventory: 库存对象，如果不存在返回None
         """
-        sql = "SELECT * FROM inventory WHERE warehouse_id=%s AND product_id=%s"
-        params = (warehouse_id, product_id)
+        cache_key = (warehouse_id, product_id)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return copy.copy(cached)
+        
+        sql = _SQL_GET_BY_WAREHOUSE_PRODUCT
+        params = cache_key
         
-        result = self.fetch_one(sql, params)
-        if result:
-            return Inventory.from_dict(result)
+        inventory = self.fetch_one(sql, params, Inventory.from_row)
+        if inventory:
+            self._cache.set(cache_key, inventory)
+            return copy.copy(inventory)
         return None
     
     def get_by_warehouse(self, warehouse_id: int) -> List[Inventory]:
@@ -172,11 +326,10 @@ class InventoryDAO(BaseDAO):
         Returns:
             list: 库存对象列表
         """
-        sql = "SELECT * FROM inventory WHERE warehouse_id=%s ORDER BY product_id"
+        sql = _SQL_GET_BY_WAREHOUSE
         params = (warehouse_id,)
         
-        results = self.fetch_all(sql, params)
-        return [Inventory.from_dict(row) for row in results]
+        return self.fetch_all(sql, params, Inventory.from_row)
     
     def get_by_product(self, product_id: int) -> List[Inventory]:
         """
@@ -188,11 +341,26 @@ class InventoryDAO(BaseDAO):
         Returns:
             list: 库存对象列表
         """
-        sql = "SELECT * FROM inventory WHERE product_id=%s ORDER BY warehouse_id"
+        sql = _SQL_GET_BY_PRODUCT
         params = (product_id,)
         
-        results = self.fetch_all(sql, params)
-        return [Inventory.from_dict(row) for row in results]
+        return self.fetch_all(sql, params, Inventory.from_row)
+    
+    def get_page(self, after_id: int = 0, limit: int = 200) -> List[Inventory]:
+        """
+        分页查询库存记录（键集分页，按ID升序）
+        
+        Args:
+            after_id: 上一页最后一条记录的ID（首页传0）
+            limit: 每页记录数
+            
+        Returns:
+            list: 库存对象列表
+        """
+        sql = _SQL_GET_PAGE
+        params = (after_id, limit)
+        
+        return self.fetch_all(sql, params, Inventory.from_row)
     
     def get_all(self) -> List[Inventory]:
         """
@@ -201,9 +369,127 @@ class InventoryDAO(BaseDAO):
         Returns:
             list: 库存对象列表
         """
-        sql = "SELECT * FROM inventory ORDER BY warehouse_id, product_id"
-        results = self.fetch_all(sql)
-        return [Inventory.from_dict(row) for row in results]
+        return list(self.iter_all())
+    
+    def iter_all(self) -> Iterator[Inventory]:
+        """
+        流式查询所有库存记录（逐条返回，适合大数据量遍历）
+        
+        注意：遍历结束前会一直占用一个数据库连接
+        
+        Yields:
+            Inventory: 库存对象
+        """
+        sql = _SQL_GET_ALL
+        yield from self.execute_query_iter(sql, row_factory=Inventory.from_row)
+    
+    def get_statistics(self, warehouse_id: Optional[int] = None,
+                       product_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        库存统计（数据库端一次聚合完成，不逐条读取库存和货品）
+        
+        Args:
+            warehouse_id: 仓库ID（可选，只统计该仓库）
+            product_id: 货品ID（可选，只统计该货品；同时指定时以warehouse_id为准）
+            
+        Returns:
+            dict: 统计结果，包含：
+                - total_quantity: 总库存数量
+                - total_value: 总库存价值（Decimal，货品未设置单价的不计入）
+                - product_count: 货品种类数
+                - warehouse_count: 仓库数
+                - low_stock_count: 低库存记录数
+                - over_stock_count: 超库存记录数
+        """
+        if warehouse_id:
+            sql = _SQL_GET_STATISTICS_BY_WAREHOUSE
+            params = (warehouse_id,)
+        elif product_id:
+            sql = _SQL_GET_STATISTICS_BY_PRODUCT
+            params = (product_id,)
+        else:
+            sql = _SQL_GET_STATISTICS
+            params = None
+        
+        return self._statistics_from_row(self.fetch_one(sql, params))
+    
+    def get_statistics_by_warehouse(self) -> Dict[int, Dict[str, Any]]:
+        """
+        按仓库分组统计库存（一次分组聚合得到所有仓库的统计）
+        
+        Returns:
+            dict: 仓库ID -> 统计结果（字段同get_statistics；没有库存的仓库不出现在结果中）
+        """
+        rows = self.fetch_all(_SQL_GET_STATISTICS_GROUP_BY_WAREHOUSE)
+        return {row['group_id']: self._statistics_from_row(row) for row in rows}
+    
+    def get_statistics_by_product(self) -> Dict[int, Dict[str, Any]]:
+        """
+        按货品分组统计库存（一次分组聚合得到所有货品的统计）
+        
+        Returns:
+            dict: 货品ID -> 统计结果（字段同get_statistics；没有库存的货品不出现在结果中）
+        """
+        rows = self.fetch_all(_SQL_GET_STATISTICS_GROUP_BY_PRODUCT)
+        return {row['group_id']: self._statistics_from_row(row) for row in rows}
+    
+    @staticmethod
+    def _statistics_from_row(result: Dict[str, Any]) -> Dict[str, Any]:
+        """统计查询结果行转换为统计字典"""
+        # SUM返回DECIMAL，数量类统计转换为int
+        return {
+            'total_quantity': int(result['total_quantity']),
+            'total_value': result['total_value'],
+            'product_count': result['product_count'],
+            'warehouse_count': result['warehouse_count'],
+            'low_stock_count': int(result['low_stock_count']),
+            'over_stock_count': int(result['over_stock_count'])
+        }
+    
+    def get_low_stock(self) -> List[Dict[str, Any]]:
+        """
+        查询低库存记录（库存数量低于货品最低库存）
+        
+        Returns:
+            list: 预警记录列表，每个元素包含warning_type、inventory、product
+        """
+        return self.fetch_all(_SQL_GET_LOW_STOCK, row_factory=self._warning_from_row)
+    
+    def get_over_stock(self) -> List[Dict[str, Any]]:
+        """
+        查询超库存记录（库存数量高于货品最高库存，最高库存为0表示不限制）
+        
+        Returns:
+            list: 预警记录列表，每个元素包含warning_type、inventory、product
+        """
+        return self.fetch_all(_SQL_GET_OVER_STOCK, row_factory=self._warning_from_row)
+    
+    def get_stock_warnings(self) -> List[Dict[str, Any]]:
+        """
+        查询所有库存预警记录（低库存和超库存，一次查询完成）
+        
+        Returns:
+            list: 预警记录列表，每个元素包含warning_type（'low'或'over'）、inventory、product
+        """
+        return self.fetch_all(_SQL_GET_STOCK_WARNINGS, row_factory=self._warning_from_row)
+    
+    @staticmethod
+    def _warning_from_row(row: tuple) -> Dict[str, Any]:
+        """
+        将预警联表查询的元组行拆分为预警类型、库存对象和货品对象
+        
+        Args:
+            row: (warning_type, 库存各字段..., 货品各字段...)
+            
+        Returns:
+            dict: 预警记录
+        """
+        size = len(Inventory.COLUMNS) + 1
+        return {
+            'warning_type': row[0],
+            'inventory': Inventory.from_row(row[1:size]),
+            'product': Product.from_row(row[size:])
+        }
     
     def check_stock(self, warehouse_id: int, product_id: int, required_quantity: int) -> bool:
         """
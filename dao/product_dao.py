@@ -4,17 +4,84 @@
 实现product表的所有数据库操作
 """
 
-from typing import List, Optional
+from typing import Dict, List, Optional, Iterable, Iterator, Set
 from dao.base_dao import BaseDAO
 from model.product import Product
 from utils.logger import Logger
 
 logger = Logger.get_logger(__name__)
 
+# 依赖的索引（见 sql/init_database.sql）：
+#   product:      PRIMARY(id) -> get_by_id / get_by_ids / 键集分页, UNIQUE(product_code) -> get_by_code,
+#                 ft_product_name(product_name) -> 名称全文搜索
+#   inventory:    idx_product_id_inv(product_id) -> delete / check_reference
+#   stock_record: idx_product_date(product_id, record_date) -> delete / check_reference
+
+# SQL语句常量（模块级复用，避免每次调用重复构造）
+_COLUMNS = ', '.join(Product.COLUMNS)
+_SQL_INSERT = """
+    INSERT INTO product (product_code, product_name, category_id, unit_id, 
+                        specification, price, min_stock, max_stock, description, status)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+_SQL_UPDATE = """
+    UPDATE product 
+    SET product_name=%s, category_id=%s, unit_id=%s, specification=%s,
+        price=%s, min_stock=%s, max_stock=%s, description=%s, status=%s
+    WHERE id=%s
+"""
+_SQL_DELETE = """
+    DELETE FROM product WHERE id=%s
+        AND NOT EXISTS (SELECT 1 FROM inventory WHERE product_id=%s)
+        AND NOT EXISTS (SELECT 1 FROM stock_record WHERE product_id=%s)
+"""
+_SQL_EXISTS = "SELECT 1 AS found FROM product WHERE id=%s LIMIT 1"
+_SQL_GET_BY_ID = f"SELECT {_COLUMNS} FROM product WHERE id=%s"
+_SQL_GET_BY_IDS = f"SELECT {_COLUMNS} FROM product WHERE id IN ({{placeholders}})"
+_SQL_LOCK_ACTIVE_IDS = "SELECT id FROM product WHERE id IN ({placeholders}) AND status=1 LOCK IN SHARE MODE"
+_SQL_GET_BY_CODE = f"SELECT {_COLUMNS} FROM product WHERE product_code=%s"
+_SQL_SEARCH_BY_NAME = f"SELECT {_COLUMNS} FROM product WHERE product_name LIKE CONCAT('%%', %s, '%%') ORDER BY id"
+_SQL_SEARCH_PAGE = f"SELECT {_COLUMNS} FROM product WHERE product_name LIKE CONCAT('%%', %s, '%%') AND id>%s ORDER BY id LIMIT %s"
+_SQL_MATCH_BY_NAME = f"""
+    SELECT {_COLUMNS} FROM product
+    WHERE MATCH(product_name) AGAINST(%s IN BOOLEAN MODE)
+    ORDER BY id
+"""
+_SQL_MATCH_PAGE = f"""
+    SELECT {_COLUMNS} FROM product
+    WHERE MATCH(product_name) AGAINST(%s IN BOOLEAN MODE) AND id>%s
+    ORDER BY id LIMIT %s
+"""
+_SQL_CHECK_FULLTEXT = """
+    SELECT EXISTS(
+        SELECT 1 FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA=DATABASE() AND TABLE_NAME='product' AND INDEX_NAME='ft_product_name'
+    ) AS found
+"""
+
+# ngram全文索引的分词长度（MySQL默认ngram_token_size=2），更短的关键词走LIKE
+_NGRAM_TOKEN_SIZE = 2
+_SQL_GET_ALL = f"SELECT {_COLUMNS} FROM product ORDER BY id"
+_SQL_GET_PAGE = f"SELECT {_COLUMNS} FROM product WHERE id>%s ORDER BY id LIMIT %s"
+_SQL_GET_SUMMARY_ALL = "SELECT id, product_code, product_name, status FROM product ORDER BY id"
+_SQL_GET_EXISTING_CODES = "SELECT product_code FROM product WHERE product_code IN ({placeholders})"
+_SQL_CHECK_REFERENCE = """
+    SELECT EXISTS(SELECT 1 FROM inventory WHERE product_id=%s)
+        OR EXISTS(SELECT 1 FROM stock_record WHERE product_id=%s) AS referenced
+"""
+
+
+# CSV批量导入默认的列顺序
+_IMPORT_COLUMNS = ('product_code', 'product_name', 'category_id', 'unit_id', 'specification',
+                   'price', 'min_stock', 'max_stock', 'description', 'status')
+
 
 class ProductDAO(BaseDAO):
     """货品信息DAO类"""
     
+    # 是否存在全文索引ft_product_name（首次检测成功后缓存，进程内共享）
+    _fulltext_available = None
+    
     def insert(self, product: Product) -> int:
         """
         插入货品信息
@@ -25,11 +92,7 @@ class ProductDAO(BaseDAO):
         Returns:
             int: 插入记录的ID
         """
-        sql = """
-            INSERT INTO product (product_code, product_name, category_id, unit_id, 
-                                specification, price, min_stock, max_stock, description, status)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
+        sql = _SQL_INSERT
         params = (
             product.product_code,
             product.product_name,
@@ -43,23 +106,78 @@ class ProductDAO(BaseDAO):
             product.status
         )
         
-        connection = None
         try:
-            connection = self.db_connection.get_connection()
-            with connection.cursor() as cursor:
-                cursor.execute(sql, params)
-                connection.commit()
-                product.id = cursor.lastrowid
-                logger.info(f"插入货品信息成功: ID={product.id}, product_code={product.product_code}")
-                return product.id
+            product.id = self.execute_insert(sql, params)
+            logger.info("插入货品信息成功: ID=%s, product_code=%s", product.id, product.product_code)
+            return product.id
+        except Exception as e:
+            logger.error("插入货品信息失败: %s", e)
+            raise Exception(f"插入货品信息失败: {str(e)}") from e
+    
+    def insert_many(self, products: List[Product]) -> int:
+        """
+        批量插入货品信息
+        
+        Args:
+            products: 货品对象列表
+            
+        Returns:
+            int: 插入的记录数（插入成功后回填各对象的id）
+        """
+        sql = _SQL_INSERT
+        params_list = [
+            (
+                product.product_code,
+                product.product_name,
+                product.category_id,
+                product.unit_id,
+                product.specification,
+                product.price,
+                product.min_stock,
+                product.max_stock,
+                product.description,
+                product.status
+            )
+            for product in products
+        ]
+        
+        try:
+            ids = self.execute_insert_many(sql, params_list)
+            for product, id in zip(products, ids):
+                product.id = id
+            count = len(ids)
+            logger.info("批量插入货品信息成功: 记录数=%s", count)
+            return count
+        except Exception as e:
+            logger.error("批量插入货品信息失败: %s", e)
+            raise Exception(f"批量插入货品信息失败: {str(e)}") from e
+    
+    def bulk_import_csv(self, file_path: str, columns: Optional[List[str]] = None) -> int:
+        """
+        从CSV文件批量导入货品记录（LOAD DATA LOCAL INFILE，适合初始迁移等大批量导入）
+        
+        Args:
+            file_path: 本地CSV文件路径（首行为表头）
+            columns: 文件中各列对应的字段名，默认按 _IMPORT_COLUMNS 顺序
+            
+        Returns:
+            int: 导入的记录数
+            
+        Raises:
+            ValueError: 字段名不属于product表时抛出异常
+        """
+        columns = list(columns or _IMPORT_COLUMNS)
+        invalid = [column for column in columns if column not in Product.COLUMNS]
+        if invalid:
+            raise ValueError(f"无效的字段名: {', '.join(invalid)}")
+        
+        try:
+            count = self.load_data_local('product', columns, file_path)
+            logger.info("批量导入货品成功: 记录数=%s", count)
+            return count
         except Exception as e:
-            if connection:
-                connection.rollback()
-            logger.error(f"插入货品信息失败: {str(e)}")
-            raise Exception(f"插入货品信息失败: {str(e)}")
-        finally:
-            if connection:
-                self.db_connection.close_connection(connection)
+            logger.error("批量导入货品失败: %s", e)
+            raise Exception(f"批量导入货品失败: {str(e)}") from e
     
     def update(self, product: Product) -> bool:
         """
@@ -71,12 +189,7 @@ class ProductDAO(BaseDAO):
         Returns:
             bool: 是否更新成功
         """
-        sql = """
-            UPDATE product 
-            SET product_name=%s, category_id=%s, unit_id=%s, specification=%s,
-                price=%s, min_stock=%s, max_stock=%s, description=%s, status=%s
-            WHERE id=%s
-        """
+        sql = _SQL_UPDATE
         params = (
             product.product_name,
             product.category_id,
@@ -92,36 +205,42 @@ class ProductDAO(BaseDAO):
         
         try:
             affected_rows = self.execute_update(sql, params)
-            logger.info(f"更新货品信息成功: ID={product.id}")
+            logger.info("更新货品信息成功: ID=%s", product.id)
             return affected_rows > 0
         except Exception as e:
-            logger.error(f"更新货品信息失败: {str(e)}")
+            logger.error("更新货品信息失败: %s", e)
             raise
     
     def delete(self, id: int) -> bool:
         """
-        删除货品信息（需要检查是否被引用）
+        删除货品信息（被引用时不删除，引用检查与删除在同一条语句中完成）
         
         Args:
             id: 货品ID
             
         Returns:
-            bool: 是否删除成功
+            bool: 是否删除成功（记录不存在时返回False）
+            
+        Raises:
+            Exception: 货品已被引用时抛出异常
         """
-        # 先检查是否被引用
-        if self.check_reference(id):
-            raise Exception("该货品已被库存表或出入库记录表引用，无法删除")
-        
-        sql = "DELETE FROM product WHERE id=%s"
-        params = (id,)
+        sql = _SQL_DELETE
+        params = (id, id, id)
         
         try:
             affected_rows = self.execute_update(sql, params)
-            logger.info(f"删除货品信息成功: ID={id}")
-            return affected_rows > 0
         except Exception as e:
-            logger.error(f"删除货品信息失败: {str(e)}")
+            logger.error("删除货品信息失败: %s", e)
             raise
+        
+        if affected_rows > 0:
+            logger.info("删除货品信息成功: ID=%s", id)
+            return True
+        
+        # 未删除任何行：记录仍存在说明被引用
+        if self.fetch_one(_SQL_EXISTS, (id,)):
+            raise Exception("该货品已被库存表或出入库记录表引用，无法删除")
+        return False
     
     def get_by_id(self, id: int) -> Optional[Product]:
         """
@@ -133,13 +252,63 @@ class ProductDAO(BaseDAO):
         Returns:
             Product: 货品对象，如果不存在返回None
         """
-        sql = "SELECT * FROM product WHERE id=%s"
-        params = (id,)
+        return self.fetch_one(_SQL_GET_BY_ID, (id,), Product.from_row)
+    
+    def get_by_ids(self, ids: Iterable[int]) -> Dict[int, Product]:
+        """
+        根据ID批量查询（一次IN查询，替代逐条get_by_id）
         
-        result = self.fetch_one(sql, params)
-        if result:
-            return Product.from_dict(result)
-        return None
+        Args:
+            ids: 货品ID集合（重复ID只查询一次）
+            
+        Returns:
+            dict: 货品ID -> 货品对象（不存在的ID不出现在结果中）
+        """
+        ids = tuple(set(ids))
+        if not ids:
+            return {}
+        
+        sql = _SQL_GET_BY_IDS.format(placeholders=', '.join(['%s'] * len(ids)))
+        
+        return {product.id: product for product in self.fetch_all(sql, ids, Product.from_row)}
+    
+    def lock_active_ids(self, ids: Iterable[int]) -> Set[int]:
+        """
+        查询给定ID中启用状态的货品并加共享锁（LOCK IN SHARE MODE）
+        
+        须在transaction中调用：锁持有到事务结束，期间其他连接不能修改这些货品的状态
+        
+        Args:
+            ids: 货品ID集合
+            
+        Returns:
+            set: 启用状态的货品ID集合
+        """
+        ids = tuple(set(ids))
+        if not ids:
+            return set()
+        
+        sql = _SQL_LOCK_ACTIVE_IDS.format(placeholders=', '.join(['%s'] * len(ids)))
+        
+        return {row['id'] for row in self.fetch_all(sql, ids)}
+    
+    def get_existing_codes(self, product_codes: List[str]) -> Set[str]:
+        """
+        查询给定编码中已存在的货品编码（一次IN查询，供批量导入前检查唯一性）
+        
+        Args:
+            product_codes: 货品编码列表
+            
+        Returns:
+            set: 已存在的货品编码集合
+        """
+        if not product_codes:
+            return set()
+        
+        sql = _SQL_GET_EXISTING_CODES.format(placeholders=', '.join(['%s'] * len(product_codes)))
+        params = tuple(product_codes)
+        
+        return {row['product_code'] for row in self.fetch_all(sql, params)}
     
     def get_by_code(self, product_code: str) -> Optional[Product]:
         """
@@ -151,13 +320,10 @@ class ProductDAO(BaseDAO):
         Returns:
             Product: 货品对象，如果不存在返回None
         """
-        sql = "SELECT * FROM product WHERE product_code=%s"
+        sql = _SQL_GET_BY_CODE
         params = (product_code,)
         
-        result = self.fetch_one(sql, params)
-        if result:
-            return Product.from_dict(result)
-        return None
+        return self.fetch_one(sql, params, Product.from_row)
     
     def search_by_name(self, keyword: str) -> List[Product]:
         """
@@ -169,11 +335,88 @@ class ProductDAO(BaseDAO):
         Returns:
             list: 货品对象列表
         """
-        sql = "SELECT * FROM product WHERE product_name LIKE %s ORDER BY id"
-        params = (f'%{keyword}%',)
+        if self._use_fulltext(keyword):
+            sql = _SQL_MATCH_BY_NAME
+            params = (self._fulltext_phrase(keyword),)
+        else:
+            sql = _SQL_SEARCH_BY_NAME
+            params = (self.escape_like(keyword),)
+        
+        return self.fetch_all(sql, params, Product.from_row)
+    
+    def search_page(self, keyword: str, after_id: int = 0, limit: int = 200) -> List[Product]:
+        """
+        根据名称模糊查询（键集分页）
+        
+        Args:
+            keyword: 搜索关键词
+            after_id: 上一页最后一条记录的ID（首页传0）
+            limit: 每页记录数
+            
+        Returns:
+            list: 货品对象列表（按ID升序）
+        """
+        if self._use_fulltext(keyword):
+            sql = _SQL_MATCH_PAGE
+            params = (self._fulltext_phrase(keyword), after_id, limit)
+        else:
+            sql = _SQL_SEARCH_PAGE
+            params = (self.escape_like(keyword), after_id, limit)
+        
+        return self.fetch_all(sql, params, Product.from_row)
+    
+    def _use_fulltext(self, keyword: str) -> bool:
+        """
+        判断是否可以使用全文索引搜索
+        
+        Args:
+            keyword: 搜索关键词
+            
+        Returns:
+            bool: 全文索引存在且关键词长度不小于ngram分词长度时返回True
+        """
+        if len(keyword.strip()) < _NGRAM_TOKEN_SIZE:
+            return False
         
-        results = self.fetch_all(sql, params)
-        return [Product.from_dict(row) for row in results]
+        if ProductDAO._fulltext_available is None:
+            try:
+                result = self.fetch_one(_SQL_CHECK_FULLTEXT)
+            except Exception as e:
+                # 检测失败（如连接中断）不缓存结果：本次使用LIKE搜索，下次搜索重新检测
+                logger.warning("检测全文索引失败，本次使用LIKE搜索: %s", e)
+                return False
+            ProductDAO._fulltext_available = bool(result['found']) if result else False
+            logger.info("货品名称全文索引可用: %s", ProductDAO._fulltext_available)
+        return ProductDAO._fulltext_available
+    
+    @staticmethod
+    def _fulltext_phrase(keyword: str) -> str:
+        """
+        构造布尔模式的短语查询（ngram解析器下短语匹配等价于子串匹配）
+        
+        Args:
+            keyword: 搜索关键词
+            
+        Returns:
+            str: 短语查询字符串
+        """
+        return '"' + keyword.strip().replace('"', ' ') + '"'
+    
+    def get_page(self, after_id: int = 0, limit: int = 200) -> List[Product]:
+        """
+        分页查询（键集分页，按ID升序）
+        
+        Args:
+            after_id: 上一页最后一条记录的ID（首页传0）
+            limit: 每页记录数
+            
+        Returns:
+            list: 货品对象列表
+        """
+        sql = _SQL_GET_PAGE
+        params = (after_id, limit)
+        
+        return self.fetch_all(sql, params, Product.from_row)
     
     def get_all(self) -> List[Product]:
         """
@@ -182,9 +425,42 @@ class ProductDAO(BaseDAO):
         Returns:
             list: 货品对象列表
         """
-        sql = "SELECT * FROM product ORDER BY id"
-        results = self.fetch_all(sql)
-        return [Product.from_dict(row) for row in results]
+        return list(self.iter_all())
+    
+    def get_summary_all(self) -> List[Product]:
+        """
+        查询所有货品的摘要信息（仅ID、编码、名称、状态，用于下拉框和名称映射等列表场景）
+        
+        Returns:
+            list: 货品对象列表（未查询的字段为默认值）
+        """
+        sql = _SQL_GET_SUMMARY_ALL
+        return self.fetch_all(sql, None, self._summary_from_row)
+    
+    @staticmethod
+    def _summary_from_row(row: tuple) -> Product:
+        """
+        从摘要查询的元组行创建货品对象
+        
+        Args:
+            row: (id, product_code, product_name, status)
+            
+        Returns:
+            Product: 货品对象
+        """
+        return Product(id=row[0], product_code=row[1], product_name=row[2], status=row[3])
+    
+    def iter_all(self) -> Iterator[Product]:
+        """
+        流式查询所有记录（逐条返回，适合大数据量遍历）
+        
+        注意：遍历结束前会一直占用一个数据库连接
+        
+        Yields:
+            Product: 货品对象
+        """
+        sql = _SQL_GET_ALL
+        yield from self.execute_query_iter(sql, row_factory=Product.from_row)
     
     def check_reference(self, id: int) -> bool:
         """
@@ -196,16 +472,10 @@ class ProductDAO(BaseDAO):
         Returns:
             bool: 是否被引用
         """
-        # 检查是否被inventory表引用
-        sql1 = "SELECT COUNT(*) as count FROM inventory WHERE product_id=%s"
-        result1 = self.fetch_one(sql1, (id,))
+        # 同时检查inventory表和stock_record表，命中第一条即返回
+        sql = _SQL_CHECK_REFERENCE
+        params = (id, id)
         
-        # 检查是否被stock_record表引用
-        sql2 = "SELECT COUNT(*) as count FROM stock_record WHERE product_id=%s"
-        result2 = self.fetch_one(sql2, (id,))
-        
-        count1 = result1['count'] if result1 else 0
-        count2 = result2['count'] if result2 else 0
-        
-        return (count1 + count2) > 0
+        result = self.fetch_one(sql, params)
+        return bool(result['referenced']) if result else False
 
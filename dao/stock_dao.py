@@ -4,18 +4,109 @@
 实现stock_record表的所有数据库操作
 """
 
-from typing import List, Optional
+import itertools
+from typing import List, Optional, Dict, Any, Tuple, Iterator
 from datetime import datetime
 from dao.base_dao import BaseDAO
 from model.stock_record import StockRecord
+from utils.cache import TTLCache
 from utils.logger import Logger
 
 logger = Logger.get_logger(__name__)
 
+# 依赖的索引（见 sql/init_database.sql）：
+#   stock_record: idx_warehouse_date(warehouse_id, record_date) -> get_by_warehouse / get_page_by_warehouse,
+#                 idx_product_date(product_id, record_date) -> get_by_product / get_page_by_product,
+#                 (get_by_warehouse_joined 另按主键关联 warehouse / product / supplier_client)
+#                 idx_type_date(record_type, record_date) -> get_by_type / get_page_by_type,
+#                 idx_supplier_client_date(supplier_client_id, record_date) -> get_statistics(supplier_client_id=...),
+#                 idx_record_date -> get_all
+#   InnoDB二级索引末尾隐含主键id，上述组合索引的顺序即 (条件列, record_date, id)，
+#   ORDER BY record_date DESC, id DESC 可直接反向扫描索引，无需filesort；
+#   按条件列查询的SQL带 USE INDEX 提示，避免优化器在小范围日期条件下改用 idx_record_date 再排序
+
+# SQL语句常量（模块级复用，避免每次调用重复构造）
+_COLUMNS = ', '.join(StockRecord.COLUMNS)
+_SQL_INSERT = """
+    INSERT INTO stock_record (record_no, record_type, warehouse_id, product_id, 
+                            quantity, unit_price, total_amount, supplier_client_id, 
+                            operator, record_date, remark)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+_SQL_GET_BY_ID = f"SELECT {_COLUMNS} FROM stock_record WHERE id=%s"
+_SQL_GET_BY_RECORD_NO = f"SELECT {_COLUMNS} FROM stock_record WHERE record_no=%s"
+_SQL_GET_ALL = f"SELECT {_COLUMNS} FROM stock_record ORDER BY record_date DESC, id DESC"
+
+
+def _build_sql_variants(prefix: str, filters: Tuple[str, ...], suffix: str) -> Dict[Tuple[bool, ...], str]:
+    """
+    按可选过滤条件的所有组合预先生成SQL
+    
+    Args:
+        prefix: SQL前半部分（含必选条件）
+        filters: 可选过滤条件片段
+        suffix: SQL后缀（ORDER BY / GROUP BY）
+        
+    Returns:
+        dict: 键为各条件是否启用的布尔元组，值为对应的SQL
+    """
+    return {
+        key: prefix + ''.join(f for f, enabled in zip(filters, key) if enabled) + suffix
+        for key in itertools.product((False, True), repeat=len(filters))
+    }
+
+
+_DATE_FILTERS = (" AND record_date >= %s", " AND record_date <= %s")
+_ORDER_BY_DATE = " ORDER BY record_date DESC, id DESC"
+_SQL_GET_BY_WAREHOUSE = _build_sql_variants(
+    f"SELECT {_COLUMNS} FROM stock_record USE INDEX (idx_warehouse_date) WHERE warehouse_id=%s",
+    _DATE_FILTERS, _ORDER_BY_DATE)
+_SQL_GET_BY_PRODUCT = _build_sql_variants(
+    f"SELECT {_COLUMNS} FROM stock_record USE INDEX (idx_product_date) WHERE product_id=%s",
+    _DATE_FILTERS, _ORDER_BY_DATE)
+# 出入库记录连同仓库、货品、供应商/客户名称一次查出（避免逐条查询名称的N+1查询）
+_SQL_GET_BY_WAREHOUSE_JOINED = _build_sql_variants(
+    """SELECT """ + ', '.join('sr.' + column for column in StockRecord.COLUMNS) + """,
+        w.warehouse_name, p.product_name, sc.name, sc.type
+    FROM stock_record sr USE INDEX (idx_warehouse_date)
+    LEFT JOIN warehouse w ON w.id=sr.warehouse_id
+    LEFT JOIN product p ON p.id=sr.product_id
+    LEFT JOIN supplier_client sc ON sc.id=sr.supplier_client_id
+    WHERE sr.warehouse_id=%s""",
+    (" AND sr.record_date >= %s", " AND sr.record_date <= %s"),
+    " ORDER BY sr.record_date DESC, sr.id DESC")
+_SQL_GET_BY_TYPE = _build_sql_variants(
+    f"SELECT {_COLUMNS} FROM stock_record USE INDEX (idx_type_date) WHERE record_type=%s",
+    _DATE_FILTERS, _ORDER_BY_DATE)
+# 键集分页：按 (record_date, id) 倒序，从上一页最后一条记录之后继续（展开写法便于使用索引范围扫描）
+_KEYSET_FILTER = " AND (record_date < %s OR (record_date = %s AND id < %s))"
+_PAGE_SUFFIX = _ORDER_BY_DATE + " LIMIT %s"
+_SQL_GET_PAGE_BY_WAREHOUSE = _build_sql_variants(
+    f"SELECT {_COLUMNS} FROM stock_record USE INDEX (idx_warehouse_date) WHERE warehouse_id=%s",
+    _DATE_FILTERS + (_KEYSET_FILTER,), _PAGE_SUFFIX)
+_SQL_GET_PAGE_BY_PRODUCT = _build_sql_variants(
+    f"SELECT {_COLUMNS} FROM stock_record USE INDEX (idx_product_date) WHERE product_id=%s",
+    _DATE_FILTERS + (_KEYSET_FILTER,), _PAGE_SUFFIX)
+_SQL_GET_PAGE_BY_TYPE = _build_sql_variants(
+    f"SELECT {_COLUMNS} FROM stock_record USE INDEX (idx_type_date) WHERE record_type=%s",
+    _DATE_FILTERS + (_KEYSET_FILTER,), _PAGE_SUFFIX)
+# 条件聚合：一次扫描直接得到入库/出库汇总，结果固定为一行
+_SQL_GET_STATISTICS = _build_sql_variants(
+    """SELECT COALESCE(SUM(CASE WHEN record_type=1 THEN quantity END), 0) AS in_quantity,
+        COALESCE(SUM(CASE WHEN record_type=1 THEN total_amount END), 0) AS in_amount,
+        COALESCE(SUM(CASE WHEN record_type=2 THEN quantity END), 0) AS out_quantity,
+        COALESCE(SUM(CASE WHEN record_type=2 THEN total_amount END), 0) AS out_amount
+    FROM stock_record WHERE 1=1""",
+    (" AND warehouse_id=%s", " AND product_id=%s", " AND supplier_client_id=%s") + _DATE_FILTERS,
+    "")
+
 
 class StockDAO(BaseDAO):
     """入库/出库记录DAO类"""
     
+    # 统计结果缓存：统计条件 -> 聚合结果行，所有实例共享；出入库记录写操作后清空
+    _statistics_cache = TTLCache(maxsize=128, ttl=30)
+    
     def insert(self, stock_record: StockRecord) -> int:
         """
         插入出入库记录
@@ -26,12 +117,7 @@ class StockDAO(BaseDAO):
         Returns:
             int: 插入记录的ID
         """
-        sql = """
-            INSERT INTO stock_record (record_no, record_type, warehouse_id, product_id, 
-                                    quantity, unit_price, total_amount, supplier_client_id, 
-                                    operator, record_date, remark)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
+        sql = _SQL_INSERT
         params = (
             stock_record.record_no,
             stock_record.record_type,
@@ -46,23 +132,53 @@ class StockDAO(BaseDAO):
             stock_record.remark
         )
         
-        connection = None
         try:
-            connection = self.db_connection.get_connection()
-            with connection.cursor() as cursor:
-                cursor.execute(sql, params)
-                connection.commit()
-                stock_record.id = cursor.lastrowid
-                logger.info(f"插入出入库记录成功: ID={stock_record.id}, record_no={stock_record.record_no}")
-                return stock_record.id
+            stock_record.id = self.execute_insert(sql, params)
+            self.invalidate_statistics()
+            logger.info("插入出入库记录成功: ID=%s, record_no=%s", stock_record.id, stock_record.record_no)
+            return stock_record.id
         except Exception as e:
-            if connection:
-                connection.rollback()
-            logger.error(f"插入出入库记录失败: {str(e)}")
-            raise Exception(f"插入出入库记录失败: {str(e)}")
-        finally:
-            if connection:
-                self.db_connection.close_connection(connection)
+            logger.error("插入出入库记录失败: %s", e)
+            raise Exception(f"插入出入库记录失败: {str(e)}") from e
+    
+    def insert_many(self, stock_records: List[StockRecord]) -> int:
+        """
+        批量插入出入库记录
+        
+        Args:
+            stock_records: 出入库记录对象列表
+            
+        Returns:
+            int: 插入的记录数（插入成功后回填各对象的id）
+        """
+        sql = _SQL_INSERT
+        params_list = [
+            (
+                stock_record.record_no,
+                stock_record.record_type,
+                stock_record.warehouse_id,
+                stock_record.product_id,
+                stock_record.quantity,
+                stock_record.unit_price,
+                stock_record.total_amount,
+                stock_record.supplier_client_id,
+                stock_record.operator,
+                stock_record.record_date,
+                stock_record.remark
+            )
+            for stock_record in stock_records
+        ]
+        
+        try:
+            ids = self.execute_insert_many(sql, params_list)
+            self.invalidate_statistics()
+            for stock_record, id in zip(stock_records, ids):
+                stock_record.id = id
+            logger.info("批量插入出入库记录成功: 记录数=%s", len(ids))
+            return len(ids)
+        except Exception as e:
+            logger.error("批量插入出入库记录失败: %s", e)
+            raise Exception(f"批量插入出入库记录失败: {str(e)}") from e
     
     def update(self, stock_record: StockRecord) -> bool:
         """
@@ -97,10 +213,11 @@ class StockDAO(BaseDAO):
         
         try:
             affected_rows = self.execute_update(sql, params)
-            logger.info(f"更新出入库记录成功: ID={stock_record.id}")
+            self.invalidate_statistics()
+            logger.info("更新出入库记录成功: ID=%s", stock_record.id)
             return affected_rows > 0
         except Exception as e:
-            logger.error(f"更新出入库记录失败: {str(e)}")
+            logger.error("更新出入库记录失败: %s", e)
             raise
     
     def delete(self, id: int) -> bool:
@@ -118,12 +235,17 @@ class StockDAO(BaseDAO):
         
         try:
             affected_rows = self.execute_update(sql, params)
-            logger.info(f"删除出入库记录成功: ID={id}")
+            self.invalidate_statistics()
+            logger.info("删除出入库记录成功: ID=%s", id)
             return affected_rows > 0
         except Exception as e:
-            logger.error(f"删除出入库记录失败: {str(e)}")
+            logger.error("删除出入库记录失败: %s", e)
             raise
     
+    def invalidate_statistics(self):
+        """使统计结果缓存失效（出入库记录写操作提交或回滚后调用）"""
+        self._statistics_cache.clear()
+    
     def get_by_id(self, id: int) -> Optional[StockRecord]:
         """
         根据ID查询
@@ -134,13 +256,10 @@ class StockDAO(BaseDAO):
         Returns:
             StockRecord: 出入库记录对象，如果不存在返回None
         """
-        sql = "SELECT * FROM stock_record WHERE id=%s"
+        sql = _SQL_GET_BY_ID
         params = (id,)
         
-        result = self.fetch_one(sql, params)
-        if result:
-            return StockRecord.from_dict(result)
-        return None
+        return self.fetch_one(sql, params, StockRecord.from_row)
     
     def get_by_record_no(self, record_no: str) -> Optional[StockRecord]:
         """
@@ -152,13 +271,10 @@ class StockDAO(BaseDAO):
         Returns:
             StockRecord: 出入库记录对象，如果不存在返回None
         """
-        sql = "SELECT * FROM stock_record WHERE record_no=%s"
+        sql = _SQL_GET_BY_RECORD_NO
         params = (record_no,)
         
-        result = self.fetch_one(sql, params)
-        if result:
-            return StockRecord.from_dict(result)
-        return None
+        return self.fetch_one(sql, params, StockRecord.from_row)
     
     def get_by_warehouse(self, warehouse_id: int, start_date: Optional[datetime] = None,
                          end_date: Optional[datetime] = None) -> List[StockRecord]:
@@ -173,21 +289,69 @@ class StockDAO(BaseDAO):
         Returns:
             list: 出入库记录对象列表
         """
-        sql = "SELECT * FROM stock_record WHERE warehouse_id=%s"
-        params = [warehouse_id]
+        return list(self.iter_by_warehouse(warehouse_id, start_date, end_date))
+    
+    def iter_by_warehouse(self, warehouse_id: int, start_date: Optional[datetime] = None,
+                          end_date: Optional[datetime] = None) -> Iterator[StockRecord]:
+        """
+        根据仓库和时间范围流式查询（逐条返回，适合导出/报表等大数据量遍历）
         
-        if start_date:
-            sql += " AND record_date >= %s"
-            params.append(start_date)
+        注意：遍历结束前会一直占用一个数据库连接
         
-        if end_date:
-            sql += " AND record_date <= %s"
-            params.append(end_date)
+        Args:
+            warehouse_id: 仓库ID
+            start_date: 开始日期
+            end_date: 结束日期
+            
+        Yields:
+            StockRecord: 出入库记录对象
+        """
+        filters = (start_date, end_date)
+        sql = _SQL_GET_BY_WAREHOUSE[tuple(bool(value) for value in filters)]
+        params = (warehouse_id,) + tuple(value for value in filters if value)
+        
+        yield from self.execute_query_iter(sql, params, row_factory=StockRecord.from_row)
+    
+    def get_by_warehouse_joined(self, warehouse_id: int, start_date: Optional[datetime] = None,
+                                end_date: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        根据仓库和时间范围查询，同时返回仓库、货品和供应商/客户名称（一次联表查询）
+        
+        Args:
+            warehouse_id: 仓库ID
+            start_date: 开始日期
+            end_date: 结束日期
+            
+        Returns:
+            list: 记录信息列表，每项包含record、warehouse_name、product_name、
+                supplier_client_name、supplier_client_type
+        """
+        filters = (start_date, end_date)
+        sql = _SQL_GET_BY_WAREHOUSE_JOINED[tuple(bool(value) for value in filters)]
+        params = (warehouse_id,) + tuple(value for value in filters if value)
         
-        sql += " ORDER BY record_date DESC, id DESC"
+        return self.fetch_all(sql, params, self._joined_from_row)
+    
+    @staticmethod
+    def _joined_from_row(row: tuple) -> Dict[str, Any]:
+        """
+        将联表查询的元组行拆分为出入库记录对象和名称字段
         
-        results = self.fetch_all(sql, tuple(params))
-        return [StockRecord.from_dict(row) for row in results]
+        Args:
+            row: 出入库记录字段（按COLUMNS顺序）后接仓库名称、货品名称、供应商/客户名称和类型
+            
+        Returns:
+            dict: 记录信息
+        """
+        size = len(StockRecord.COLUMNS)
+        warehouse_name, product_name, supplier_client_name, supplier_client_type = row[size:]
+        return {
+            'record': StockRecord.from_row(row[:size]),
+            'warehouse_name': warehouse_name,
+            'product_name': product_name,
+            'supplier_client_name': supplier_client_name,
+            'supplier_client_type': supplier_client_type
+        }
     
     def get_by_product(self, product_id: int, start_date: Optional[datetime] = None,
                       end_date: Optional[datetime] = None) -> List[StockRecord]:
@@ -202,21 +366,11 @@ class StockDAO(BaseDAO):
         Returns:
             list: 出入库记录对象列表
         """
-        sql = "SELECT * FROM stock_record WHERE product_id=%s"
-        params = [product_id]
-        
-        if start_date:
-            sql += " AND record_date >= %s"
-            params.append(start_date)
-        
-        if end_date:
-            sql += " AND record_date <= %s"
-            params.append(end_date)
+        filters = (start_date, end_date)
+        sql = _SQL_GET_BY_PRODUCT[tuple(bool(value) for value in filters)]
+        params = (product_id,) + tuple(value for value in filters if value)
         
-        sql += " ORDER BY record_date DESC, id DESC"
-        
-        results = self.fetch_all(sql, tuple(params))
-        return [StockRecord.from_dict(row) for row in results]
+        return self.fetch_all(sql, params, StockRecord.from_row)
     
     def get_by_type(self, record_type: int, start_date: Optional[datetime] = None,
                    end_date: Optional[datetime] = None) -> List[StockRecord]:
@@ -231,21 +385,94 @@ class StockDAO(BaseDAO):
         Returns:
             list: 出入库记录对象列表
         """
-        sql = "SELECT * FROM stock_record WHERE record_type=%s"
-        params = [record_type]
+        filters = (start_date, end_date)
+        sql = _SQL_GET_BY_TYPE[tuple(bool(value) for value in filters)]
+        params = (record_type,) + tuple(value for value in filters if value)
         
-        if start_date:
-            sql += " AND record_date >= %s"
-            params.append(start_date)
+        return self.fetch_all(sql, params, StockRecord.from_row)
+    
+    def get_page_by_warehouse(self, warehouse_id: int, start_date: Optional[datetime] = None,
+                              end_date: Optional[datetime] = None,
+                              after: Optional[Tuple[datetime, int]] = None,
+                              limit: int = 200) -> List[StockRecord]:
+        """
+        根据仓库和时间范围分页查询（键集分页，按日期、ID倒序）
         
-        if end_date:
-            sql += " AND record_date <= %s"
-            params.append(end_date)
+        Args:
+            warehouse_id: 仓库ID
+            start_date: 开始日期
+            end_date: 结束日期
+            after: 上一页最后一条记录的 (record_date, id)（首页传None）
+            limit: 每页记录数
+            
+        Returns:
+            list: 出入库记录对象列表
+        """
+        return self._get_page(_SQL_GET_PAGE_BY_WAREHOUSE, warehouse_id, start_date, end_date, after, limit)
+    
+    def get_page_by_product(self, product_id: int, start_date: Optional[datetime] = None,
+                            end_date: Optional[datetime] = None,
+                            after: Optional[Tuple[datetime, int]] = None,
+                            limit: int = 200) -> List[StockRecord]:
+        """
+        根据货品和时间范围分页查询（键集分页，按日期、ID倒序）
+        
+        Args:
+            product_id: 货品ID
+            start_date: 开始日期
+            end_date: 结束日期
+            after: 上一页最后一条记录的 (record_date, id)（首页传None）
+            limit: 每页记录数
+            
+        Returns:
+            list: 出入库记录对象列表
+        """
+        return self._get_page(_SQL_GET_PAGE_BY_PRODUCT, product_id, start_date, end_date, after, limit)
+    
+    def get_page_by_type(self, record_type: int, start_date: Optional[datetime] = None,
+                         end_date: Optional[datetime] = None,
+                         after: Optional[Tuple[datetime, int]] = None,
+                         limit: int = 200) -> List[StockRecord]:
+        """
+        根据类型和时间范围分页查询（键集分页，按日期、ID倒序）
         
-        sql += " ORDER BY record_date DESC, id DESC"
+        Args:
+            record_type: 记录类型（1-入库，2-出库）
+            start_date: 开始日期
+            end_date: 结束日期
+            after: 上一页最后一条记录的 (record_date, id)（首页传None）
+            limit: 每页记录数
+            
+        Returns:
+            list: 出入库记录对象列表
+        """
+        return self._get_page(_SQL_GET_PAGE_BY_TYPE, record_type, start_date, end_date, after, limit)
+    
+    def _get_page(self, variants: Dict[Tuple[bool, ...], str], key_value: int,
+                  start_date: Optional[datetime], end_date: Optional[datetime],
+                  after: Optional[Tuple[datetime, int]], limit: int) -> List[StockRecord]:
+        """
+        执行键集分页查询
         
-        results = self.fetch_all(sql, tuple(params))
-        return [StockRecord.from_dict(row) for row in results]
+        Args:
+            variants: 按过滤条件组合预生成的分页SQL
+            key_value: 必选条件的值（仓库ID/货品ID/记录类型）
+            start_date: 开始日期
+            end_date: 结束日期
+            after: 上一页最后一条记录的 (record_date, id)
+            limit: 每页记录数
+            
+        Returns:
+            list: 出入库记录对象列表
+        """
+        sql = variants[(bool(start_date), bool(end_date), after is not None)]
+        params = (key_value,) + tuple(value for value in (start_date, end_date) if value)
+        if after is not None:
+            after_date, after_id = after
+            params += (after_date, after_date, after_id)
+        params += (limit,)
+        
+        return self.fetch_all(sql, params, StockRecord.from_row)
     
     def get_all(self) -> List[StockRecord]:
         """
@@ -254,61 +481,50 @@ class StockDAO(BaseDAO):
         Returns:
             list: 出入库记录对象列表
         """
-        sql = "SELECT * FROM stock_record ORDER BY record_date DESC, id DESC"
-        results = self.fetch_all(sql)
-        return [StockRecord.from_dict(row) for row in results]
+        return list(self.iter_all())
+    
+    def iter_all(self) -> Iterator[StockRecord]:
+        """
+        流式查询所有记录（逐条返回，适合导出/报表等大数据量遍历）
+        
+        注意：遍历结束前会一直占用一个数据库连接
+        
+        Yields:
+            StockRecord: 出入库记录对象
+        """
+        sql = _SQL_GET_ALL
+        yield from self.execute_query_iter(sql, row_factory=StockRecord.from_row)
     
     def get_statistics(self, warehouse_id: Optional[int] = None,
                       product_id: Optional[int] = None,
                       start_date: Optional[datetime] = None,
-                      end_date: Optional[datetime] = None) -> dict:
+                      end_date: Optional[datetime] = None,
+                      supplier_client_id: Optional[int] = None) -> dict:
         """
-        统计查询
+        统计查询（同一条件的结果缓存30秒，出入库记录写操作后失效）
         
         Args:
             warehouse_id: 仓库ID（可选）
             product_id: 货品ID（可选）
             start_date: 开始日期（可选）
             end_date: 结束日期（可选）
+            supplier_client_id: 供应商/客户ID（可选）
             
         Returns:
             dict: 统计结果
         """
-        sql = "SELECT record_type, SUM(quantity) as total_quantity, SUM(total_amount) as total_amount FROM stock_record WHERE 1=1"
-        params = []
-        
-        if warehouse_id:
-            sql += " AND warehouse_id=%s"
-            params.append(warehouse_id)
-        
-        if product_id:
-            sql += " AND product_id=%s"
-            params.append(product_id)
-        
-        if start_date:
-            sql += " AND record_date >= %s"
-            params.append(start_date)
-        
-        if end_date:
-            sql += " AND record_date <= %s"
-            params.append(end_date)
-        
-        sql += " GROUP BY record_type"
-        
-        results = self.fetch_all(sql, tuple(params) if params else None)
+        filters = (warehouse_id, product_id, supplier_client_id, start_date, end_date)
+        row = self._statistics_cache.get(filters)
+        if row is None:
+            sql = _SQL_GET_STATISTICS[tuple(bool(value) for value in filters)]
+            params = tuple(value for value in filters if value)
+            
+            row = self.fetch_one(sql, params or None)
+            self._statistics_cache.set(filters, row)
         
-        statistics = {
-            'in_stock': {'quantity': 0, 'amount': 0},
-            'out_stock': {'quantity': 0, 'amount': 0}
+        # 每次返回新构造的字典，调用方修改结果不会影响缓存
+        return {
+            'in_stock': {'quantity': row['in_quantity'], 'amount': float(row['in_amount'])},
+            'out_stock': {'quantity': row['out_quantity'], 'amount': float(row['out_amount'])}
         }
-        
-        for row in results:
-            if row['record_type'] == 1:
-                statistics['in_stock']['quantity'] = row['total_quantity'] or 0
-                statistics['in_stock']['amount'] = float(row['total_amount'] or 0)
-            elif row['record_type'] == 2:
-                statistics['out_stock']['quantity'] = row['total_quantity'] or 0
-                statistics['out_stock']['amount'] = float(row['total_amount'] or 0)
-        
-        return statistics
 
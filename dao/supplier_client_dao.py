@@ -7,10 +7,45 @@
 from typing import List, Optional
 from dao.base_dao import BaseDAO
 from model.supplier_client import SupplierClient
+from utils.cache import cached
 from utils.logger import Logger
 
 logger = Logger.get_logger(__name__)
 
+# 依赖的索引（见 sql/init_database.sql）：
+#   supplier_client: idx_type(type) -> get_by_type, idx_name(name) -> search_by_name(prefix=True)
+#   stock_record: idx_supplier_client_date(supplier_client_id, record_date) -> delete / check_reference
+
+# SQL语句常量（模块级复用，避免每次调用重复构造）
+_COLUMNS = ', '.join(SupplierClient.COLUMNS)
+_SQL_INSERT = """
+    INSERT INTO supplier_client (code, name, type, contact_person, phone, 
+                               email, address, description, status)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+# 按唯一键code插入或更新；id=LAST_INSERT_ID(id)使更新时lastrowid同样返回已有记录的ID
+_SQL_UPSERT = """
+    INSERT INTO supplier_client (code, name, type, contact_person, phone, 
+                               email, address, description, status)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE id=LAST_INSERT_ID(id), name=VALUES(name), type=VALUES(type),
+        contact_person=VALUES(contact_person), phone=VALUES(phone), email=VALUES(email),
+        address=VALUES(address), description=VALUES(description), status=VALUES(status)
+"""
+_SQL_CHECK_REFERENCE = "SELECT EXISTS(SELECT 1 FROM stock_record WHERE supplier_client_id=%s) AS referenced"
+# 引用检查与删除在同一条语句中完成（被引用时不删除任何行）
+_SQL_DELETE = """
+    DELETE FROM supplier_client WHERE id=%s
+        AND NOT EXISTS (SELECT 1 FROM stock_record WHERE supplier_client_id=%s)
+"""
+_SQL_EXISTS = "SELECT 1 AS found FROM supplier_client WHERE id=%s LIMIT 1"
+_SQL_GET_BY_ID = f"SELECT {_COLUMNS} FROM supplier_client WHERE id=%s"
+_SQL_GET_BY_CODE = f"SELECT {_COLUMNS} FROM supplier_client WHERE code=%s"
+_SQL_SEARCH_BY_NAME = f"SELECT {_COLUMNS} FROM supplier_client WHERE name LIKE CONCAT('%%', %s, '%%') ORDER BY id"
+_SQL_SEARCH_BY_NAME_PREFIX = f"SELECT {_COLUMNS} FROM supplier_client WHERE name LIKE %s ORDER BY name, id"
+_SQL_GET_BY_TYPE = f"SELECT {_COLUMNS} FROM supplier_client WHERE type=%s ORDER BY id"
+_SQL_GET_ALL = f"SELECT {_COLUMNS} FROM supplier_client ORDER BY id"
+
 
 class SupplierClientDAO(BaseDAO):
     """供应商/客户信息DAO类"""
@@ -25,11 +60,7 @@ class SupplierClientDAO(BaseDAO):
         Returns:
             int: 插入记录的ID
         """
-        sql = """
-            INSERT INTO supplier_client (code, name, type, contact_person, phone, 
-                                       email, address, description, status)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
+        sql = _SQL_INSERT
         params = (
             supplier_client.code,
             supplier_client.name,
@@ -42,23 +73,51 @@ class SupplierClientDAO(BaseDAO):
             supplier_client.status
         )
         
-        connection = None
         try:
-            connection = self.db_connection.get_connection()
-            with connection.cursor() as cursor:
-                cursor.execute(sql, params)
-                connection.commit()
-                supplier_client.id = cursor.lastrowid
-                logger.info(f"插入供应商/客户信息成功: ID={supplier_client.id}, code={supplier_client.code}")
-                return supplier_client.id
+            supplier_client.id = self.execute_insert(sql, params)
+            self._clear_cache()
+            logger.info("插入供应商/客户信息成功: ID=%s, code=%s", supplier_client.id, supplier_client.code)
+            return supplier_client.id
         except Exception as e:
-            if connection:
-                connection.rollback()
-            logger.error(f"插入供应商/客户信息失败: {str(e)}")
-            raise Exception(f"插入供应商/客户信息失败: {str(e)}")
-        finally:
-            if connection:
-                self.db_connection.close_connection(connection)
+            logger.error("插入供应商/客户信息失败: %s", e)
+            raise Exception(f"插入供应商/客户信息失败: {str(e)}") from e
+    
+    def insert_many(self, supplier_clients: List[SupplierClient]) -> int:
+        """
+        批量插入供应商/客户信息
+        
+        Args:
+            supplier_clients: 供应商/客户对象列表
+            
+        Returns:
+            int: 插入的记录数（插入成功后回填各对象的id）
+        """
+        sql = _SQL_INSERT
+        params_list = [
+            (
+                supplier_client.code,
+                supplier_client.name,
+                supplier_client.type,
+                supplier_client.contact_person,
+                supplier_client.phone,
+                supplier_client.email,
+                supplier_client.address,
+                supplier_client.description,
+                supplier_client.status
+            )
+            for supplier_client in supplier_clients
+        ]
+        
+        try:
+            ids = self.execute_insert_many(sql, params_list)
+            for supplier_client, id in zip(supplier_clients, ids):
+                supplier_client.id = id
+            self._clear_cache()
+            logger.info("批量插入供应商/客户信息成功: 记录数=%s", len(ids))
+            return len(ids)
+        except Exception as e:
+            logger.error("批量插入供应商/客户信息失败: %s", e)
+            raise Exception(f"批量插入供应商/客户信息失败: {str(e)}") from e
     
     def update(self, supplier_client: SupplierClient) -> bool:
         """
@@ -90,36 +149,81 @@ class SupplierClientDAO(BaseDAO):
         
         try:
             affected_rows = self.execute_update(sql, params)
-            logger.info(f"更新供应商/客户信息成功: ID={supplier_client.id}")
+            self._clear_cache()
+            logger.info("更新供应商/客户信息成功: ID=%s", supplier_client.id)
             return affected_rows > 0
         except Exception as e:
-            logger.error(f"更新供应商/客户信息失败: {str(e)}")
+            logger.error("更新供应商/客户信息失败: %s", e)
             raise
     
+    def upsert(self, supplier_client: SupplierClient) -> int:
+        """
+        按code插入或更新供应商/客户信息（单条语句完成，无需先查询是否存在）
+        
+        Args:
+            supplier_client: 供应商/客户对象
+            
+        Returns:
+            int: 记录的ID（新插入或已存在）
+        """
+        sql = _SQL_UPSERT
+        params = (
+            supplier_client.code,
+            supplier_client.name,
+            supplier_client.type,
+            supplier_client.contact_person,
+            supplier_client.phone,
+            supplier_client.email,
+            supplier_client.address,
+            supplier_client.description,
+            supplier_client.status
+        )
+        
+        try:
+            supplier_client.id = self.execute_insert(sql, params)
+            self._clear_cache()
+            logger.info("插入或更新供应商/客户信息成功: ID=%s, code=%s", supplier_client.id, supplier_client.code)
+            return supplier_client.id
+        except Exception as e:
+            logger.error("插入或更新供应商/客户信息失败: %s", e)
+            raise Exception(f"插入或更新供应商/客户信息失败: {str(e)}") from e
+    
     def delete(self, id: int) -> bool:
         """
-        删除供应商/客户信息（需要检查是否被引用）
+        删除供应商/客户信息（引用检查与删除在同一条语句中完成）
         
         Args:
             id: 供应商/客户ID
             
         Returns:
-            bool: 是否删除成功
+            bool: 是否删除成功（记录不存在时返回False）
+            
+        Raises:
+            Exception: 供应商/客户已被引用时抛出异常
         """
-        # 先检查是否被引用
-        if self.check_reference(id):
-            raise Exception("该供应商/客户已被出入库记录表引用，无法删除")
-        
-        sql = "DELETE FROM supplier_client WHERE id=%s"
-        params = (id,)
+        sql = _SQL_DELETE
+        params = (id, id)
         
         try:
             affected_rows = self.execute_update(sql, params)
-            logger.info(f"删除供应商/客户信息成功: ID={id}")
-            return affected_rows > 0
         except Exception as e:
-            logger.error(f"删除供应商/客户信息失败: {str(e)}")
+            logger.error("删除供应商/客户信息失败: %s", e)
             raise
+        
+        if affected_rows > 0:
+            self._clear_cache()
+            logger.info("删除供应商/客户信息成功: ID=%s", id)
+            return True
+        
+        # 未删除任何行：记录仍存在说明被引用
+        if self.fetch_one(_SQL_EXISTS, (id,)):
+            raise Exception("该供应商/客户已被出入库记录表引用，无法删除")
+        return False
+    
+    def _clear_cache(self):
+        """清空查询缓存（供应商/客户信息写操作成功后调用）"""
+        self.get_by_type.cache_clear()
+        self.get_all.cache_clear()
     
     def get_by_id(self, id: int) -> Optional[SupplierClient]:
         """
@@ -131,13 +235,10 @@ class SupplierClientDAO(BaseDAO):
         Returns:
             SupplierClient: 供应商/客户对象，如果不存在返回None
         """
-        sql = "SELECT * FROM supplier_client WHERE id=%s"
+        sql = _SQL_GET_BY_ID
         params = (id,)
         
-        result = self.fetch_one(sql, params)
-        if result:
-            return SupplierClient.from_dict(result)
-        return None
+        return self.fetch_one(sql, params, SupplierClient.from_row)
     
     def get_by_code(self, code: str) -> Optional[SupplierClient]:
         """
@@ -149,30 +250,32 @@ class SupplierClientDAO(BaseDAO):
         Returns:
             SupplierClient: 供应商/客户对象，如果不存在返回None
         """
-        sql = "SELECT * FROM supplier_client WHERE code=%s"
+        sql = _SQL_GET_BY_CODE
         params = (code,)
         
-        result = self.fetch_one(sql, params)
-        if result:
-            return SupplierClient.from_dict(result)
-        return None
+        return self.fetch_one(sql, params, SupplierClient.from_row)
     
-    def search_by_name(self, keyword: str) -> List[SupplierClient]:
+    def search_by_name(self, keyword: str, prefix: bool = False) -> List[SupplierClient]:
         """
         根据名称模糊查询
         
         Args:
             keyword: 搜索关键词
+            prefix: 是否只做前缀匹配（可走名称索引，适合输入联想；否则为包含匹配）
             
         Returns:
             list: 供应商/客户对象列表
         """
-        sql = "SELECT * FROM supplier_client WHERE name LIKE %s ORDER BY id"
-        params = (f'%{keyword}%',)
+        if prefix:
+            sql = _SQL_SEARCH_BY_NAME_PREFIX
+            params = (self.like_prefix(keyword),)
+        else:
+            sql = _SQL_SEARCH_BY_NAME
+            params = (self.escape_like(keyword),)
         
-        results = self.fetch_all(sql, params)
-        return [SupplierClient.from_dict(row) for row in results]
+        return self.fetch_all(sql, params, SupplierClient.from_row)
     
+    @cached(ttl=60)
     def get_by_type(self, type_value: int) -> List[SupplierClient]:
         """
         根据类型查询（1-供应商，2-客户）
@@ -183,12 +286,12 @@ class SupplierClientDAO(BaseDAO):
         Returns:
             list: 供应商/客户对象列表
         """
-        sql = "SELECT * FROM supplier_client WHERE type=%s ORDER BY id"
+        sql = _SQL_GET_BY_TYPE
         params = (type_value,)
         
-        results = self.fetch_all(sql, params)
-        return [SupplierClient.from_dict(row) for row in results]
+        return self.fetch_all(sql, params, SupplierClient.from_row)
     
+    @cached(ttl=60)
     def get_all(self) -> List[SupplierClient]:
         """
         查询所有记录
@@ -196,9 +299,8 @@ class SupplierClientDAO(BaseDAO):
         Returns:
             list: 供应商/客户对象列表
         """
-        sql = "SELECT * FROM supplier_client ORDER BY id"
-        results = self.fetch_all(sql)
-        return [SupplierClient.from_dict(row) for row in results]
+        sql = _SQL_GET_ALL
+        return self.fetch_all(sql, row_factory=SupplierClient.from_row)
     
     def get_suppliers(self) -> List[SupplierClient]:
         """
@@ -228,7 +330,9 @@ class SupplierClientDAO(BaseDAO):
         Returns:
             bool: 是否被引用
         """
-        sql = "SELECT COUNT(*) as count FROM stock_record WHERE supplier_client_id=%s"
+        # EXISTS命中第一条即返回，无需统计全部引用记录
+        sql = _SQL_CHECK_REFERENCE
+        
         result = self.fetch_one(sql, (id,))
-        return result['count'] > 0 if result else False
+        return bool(result['referenced']) if result else False
 
@@ -4,17 +4,52 @@
 实现user表的所有数据库操作
 """
 
-from typing import List, Optional
+import copy
+import hashlib
+import hmac
+import secrets
+from typing import List, Optional, Set
 from dao.base_dao import BaseDAO
 from model.user import User
+from utils.cache import TTLCache, cached
 from utils.logger import Logger
 
 logger = Logger.get_logger(__name__)
 
+# SQL语句常量（模块级复用，避免每次调用重复构造）
+# 默认不查询密码列（以NULL占位保持列顺序），只有get_by_username（登录校验）和get_password读取密码
+_COLUMNS = ', '.join('NULL AS password' if column == 'password' else column for column in User.COLUMNS)
+_COLUMNS_WITH_PASSWORD = ', '.join(User.COLUMNS)
+_SQL_INSERT = """
+    INSERT INTO user (username, password, real_name, role, status)
+    VALUES (%s, %s, %s, %s, %s)
+"""
+# 按唯一键username插入或更新；id=LAST_INSERT_ID(id)使更新时lastrowid同样返回已有记录的ID
+_SQL_UPSERT = """
+    INSERT INTO user (username, password, real_name, role, status)
+    VALUES (%s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE id=LAST_INSERT_ID(id), real_name=VALUES(real_name),
+        role=VALUES(role), status=VALUES(status)
+"""
+_SQL_DELETE = "DELETE FROM user WHERE id=%s AND username<>'admin'"
+_SQL_EXISTS = "SELECT 1 AS found FROM user WHERE id=%s LIMIT 1"
+_SQL_GET_BY_ID = f"SELECT {_COLUMNS} FROM user WHERE id=%s"
+_SQL_GET_BY_USERNAME = f"SELECT {_COLUMNS_WITH_PASSWORD} FROM user WHERE username=%s"
+_SQL_GET_ALL = f"SELECT {_COLUMNS} FROM user ORDER BY id"
+_SQL_GET_ACTIVE_USERS = f"SELECT {_COLUMNS} FROM user WHERE status=1 ORDER BY id"
+_SQL_GET_PASSWORD = "SELECT password FROM user WHERE id=%s"
+_SQL_GET_LOGIN_STATE = "SELECT status, password FROM user WHERE id=%s"
+_SQL_GET_EXISTING_USERNAMES = "SELECT username FROM user WHERE username IN ({placeholders})"
+
 
 class UserDAO(BaseDAO):
     """用户DAO类"""
     
+    # 登录校验结果缓存：HMAC(进程内随机密钥, 用户名+明文密码) -> 校验通过的用户，
+    # 同一会话内重复校验（解锁、重新授权）跳过密码哈希比对；用户信息写操作后清空
+    _verify_cache = TTLCache(maxsize=16, ttl=300)
+    _verify_key = secrets.token_bytes(32)
+    
     def insert(self, user: User) -> int:
         """
         插入用户信息
@@ -25,10 +60,7 @@ class UserDAO(BaseDAO):
         Returns:
             int: 插入记录的ID
         """
-        sql = """
-            INSERT INTO user (username, password, real_name, role, status)
-            VALUES (%s, %s, %s, %s, %s)
-        """
+        sql = _SQL_INSERT
         params = (
             user.username,
             user.password,
@@ -37,23 +69,47 @@ class UserDAO(BaseDAO):
             user.status
         )
         
-        connection = None
         try:
-            connection = self.db_connection.get_connection()
-            with connection.cursor() as cursor:
-                cursor.execute(sql, params)
-                connection.commit()
-                user.id = cursor.lastrowid
-                logger.info(f"插入用户信息成功: ID={user.id}, username={user.username}")
-                return user.id
+            user.id = self.execute_insert(sql, params)
+            self._clear_cache()
+            logger.info("插入用户信息成功: ID=%s, username=%s", user.id, user.username)
+            return user.id
+        except Exception as e:
+            logger.error("插入用户信息失败: %s", e)
+            raise Exception(f"插入用户信息失败: {str(e)}") from e
+    
+    def insert_many(self, users: List[User]) -> int:
+        """
+        批量插入用户信息
+        
+        Args:
+            users: 用户对象列表
+            
+        Returns:
+            int: 插入的记录数（插入成功后回填各对象的id）
+        """
+        sql = _SQL_INSERT
+        params_list = [
+            (
+                user.username,
+                user.password,
+                user.real_name,
+                user.role,
+                user.status
+            )
+            for user in users
+        ]
+        
+        try:
+            ids = self.execute_insert_many(sql, params_list)
+            for user, id in zip(users, ids):
+                user.id = id
+            self._clear_cache()
+            logger.info("批量插入用户信息成功: 记录数=%s", len(ids))
+            return len(ids)
         except Exception as e:
-            if connection:
-                connection.rollback()
-            logger.error(f"插入用户信息失败: {str(e)}")
-            raise Exception(f"插入用户信息失败: {str(e)}")
-        finally:
-            if connection:
-                self.db_connection.close_connection(connection)
+            logger.error("批量插入用户信息失败: %s", e)
+            raise Exception(f"批量插入用户信息失败: {str(e)}") from e
     
     def update(self, user: User) -> bool:
         """
@@ -80,12 +136,41 @@ class UserDAO(BaseDAO):
         
         try:
             affected_rows = self.execute_update(sql, params)
-            logger.info(f"更新用户信息成功: ID={user.id}")
+            self._clear_cache()
+            logger.info("更新用户信息成功: ID=%s", user.id)
             return affected_rows > 0
         except Exception as e:
-            logger.error(f"更新用户信息失败: {str(e)}")
+            logger.error("更新用户信息失败: %s", e)
             raise
     
+    def upsert(self, user: User) -> int:
+        """
+        按username插入或更新用户信息（不更新密码）（单条语句完成，无需先查询是否存在）
+        
+        Args:
+            user: 用户对象
+            
+        Returns:
+            int: 记录的ID（新插入或已存在）
+        """
+        sql = _SQL_UPSERT
+        params = (
+            user.username,
+            user.password,
+            user.real_name,
+            user.role,
+            user.status
+        )
+        
+        try:
+            user.id = self.execute_insert(sql, params)
+            self._clear_cache()
+            logger.info("插入或更新用户信息成功: ID=%s, username=%s", user.id, user.username)
+            return user.id
+        except Exception as e:
+            logger.error("插入或更新用户信息失败: %s", e)
+            raise Exception(f"插入或更新用户信息失败: {str(e)}") from e
+    
     def update_password(self, id: int, new_password: str) -> bool:
         """
         更新密码
@@ -102,41 +187,53 @@ class UserDAO(BaseDAO):
         
         try:
             affected_rows = self.execute_update(sql, params)
-            logger.info(f"更新用户密码成功: ID={id}")
+            self._clear_cache()
+            logger.info("更新用户密码成功: ID=%s", id)
             return affected_rows > 0
         except Exception as e:
-            logger.error(f"更新用户密码失败: {str(e)}")
+            logger.error("更新用户密码失败: %s", e)
             raise
     
     def delete(self, id: int) -> bool:
         """
-        删除用户信息（需要检查是否为默认管理员）
+        删除用户信息（默认管理员不删除，检查与删除在同一条语句中完成）
         
         Args:
             id: 用户ID
             
         Returns:
-            bool: 是否删除成功
+            bool: 是否删除成功（记录不存在时返回False）
+            
+        Raises:
+            Exception: 删除默认管理员时抛出异常
         """
-        # 先检查是否为默认管理员
-        user = self.get_by_id(id)
-        if user and user.username == 'admin':
-            raise Exception("默认管理员不能删除")
-        
-        sql = "DELETE FROM user WHERE id=%s"
+        sql = _SQL_DELETE
         params = (id,)
         
         try:
             affected_rows = self.execute_update(sql, params)
-            logger.info(f"删除用户信息成功: ID={id}")
-            return affected_rows > 0
         except Exception as e:
-            logger.error(f"删除用户信息失败: {str(e)}")
+            logger.error("删除用户信息失败: %s", e)
             raise
+        
+        if affected_rows > 0:
+            self._clear_cache()
+            logger.info("删除用户信息成功: ID=%s", id)
+            return True
+        
+        # 未删除任何行：记录仍存在说明是默认管理员
+        if self.fetch_one(_SQL_EXISTS, params):
+            raise Exception("默认管理员不能删除")
+        return False
+    
+    def _clear_cache(self):
+        """清空查询缓存（用户信息写操作成功后调用）"""
+        self.get_by_username.cache_clear()
+        self._verify_cache.clear()
     
     def get_by_id(self, id: int) -> Optional[User]:
         """
-        根据ID查询
+        根据ID查询（不含密码）
         
         Args:
             id: 用户ID
@@ -144,17 +241,15 @@ class UserDAO(BaseDAO):
         Returns:
             User: 用户对象，如果不存在返回None
         """
-        sql = "SELECT * FROM user WHERE id=%s"
+        sql = _SQL_GET_BY_ID
         params = (id,)
         
-        result = self.fetch_one(sql, params)
-        if result:
-            return User.from_dict(result)
-        return None
+        return self.fetch_one(sql, params, User.from_row)
     
+    @cached(ttl=60)
     def get_by_username(self, username: str) -> Optional[User]:
         """
-        根据用户名查询
+        根据用户名查询（含密码，供登录校验使用）
         
         Args:
             username: 用户名
@@ -162,35 +257,64 @@ class UserDAO(BaseDAO):
         Returns:
             User: 用户对象，如果不存在返回None
         """
-        sql = "SELECT * FROM user WHERE username=%s"
+        sql = _SQL_GET_BY_USERNAME
         params = (username,)
         
+        return self.fetch_one(sql, params, User.from_row)
+    
+    def get_password(self, id: int) -> Optional[str]:
+        """
+        查询用户的加密密码
+        
+        Args:
+            id: 用户ID
+            
+        Returns:
+            str: 加密后的密码，如果用户不存在返回None
+        """
+        sql = _SQL_GET_PASSWORD
+        params = (id,)
+        
         result = self.fetch_one(sql, params)
-        if result:
-            return User.from_dict(result)
-        return None
+        return result['password'] if result else None
+    
+    def get_existing_usernames(self, usernames: List[str]) -> Set[str]:
+        """
+        查询给定用户名中已存在的用户名（一次IN查询，供批量导入前检查唯一性）
+        
+        Args:
+            usernames: 用户名列表
+            
+        Returns:
+            set: 已存在的用户名集合
+        """
+        if not usernames:
+            return set()
+        
+        sql = _SQL_GET_EXISTING_USERNAMES.format(placeholders=', '.join(['%s'] * len(usernames)))
+        params = tuple(usernames)
+        
+        return {row['username'] for row in self.fetch_all(sql, params)}
     
     def get_all(self) -> List[User]:
         """
-        查询所有用户
+        查询所有用户（不含密码）
         
         Returns:
             list: 用户对象列表
         """
-        sql = "SELECT * FROM user ORDER BY id"
-        results = self.fetch_all(sql)
-        return [User.from_dict(row) for row in results]
+        sql = _SQL_GET_ALL
+        return self.fetch_all(sql, row_factory=User.from_row)
     
     def get_active_users(self) -> List[User]:
         """
-        查询所有启用的用户
+        查询所有启用的用户（不含密码）
         
         Returns:
             list: 用户对象列表
         """
-        sql = "SELECT * FROM user WHERE status=1 ORDER BY id"
-        results = self.fetch_all(sql)
-        return [User.from_dict(row) for row in results]
+        sql = _SQL_GET_ACTIVE_USERS
+        return self.fetch_all(sql, row_factory=User.from_row)
     
     def verify_login(self, username: str, password: str) -> Optional[User]:
         """
@@ -203,6 +327,18 @@ class UserDAO(BaseDAO):
         Returns:
             User: 用户对象，如果验证失败返回None
         """
+        # 只缓存完整校验通过的结果，首次登录始终走完整的密码校验
+        cache_key = hmac.new(self._verify_key, f"{username}\0{password}".encode('utf-8'), hashlib.sha256).digest()
+        cached_user = self._verify_cache.get(cache_key)
+        if cached_user is not None:
+            # 命中时不读缓存重新查询状态和密码哈希：用户仍启用且密码未被修改才跳过密码哈希比对
+            state = self.fetch_one(_SQL_GET_LOGIN_STATE, (cached_user.id,))
+            if state and state['status'] == 1 and state['password'] == cached_user.password:
+                return copy.copy(cached_user)
+            # 其他客户端已禁用用户或修改密码：丢弃本进程的缓存结果后完整校验
+            self._verify_cache.pop(cache_key)
+            self.get_by_username.cache_clear()
+        
         user = self.get_by_username(username)
         if not user:
             return None
@@ -215,5 +351,15 @@ class UserDAO(BaseDAO):
         if not user.is_active():
             return None
         
+        # 旧格式密码（如MD5）在登录成功时升级为当前加密方式
+        if User.needs_rehash(user.password):
+            try:
+                user.password = User.encrypt_password(password)
+                self.update_password(user.id, user.password)
+                logger.info("用户密码已升级加密方式: ID=%s", user.id)
+            except Exception as e:
+                logger.warning("升级用户密码加密方式失败: ID=%s, 错误: %s", user.id, e)
+        
+        self._verify_cache.set(cache_key, copy.copy(user))
         return user
 
@@ -4,13 +4,55 @@
 实现warehouse表的所有数据库操作
 """
 
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Set
 from dao.base_dao import BaseDAO
 from model.warehouse import Warehouse
+from utils.cache import cached
 from utils.logger import Logger
 
 logger = Logger.get_logger(__name__)
 
+# 依赖的索引（见 sql/init_database.sql）：
+#   warehouse:    idx_warehouse_name(warehouse_name) -> search_by_name(prefix=True)
+#   inventory:    idx_warehouse_id_inv(warehouse_id) -> delete / check_reference
+#   stock_record: idx_warehouse_date(warehouse_id, record_date) -> delete / check_reference
+
+# SQL语句常量（模块级复用，避免每次调用重复构造）
+_COLUMNS = ', '.join(Warehouse.COLUMNS)
+_SQL_INSERT = """
+    INSERT INTO warehouse (warehouse_code, warehouse_name, address, manager, 
+                          phone, capacity, description, status)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+"""
+# 按唯一键warehouse_code插入或更新；id=LAST_INSERT_ID(id)使更新时lastrowid同样返回已有记录的ID
+_SQL_UPSERT = """
+    INSERT INTO warehouse (warehouse_code, warehouse_name, address, manager, 
+                          phone, capacity, description, status)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE id=LAST_INSERT_ID(id), warehouse_name=VALUES(warehouse_name),
+        address=VALUES(address), manager=VALUES(manager), phone=VALUES(phone),
+        capacity=VALUES(capacity), description=VALUES(description), status=VALUES(status)
+"""
+_SQL_CHECK_REFERENCE = """
+    SELECT EXISTS(SELECT 1 FROM inventory WHERE warehouse_id=%s)
+        OR EXISTS(SELECT 1 FROM stock_record WHERE warehouse_id=%s) AS referenced
+"""
+# 引用检查与删除在同一条语句中完成（被引用时不删除任何行）
+_SQL_DELETE = """
+    DELETE FROM warehouse WHERE id=%s
+        AND NOT EXISTS (SELECT 1 FROM inventory WHERE warehouse_id=%s)
+        AND NOT EXISTS (SELECT 1 FROM stock_record WHERE warehouse_id=%s)
+"""
+_SQL_EXISTS = "SELECT 1 AS found FROM warehouse WHERE id=%s LIMIT 1"
+_SQL_GET_BY_ID = f"SELECT {_COLUMNS} FROM warehouse WHERE id=%s"
+_SQL_GET_BY_IDS = f"SELECT {_COLUMNS} FROM warehouse WHERE id IN ({{placeholders}})"
+_SQL_LOCK_ACTIVE_IDS = "SELECT id FROM warehouse WHERE id IN ({placeholders}) AND status=1 LOCK IN SHARE MODE"
+_SQL_GET_BY_CODE = f"SELECT {_COLUMNS} FROM warehouse WHERE warehouse_code=%s"
+_SQL_SEARCH_BY_NAME = f"SELECT {_COLUMNS} FROM warehouse WHERE warehouse_name LIKE CONCAT('%%', %s, '%%') ORDER BY id"
+_SQL_SEARCH_BY_NAME_PREFIX = f"SELECT {_COLUMNS} FROM warehouse WHERE warehouse_name LIKE %s ORDER BY warehouse_name, id"
+_SQL_GET_ALL = f"SELECT {_COLUMNS} FROM warehouse ORDER BY id"
+_SQL_GET_ACTIVE_WAREHOUSES = f"SELECT {_COLUMNS} FROM warehouse WHERE status=1 ORDER BY id"
+
 
 class WarehouseDAO(BaseDAO):
     """仓库信息DAO类"""
@@ -25,11 +67,7 @@ class WarehouseDAO(BaseDAO):
         Returns:
             int: 插入记录的ID
         """
-        sql = """
-            INSERT INTO warehouse (warehouse_code, warehouse_name, address, manager, 
-                                  phone, capacity, description, status)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """
+        sql = _SQL_INSERT
         params = (
             warehouse.warehouse_code,
             warehouse.warehouse_name,
@@ -41,23 +79,50 @@ class WarehouseDAO(BaseDAO):
             warehouse.status
         )
         
-        connection = None
         try:
-            connection = self.db_connection.get_connection()
-            with connection.cursor() as cursor:
-                cursor.execute(sql, params)
-                connection.commit()
-                warehouse.id = cursor.lastrowid
-                logger.info(f"插入仓库信息成功: ID={warehouse.id}, warehouse_code={warehouse.warehouse_code}")
-                return warehouse.id
+            warehouse.id = self.execute_insert(sql, params)
+            self._clear_cache()
+            logger.info("插入仓库信息成功: ID=%s, warehouse_code=%s", warehouse.id, warehouse.warehouse_code)
+            return warehouse.id
+        except Exception as e:
+            logger.error("插入仓库信息失败: %s", e)
+            raise Exception(f"插入仓库信息失败: {str(e)}") from e
+    
+    def insert_many(self, warehouses: List[Warehouse]) -> int:
+        """
+        批量插入仓库信息
+        
+        Args:
+            warehouses: 仓库对象列表
+            
+        Returns:
+            int: 插入的记录数（插入成功后回填各对象的id）
+        """
+        sql = _SQL_INSERT
+        params_list = [
+            (
+                warehouse.warehouse_code,
+                warehouse.warehouse_name,
+                warehouse.address,
+                warehouse.manager,
+                warehouse.phone,
+                warehouse.capacity,
+                warehouse.description,
+                warehouse.status
+            )
+            for warehouse in warehouses
+        ]
+        
+        try:
+            ids = self.execute_insert_many(sql, params_list)
+            for warehouse, id in zip(warehouses, ids):
+                warehouse.id = id
+            self._clear_cache()
+            logger.info("批量插入仓库信息成功: 记录数=%s", len(ids))
+            return len(ids)
         except Exception as e:
-            if connection:
-                connection.rollback()
-            logger.error(f"插入仓库信息失败: {str(e)}")
-            raise Exception(f"插入仓库信息失败: {str(e)}")
-        finally:
-            if connection:
-                self.db_connection.close_connection(connection)
+            logger.error("批量插入仓库信息失败: %s", e)
+            raise Exception(f"批量插入仓库信息失败: {str(e)}") from e
     
     def update(self, warehouse: Warehouse) -> bool:
         """
@@ -88,36 +153,80 @@ class WarehouseDAO(BaseDAO):
         
         try:
             affected_rows = self.execute_update(sql, params)
-            logger.info(f"更新仓库信息成功: ID={warehouse.id}")
+            self._clear_cache()
+            logger.info("更新仓库信息成功: ID=%s", warehouse.id)
             return affected_rows > 0
         except Exception as e:
-            logger.error(f"更新仓库信息失败: {str(e)}")
+            logger.error("更新仓库信息失败: %s", e)
             raise
     
+    def upsert(self, warehouse: Warehouse) -> int:
+        """
+        按warehouse_code插入或更新仓库信息（单条语句完成，无需先查询是否存在）
+        
+        Args:
+            warehouse: 仓库对象
+            
+        Returns:
+            int: 记录的ID（新插入或已存在）
+        """
+        sql = _SQL_UPSERT
+        params = (
+            warehouse.warehouse_code,
+            warehouse.warehouse_name,
+            warehouse.address,
+            warehouse.manager,
+            warehouse.phone,
+            warehouse.capacity,
+            warehouse.description,
+            warehouse.status
+        )
+        
+        try:
+            warehouse.id = self.execute_insert(sql, params)
+            self._clear_cache()
+            logger.info("插入或更新仓库信息成功: ID=%s, warehouse_code=%s", warehouse.id, warehouse.warehouse_code)
+            return warehouse.id
+        except Exception as e:
+            logger.error("插入或更新仓库信息失败: %s", e)
+            raise Exception(f"插入或更新仓库信息失败: {str(e)}") from e
+    
     def delete(self, id: int) -> bool:
         """
-        删除仓库信息（需要检查是否被引用）
+        删除仓库信息（引用检查与删除在同一条语句中完成）
         
         Args:
             id: 仓库ID
             
         Returns:
-            bool: 是否删除成功
+            bool: 是否删除成功（记录不存在时返回False）
+            
+        Raises:
+            Exception: 仓库已被引用时抛出异常
         """
-        # 先检查是否被引用
-        if self.check_reference(id):
-            raise Exception("该仓库已被库存表或出入库记录表引用，无法删除")
-        
-        sql = "DELETE FROM warehouse WHERE id=%s"
-        params = (id,)
+        sql = _SQL_DELETE
+        params = (id, id, id)
         
         try:
             affected_rows = self.execute_update(sql, params)
-            logger.info(f"删除仓库信息成功: ID={id}")
-            return affected_rows > 0
         except Exception as e:
-            logger.error(f"删除仓库信息失败: {str(e)}")
+            logger.error("删除仓库信息失败: %s", e)
             raise
+        
+        if affected_rows > 0:
+            self._clear_cache()
+            logger.info("删除仓库信息成功: ID=%s", id)
+            return True
+        
+        # 未删除任何行：记录仍存在说明被引用
+        if self.fetch_one(_SQL_EXISTS, (id,)):
+            raise Exception("该仓库已被库存表或出入库记录表引用，无法删除")
+        return False
+    
+    def _clear_cache(self):
+        """清空查询缓存（仓库信息写操作成功后调用）"""
+        self.get_all.cache_clear()
+        self.get_active_warehouses.cache_clear()
     
     def get_by_id(self, id: int) -> Optional[Warehouse]:
         """
@@ -129,13 +238,48 @@ class WarehouseDAO(BaseDAO):
         Returns:
             Warehouse: 仓库对象，如果不存在返回None
         """
-        sql = "SELECT * FROM warehouse WHERE id=%s"
+        sql = _SQL_GET_BY_ID
         params = (id,)
         
-        result = self.fetch_one(sql, params)
-        if result:
-            return Warehouse.from_dict(result)
-        return None
+        return self.fetch_one(sql, params, Warehouse.from_row)
+    
+    def get_by_ids(self, ids: Iterable[int]) -> Dict[int, Warehouse]:
+        """
+        根据ID批量查询（一次IN查询，替代逐条get_by_id）
+        
+        Args:
+            ids: 仓库ID集合（重复ID只查询一次）
+            
+        Returns:
+            dict: 仓库ID -> 仓库对象（不存在的ID不出现在结果中）
+        """
+        ids = tuple(set(ids))
+        if not ids:
+            return {}
+        
+        sql = _SQL_GET_BY_IDS.format(placeholders=', '.join(['%s'] * len(ids)))
+        
+        return {warehouse.id: warehouse for warehouse in self.fetch_all(sql, ids, Warehouse.from_row)}
+    
+    def lock_active_ids(self, ids: Iterable[int]) -> Set[int]:
+        """
+        查询给定ID中启用状态的仓库并加共享锁（LOCK IN SHARE MODE）
+        
+        须在transaction中调用：锁持有到事务结束，期间其他连接不能修改这些仓库的状态
+        
+        Args:
+            ids: 仓库ID集合
+            
+        Returns:
+            set: 启用状态的仓库ID集合
+        """
+        ids = tuple(set(ids))
+        if not ids:
+            return set()
+        
+        sql = _SQL_LOCK_ACTIVE_IDS.format(placeholders=', '.join(['%s'] * len(ids)))
+        
+        return {row['id'] for row in self.fetch_all(sql, ids)}
     
     def get_by_code(self, warehouse_code: str) -> Optional[Warehouse]:
         """
@@ -147,30 +291,32 @@ class WarehouseDAO(BaseDAO):
         Returns:
             Warehouse: 仓库对象，如果不存在返回None
         """
-        sql = "SELECT * FROM warehouse WHERE warehouse_code=%s"
+        sql = _SQL_GET_BY_CODE
         params = (warehouse_code,)
         
-        result = self.fetch_one(sql, params)
-        if result:
-            return Warehouse.from_dict(result)
-        return None
+        return self.fetch_one(sql, params, Warehouse.from_row)
     
-    def search_by_name(self, keyword: str) -> List[Warehouse]:
+    def search_by_name(self, keyword: str, prefix: bool = False) -> List[Warehouse]:
         """
         根据名称模糊查询
         
         Args:
             keyword: 搜索关键词
+            prefix: 是否只做前缀匹配（可走名称索引，适合输入联想；否则为包含匹配）
             
         Returns:
             list: 仓库对象列表
         """
-        sql = "SELECT * FROM warehouse WHERE warehouse_name LIKE %s ORDER BY id"
-        params = (f'%{keyword}%',)
+        if prefix:
+            sql = _SQL_SEARCH_BY_NAME_PREFIX
+            params = (self.like_prefix(keyword),)
+        else:
+            sql = _SQL_SEARCH_BY_NAME
+            params = (self.escape_like(keyword),)
         
-        results = self.fetch_all(sql, params)
-        return [Warehouse.from_dict(row) for row in results]
+        return self.fetch_all(sql, params, Warehouse.from_row)
     
+    @cached(ttl=60)
     def get_all(self) -> List[Warehouse]:
         """
         查询所有记录
@@ -178,10 +324,10 @@ class WarehouseDAO(BaseDAO):
         Returns:
             list: 仓库对象列表
         """
-        sql = "SELECT * FROM warehouse ORDER BY id"
-        results = self.fetch_all(sql)
-        return [Warehouse.from_dict(row) for row in results]
+        sql = _SQL_GET_ALL
+        return self.fetch_all(sql, row_factory=Warehouse.from_row)
     
+    @cached(ttl=60)
     def get_active_warehouses(self) -> List[Warehouse]:
         """
         查询所有启用的仓库
@@ -189,9 +335,8 @@ class WarehouseDAO(BaseDAO):
         Returns:
             list: 仓库对象列表
         """
-        sql = "SELECT * FROM warehouse WHERE status=1 ORDER BY id"
-        results = self.fetch_all(sql)
-        return [Warehouse.from_dict(row) for row in results]
+        sql = _SQL_GET_ACTIVE_WAREHOUSES
+        return self.fetch_all(sql, row_factory=Warehouse.from_row)
     
     def check_reference(self, id: int) -> bool:
         """
@@ -203,16 +348,10 @@ class WarehouseDAO(BaseDAO):
         Returns:
             bool: 是否被引用
         """
-        # 检查是否被inventory表引用
-        sql1 = "SELECT COUNT(*) as count FROM inventory WHERE warehouse_id=%s"
-        result1 = self.fetch_one(sql1, (id,))
-        
-        # 检查是否被stock_record表引用
-        sql2 = "SELECT COUNT(*) as count FROM stock_record WHERE warehouse_id=%s"
-        result2 = self.fetch_one(sql2, (id,))
+        # 检查是否被inventory表或stock_record表引用（一次查询，EXISTS命中第一条即返回）
+        sql = _SQL_CHECK_REFERENCE
+        params = (id, id)
         
-        count1 = result1['count'] if result1 else 0
-        count2 = result2['count'] if result2 else 0
-        
-        return (count1 + count2) > 0
+        result = self.fetch_one(sql, params)
+        return bool(result['referenced']) if result else False
 
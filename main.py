@@ -4,13 +4,13 @@
 """
 
 import sys
-import traceback
-from config.database import validate_config
-from dao.db_connection import DatabaseConnection
 from utils.logger import Logger
 
 logger = Logger.get_logger(__name__)
 
+# 启动时并发预热的数据库连接数（同时作为数据库连接测试）
+_WARM_CONNECTIONS = 3
+
 
 def init_system():
     """
@@ -20,6 +20,10 @@ def init_system():
         bool: 初始化是否成功
     """
     try:
+        # 延迟导入（pymysql/DBUtils等），使启动提示在导入前即可输出
+        from config.database import validate_config
+        from dao.db_connection import DatabaseConnection
+        
         # 1. 加载配置文件
         logger.info("正在加载配置文件...")
         validate_config()
@@ -28,20 +32,25 @@ def init_system():
         # 2. 初始化日志系统（已在Logger类中自动初始化）
         logger.info("日志系统初始化成功")
         
-        # 3. 测试数据库连接
+        # 3. 创建连接池并并发预热连接（每个连接执行SELECT 1，同时完成数据库连接测试）
+        logger.info("正在初始化数据库连接池...")
+        DatabaseConnection.init_pool()
+        
         logger.info("正在测试数据库连接...")
-        db_connection = DatabaseConnection()
-        if db_connection.test_connection():
+        warmed = DatabaseConnection.warm_pool(_WARM_CONNECTIONS)
+        if warmed == _WARM_CONNECTIONS:
             logger.info("数据库连接测试成功")
             return True
+        elif warmed > 0:
+            logger.warning("数据库连接部分失败: %s/%s", warmed, _WARM_CONNECTIONS)
+            return True
         else:
             logger.error("数据库连接测试失败")
             print("错误：数据库连接失败，请检查数据库配置和连接状态")
             return False
             
     except Exception as e:
-        logger.error(f"系统初始化失败: {str(e)}")
-        logger.error(traceback.format_exc())
+        logger.exception("系统初始化失败: %s", e)
         print(f"错误：系统初始化失败 - {str(e)}")
         return False
 
@@ -105,8 +114,7 @@ def main():
         logger.info("用户中断程序")
         print("\n程序已退出")
     except Exception as e:
-        logger.error(f"程序运行出错: {str(e)}")
-        logger.error(traceback.format_exc())
+        logger.exception("程序运行出错: %s", e)
         print(f"错误：程序运行出错 - {str(e)}")
         sys.exit(1)
 
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+模型字段转换工具
+提供模型from_dict使用的字段类型转换函数，以及按模型字段生成的专用from_dict构造函数
+"""
+
+import inspect
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Optional
+
+
+def as_decimal(value: Any) -> Optional[Decimal]:
+    """
+    将字段值转换为Decimal（数据库驱动返回的Decimal和None直接返回，不做转换）
+    
+    Args:
+        value: 字段值（Decimal、str、int、float或None）
+        
+    Returns:
+        Decimal: 转换后的值，value为None时返回None
+    """
+    if value is None or type(value) is Decimal:
+        return value
+    # float按最短十进制表示转换，避免二进制误差（如0.1 -> Decimal('0.1')）
+    return Decimal(repr(value)) if type(value) is float else Decimal(value)
+
+
+def as_datetime(value: Any) -> Optional[datetime]:
+    """
+    将字段值转换为datetime（数据库驱动返回的datetime和None直接返回，不做转换）
+    
+    Args:
+        value: 字段值（datetime、ISO格式字符串如to_dict输出的'2024-01-01 08:00:00'，或None）
+        
+    Returns:
+        datetime: 转换后的值，value为None或空字符串时返回None
+    """
+    if type(value) is str:
+        # fromisoformat为C实现，比strptime按格式串解析快一个数量级
+        return datetime.fromisoformat(value) if value else None
+    return value
+
+
+def compile_from_dict(cls: type, converters: Optional[Dict[str, Callable[[Any], Any]]] = None) -> Callable[[Dict[str, Any]], Any]:
+    """
+    按模型的COLUMNS和__init__默认值生成专用的字典构造函数（模型类定义后调用一次）
+    
+    生成的函数逐字段直接取值并按位置调用构造函数，不再先过滤出新字典再按关键字传参；
+    字典中没有的字段使用__init__的默认值，多余的键（如联表查询的额外列）被忽略
+    
+    Args:
+        cls: 模型类（需定义COLUMNS，且__init__参数顺序与COLUMNS一致）
+        converters: 字段名 -> 类型转换函数（只对字典中存在的字段调用）
+        
+    Returns:
+        function: 接收字典、返回模型对象的构造函数
+    """
+    converters = converters or {}
+    parameters = inspect.signature(cls.__init__).parameters
+    namespace = {'cls': cls}
+    args = []
+    for index, column in enumerate(cls.COLUMNS):
+        default = f'_default_{index}'
+        namespace[default] = parameters[column].default
+        if column in converters:
+            convert = f'_convert_{index}'
+            namespace[convert] = converters[column]
+            args.append(f"{convert}(data[{column!r}]) if {column!r} in data else {default}")
+        else:
+            args.append(f"data.get({column!r}, {default})")
+    
+    source = "def from_dict(data):\n    return cls(\n        " + ",\n        ".join(args) + ")\n"
+    exec(source, namespace)
+    return namespace['from_dict']
+
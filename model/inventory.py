@@ -5,17 +5,24 @@
 """
 
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Sequence
+from model.converters import as_datetime, compile_from_dict
 
 
 class Inventory:
     """库存模型类"""
     
+    # 表字段（与__init__参数顺序一致，按位置构造对象时使用）
+    COLUMNS = ('id', 'warehouse_id', 'product_id', 'quantity', 'last_in_date', 'last_out_date',
+               'version', 'update_time')
+    __slots__ = COLUMNS
+    
     def __init__(self, id: Optional[int] = None, warehouse_id: int = None,
                  product_id: int = None, quantity: int = 0,
                  last_in_date: Optional[datetime] = None,
                  last_out_date: Optional[datetime] = None,
-                 update_time: Optional[datetime] = None, **kwargs):
+                 version: int = 0,
+                 update_time: Optional[datetime] = None):
         """
         初始化库存对象
         
@@ -26,6 +33,7 @@ class Inventory:
             quantity: 库存数量
             last_in_date: 最后入库日期
             last_out_date: 最后出库日期
+            version: 版本号（每次变更库存数量时递增）
             update_time: 更新时间
         """
         self.id = id
@@ -34,6 +42,7 @@ class Inventory:
         self.quantity = quantity
         self.last_in_date = last_in_date
         self.last_out_date = last_out_date
+        self.version = version
         self.update_time = update_time
     
     @classmethod
@@ -47,7 +56,37 @@ class Inventory:
         Returns:
             Inventory: 库存对象
         """
-        return cls(**data)
+        # 逐字段取值的专用构造函数见类定义后的compile_from_dict（忽略联表查询带来的额外列）
+        return cls._from_dict(data)
+    
+    @classmethod
+    def from_row(cls, row: tuple) -> 'Inventory':
+        """
+        从元组行创建对象（字段顺序与COLUMNS一致）
+        
+        Args:
+            row: 按COLUMNS顺序查询得到的元组
+            
+        Returns:
+            Inventory: 库存对象
+        """
+        return cls(*row)
+    
+    @classmethod
+    def from_rows(cls, rows: Sequence[tuple], columns: Optional[Sequence[str]] = None) -> List['Inventory']:
+        """
+        从元组行批量创建对象
+        
+        Args:
+            rows: 元组行列表
+            columns: 行中各列对应的字段名（默认与COLUMNS一致，此时直接按位置构造）
+            
+        Returns:
+            list: 库存对象列表
+        """
+        if columns is None or tuple(columns) == cls.COLUMNS:
+            return [cls(*row) for row in rows]
+        return [cls(**dict(zip(columns, row))) for row in rows]
     
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -61,9 +100,10 @@ class Inventory:
             'warehouse_id': self.warehouse_id,
             'product_id': self.product_id,
             'quantity': self.quantity,
-            'last_in_date': self.last_in_date.strftime('%Y-%m-%d %H:%M:%S') if self.last_in_date else None,
-            'last_out_date': self.last_out_date.strftime('%Y-%m-%d %H:%M:%S') if self.last_out_date else None,
-            'update_time': self.update_time.strftime('%Y-%m-%d %H:%M:%S') if self.update_time else None
+            'last_in_date': self.last_in_date.isoformat(sep=' ', timespec='seconds') if self.last_in_date else None,
+            'last_out_date': self.last_out_date.isoformat(sep=' ', timespec='seconds') if self.last_out_date else None,
+            'version': self.version,
+            'update_time': self.update_time.isoformat(sep=' ', timespec='seconds') if self.update_time else None
         }
     
     def validate(self) -> tuple:
@@ -89,3 +129,7 @@ class Inventory:
     def __repr__(self):
         return f"<Inventory(id={self.id}, warehouse_id={self.warehouse_id}, product_id={self.product_id}, quantity={self.quantity})>"
 
+
+# 按字段生成的专用from_dict构造函数（类定义完成后生成一次；时间字段可接收to_dict输出的ISO格式字符串）
+Inventory._from_dict = staticmethod(compile_from_dict(Inventory, {'last_in_date': as_datetime, 'last_out_date': as_datetime, 'update_time': as_datetime}))
+
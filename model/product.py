@@ -5,20 +5,27 @@
 """
 
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Sequence
 from decimal import Decimal
+from model.converters import as_datetime, as_decimal, compile_from_dict
 
 
 class Product:
     """货品信息模型类"""
     
+    # 表字段（与__init__参数顺序一致，按位置构造对象时使用）
+    COLUMNS = ('id', 'product_code', 'product_name', 'category_id', 'unit_id', 'specification',
+               'price', 'min_stock', 'max_stock', 'description', 'status', 'create_time',
+               'update_time')
+    __slots__ = COLUMNS
+    
     def __init__(self, id: Optional[int] = None, product_code: str = None,
                  product_name: str = None, category_id: Optional[int] = None,
                  unit_id: Optional[int] = None, specification: Optional[str] = None,
                  price: Optional[Decimal] = None, min_stock: int = 0,
                  max_stock: int = 0, description: Optional[str] = None,
                  status: int = 1, create_time: Optional[datetime] = None,
-                 update_time: Optional[datetime] = None, **kwargs):
+                 update_time: Optional[datetime] = None):
         """
         初始化货品对象
         
@@ -62,14 +69,37 @@ class Product:
         Returns:
             Product: 货品对象
         """
-        # 处理price字段，可能是字符串或Decimal
-        if 'price' in data and data['price'] is not None:
-            if isinstance(data['price'], str):
-                data['price'] = Decimal(data['price'])
-            elif isinstance(data['price'], (int, float)):
-                data['price'] = Decimal(str(data['price']))
+        # 逐字段取值的专用构造函数见类定义后的compile_from_dict（price字段可能是字符串、数值或Decimal）
+        return cls._from_dict(data)
+    
+    @classmethod
+    def from_row(cls, row: tuple) -> 'Product':
+        """
+        从元组行创建对象（字段顺序与COLUMNS一致）
         
-        return cls(**data)
+        Args:
+            row: 按COLUMNS顺序查询得到的元组
+            
+        Returns:
+            Product: 货品对象
+        """
+        return cls(*row)
+    
+    @classmethod
+    def from_rows(cls, rows: Sequence[tuple], columns: Optional[Sequence[str]] = None) -> List['Product']:
+        """
+        从元组行批量创建对象
+        
+        Args:
+            rows: 元组行列表
+            columns: 行中各列对应的字段名（默认与COLUMNS一致，此时直接按位置构造）
+            
+        Returns:
+            list: 货品对象列表
+        """
+        if columns is None or tuple(columns) == cls.COLUMNS:
+            return [cls(*row) for row in rows]
+        return [cls(**dict(zip(columns, row))) for row in rows]
     
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -90,8 +120,8 @@ class Product:
             'max_stock': self.max_stock,
             'description': self.description,
             'status': self.status,
-            'create_time': self.create_time.strftime('%Y-%m-%d %H:%M:%S') if self.create_time else None,
-            'update_time': self.update_time.strftime('%Y-%m-%d %H:%M:%S') if self.update_time else None
+            'create_time': self.create_time.isoformat(sep=' ', timespec='seconds') if self.create_time else None,
+            'update_time': self.update_time.isoformat(sep=' ', timespec='seconds') if self.update_time else None
         }
     
     def validate(self) -> tuple:
@@ -117,3 +147,10 @@ class Product:
     def __repr__(self):
         return f"<Product(id={self.id}, product_code='{self.product_code}', product_name='{self.product_name}')>"
 
+
+# 按字段生成的专用from_dict构造函数（类定义完成后生成一次；时间字段可接收to_dict输出的ISO格式字符串）
+Product._from_dict = staticmethod(compile_from_dict(Product, {
+    'price': as_decimal,
+    'create_time': as_datetime, 'update_time': as_datetime
+}))
+
@@ -4,14 +4,22 @@
 封装stock_record表的数据结构
 """
 
+import operator
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Sequence
 from decimal import Decimal
+from model.converters import as_datetime, as_decimal, compile_from_dict
 
 
 class StockRecord:
     """入库/出库记录模型类"""
     
+    # 表字段（与__init__参数顺序一致，按位置构造对象时使用）
+    COLUMNS = ('id', 'record_no', 'record_type', 'warehouse_id', 'product_id', 'quantity',
+               'unit_price', 'total_amount', 'supplier_client_id', 'operator', 'record_date', 'remark',
+               'create_time')
+    __slots__ = COLUMNS
+    
     def __init__(self, id: Optional[int] = None, record_no: str = None,
                  record_type: int = None, warehouse_id: int = None,
                  product_id: int = None, quantity: int = None,
@@ -21,7 +29,7 @@ class StockRecord:
                  operator: Optional[str] = None,
                  record_date: Optional[datetime] = None,
                  remark: Optional[str] = None,
-                 create_time: Optional[datetime] = None, **kwargs):
+                 create_time: Optional[datetime] = None):
         """
         初始化出入库记录对象
         
@@ -65,15 +73,37 @@ class StockRecord:
         Returns:
             StockRecord: 出入库记录对象
         """
-        # 处理price和total_amount字段
-        for field in ['unit_price', 'total_amount']:
-            if field in data and data[field] is not None:
-                if isinstance(data[field], str):
-                    data[field] = Decimal(data[field])
-                elif isinstance(data[field], (int, float)):
-                    data[field] = Decimal(str(data[field]))
+        # 逐字段取值的专用构造函数见类定义后的compile_from_dict（处理unit_price和total_amount字段）
+        return cls._from_dict(data)
+    
+    @classmethod
+    def from_row(cls, row: tuple) -> 'StockRecord':
+        """
+        从元组行创建对象（字段顺序与COLUMNS一致）
         
-        return cls(**data)
+        Args:
+            row: 按COLUMNS顺序查询得到的元组
+            
+        Returns:
+            StockRecord: 出入库记录对象
+        """
+        return cls(*row)
+    
+    @classmethod
+    def from_rows(cls, rows: Sequence[tuple], columns: Optional[Sequence[str]] = None) -> List['StockRecord']:
+        """
+        从元组行批量创建对象
+        
+        Args:
+            rows: 元组行列表
+            columns: 行中各列对应的字段名（默认与COLUMNS一致，此时直接按位置构造）
+            
+        Returns:
+            list: 出入库记录对象列表
+        """
+        if columns is None or tuple(columns) == cls.COLUMNS:
+            return [cls(*row) for row in rows]
+        return [cls(**dict(zip(columns, row))) for row in rows]
     
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -93,11 +123,36 @@ class StockRecord:
             'total_amount': float(self.total_amount) if self.total_amount is not None else None,
             'supplier_client_id': self.supplier_client_id,
             'operator': self.operator,
-            'record_date': self.record_date.strftime('%Y-%m-%d %H:%M:%S') if self.record_date else None,
+            'record_date': self.record_date.isoformat(sep=' ', timespec='seconds') if self.record_date else None,
             'remark': self.remark,
-            'create_time': self.create_time.strftime('%Y-%m-%d %H:%M:%S') if self.create_time else None
+            'create_time': self.create_time.isoformat(sep=' ', timespec='seconds') if self.create_time else None
         }
     
+    @classmethod
+    def to_dict_many(cls, records: List['StockRecord']) -> List[Dict[str, Any]]:
+        """
+        批量转换为字典格式（结果与逐条调用to_dict一致，字段读取器只构造一次，适合表格/导出等大批量场景）
+        
+        Args:
+            records: 出入库记录对象列表
+            
+        Returns:
+            list: 字典数据列表
+        """
+        columns = cls.COLUMNS
+        getter = operator.attrgetter(*columns)
+        result = []
+        for record in records:
+            data = dict(zip(columns, getter(record)))
+            if data['unit_price'] is not None:
+                data['unit_price'] = float(data['unit_price'])
+            if data['total_amount'] is not None:
+                data['total_amount'] = float(data['total_amount'])
+            data['record_date'] = data['record_date'].isoformat(sep=' ', timespec='seconds') if data['record_date'] else None
+            data['create_time'] = data['create_time'].isoformat(sep=' ', timespec='seconds') if data['create_time'] else None
+            result.append(data)
+        return result
+    
     def validate(self) -> tuple:
         """
         数据验证方法
@@ -156,7 +211,8 @@ class StockRecord:
             Decimal: 总金额
         """
         if self.quantity and self.unit_price:
-            self.total_amount = Decimal(str(self.quantity)) * self.unit_price
+            # int与Decimal直接相乘结果精确，无需先把数量转换为字符串再构造Decimal
+            self.total_amount = self.quantity * self.unit_price
             return self.total_amount
         return Decimal('0')
     
@@ -164,3 +220,10 @@ class StockRecord:
         type_name = "入库" if self.record_type == 1 else "出库"
         return f"<StockRecord(id={self.id}, record_no='{self.record_no}', type={type_name}, quantity={self.quantity})>"
 
+
+# 按字段生成的专用from_dict构造函数（类定义完成后生成一次；时间字段可接收to_dict输出的ISO格式字符串）
+StockRecord._from_dict = staticmethod(compile_from_dict(StockRecord, {
+    'unit_price': as_decimal, 'total_amount': as_decimal,
+    'record_date': as_datetime, 'create_time': as_datetime
+}))
+
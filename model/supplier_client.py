@@ -5,19 +5,25 @@
 """
 
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Sequence, Union
+from model.converters import as_datetime, compile_from_dict
 
 
 class SupplierClient:
     """供应商/客户信息模型类"""
     
+    # 表字段（与__init__参数顺序一致，按位置构造对象时使用）
+    COLUMNS = ('id', 'code', 'name', 'type', 'contact_person', 'phone', 'email', 'address',
+               'description', 'status', 'create_time', 'update_time')
+    __slots__ = COLUMNS
+    
     def __init__(self, id: Optional[int] = None, code: str = None,
                  name: str = None, type: int = None,
                  contact_person: Optional[str] = None, phone: Optional[str] = None,
                  email: Optional[str] = None, address: Optional[str] = None,
                  description: Optional[str] = None, status: int = 1,
                  create_time: Optional[datetime] = None,
-                 update_time: Optional[datetime] = None, **kwargs):
+                 update_time: Optional[datetime] = None):
         """
         初始化供应商/客户对象
         
@@ -59,7 +65,49 @@ class SupplierClient:
         Returns:
             SupplierClient: 供应商/客户对象
         """
-        return cls(**data)
+        # 逐字段取值的专用构造函数见类定义后的compile_from_dict（忽略联表查询带来的额外列）
+        return cls._from_dict(data)
+    
+    @classmethod
+    def from_row(cls, row: tuple) -> 'SupplierClient':
+        """
+        从元组行创建对象（字段顺序与COLUMNS一致）
+        
+        Args:
+            row: 按COLUMNS顺序查询得到的元组
+            
+        Returns:
+            SupplierClient: 供应商/客户对象
+        """
+        return cls(*row)
+    
+    @classmethod
+    def from_rows(cls, rows: Sequence[tuple], columns: Optional[Sequence[str]] = None) -> List['SupplierClient']:
+        """
+        从元组行批量创建对象
+        
+        Args:
+            rows: 元组行列表
+            columns: 行中各列对应的字段名（默认与COLUMNS一致，此时直接按位置构造）
+            
+        Returns:
+            list: 供应商/客户对象列表
+        """
+        if columns is None or tuple(columns) == cls.COLUMNS:
+            return [cls(*row) for row in rows]
+        return [cls(**dict(zip(columns, row))) for row in rows]
+    
+    def __getitem__(self, key: Union[str, int]) -> Any:
+        """
+        按字段名或COLUMNS中的下标读取字段值（不构造字典，供表格按列取值）
+        
+        Args:
+            key: 字段名，或字段在COLUMNS中的下标
+            
+        Returns:
+            字段值（未做格式化）
+        """
+        return getattr(self, key if isinstance(key, str) else self.COLUMNS[key])
     
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -79,8 +127,8 @@ class SupplierClient:
             'address': self.address,
             'description': self.description,
             'status': self.status,
-            'create_time': self.create_time.strftime('%Y-%m-%d %H:%M:%S') if self.create_time else None,
-            'update_time': self.update_time.strftime('%Y-%m-%d %H:%M:%S') if self.update_time else None
+            'create_time': self.create_time.isoformat(sep=' ', timespec='seconds') if self.create_time else None,
+            'update_time': self.update_time.isoformat(sep=' ', timespec='seconds') if self.update_time else None
         }
     
     def validate(self) -> tuple:
@@ -128,3 +176,7 @@ class SupplierClient:
         type_name = "供应商" if self.type == 1 else "客户"
         return f"<SupplierClient(id={self.id}, code='{self.code}', name='{self.name}', type={type_name})>"
 
+
+# 按字段生成的专用from_dict构造函数（类定义完成后生成一次；时间字段可接收to_dict输出的ISO格式字符串）
+SupplierClient._from_dict = staticmethod(compile_from_dict(SupplierClient, {'create_time': as_datetime, 'update_time': as_datetime}))
+
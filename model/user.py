@@ -4,19 +4,49 @@
 封装user表的数据结构
 """
 
+import base64
 import hashlib
+import hmac
+import os
+import re
+import secrets
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Sequence, Union
+from model.converters import as_datetime, compile_from_dict
+
+# 密码哈希参数：PBKDF2-HMAC-SHA256，迭代次数按单次校验约50ms调整
+PASSWORD_ALGORITHM = 'pbkdf2_sha256'
+PASSWORD_ITERATIONS = 100000
+PASSWORD_SALT_BYTES = 16
+# 旧版本使用的无盐MD5摘要（32位十六进制），登录成功后自动升级为新格式
+_LEGACY_MD5_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+def _b64encode(data: bytes) -> str:
+    """Base64编码（去掉末尾填充，使存储格式不超过password字段长度）"""
+    return base64.b64encode(data).decode('ascii').rstrip('=')
+
+
+def _pbkdf2(password: str, salt: str, iterations: int) -> str:
+    """计算PBKDF2-HMAC-SHA256摘要并编码为字符串"""
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt.encode('ascii'), iterations)
+    return _b64encode(digest)
 
 
 class User:
     """用户模型类"""
     
+    # 表字段（与__init__参数顺序一致，按位置构造对象时使用）
+    COLUMNS = ('id', 'username', 'password', 'real_name', 'role', 'status', 'create_time',
+               'update_time')
+    __slots__ = COLUMNS
+    
     def __init__(self, id: Optional[int] = None, username: str = None,
                  password: str = None, real_name: Optional[str] = None,
                  role: str = 'admin', status: int = 1,
                  create_time: Optional[datetime] = None,
-                 update_time: Optional[datetime] = None, **kwargs):
+                 update_time: Optional[datetime] = None):
         """
         初始化用户对象
         
@@ -50,7 +80,49 @@ class User:
         Returns:
             User: 用户对象
         """
-        return cls(**data)
+        # 逐字段取值的专用构造函数见类定义后的compile_from_dict（忽略联表查询带来的额外列）
+        return cls._from_dict(data)
+    
+    @classmethod
+    def from_row(cls, row: tuple) -> 'User':
+        """
+        从元组行创建对象（字段顺序与COLUMNS一致）
+        
+        Args:
+            row: 按COLUMNS顺序查询得到的元组
+            
+        Returns:
+            User: 用户对象
+        """
+        return cls(*row)
+    
+    @classmethod
+    def from_rows(cls, rows: Sequence[tuple], columns: Optional[Sequence[str]] = None) -> List['User']:
+        """
+        从元组行批量创建对象
+        
+        Args:
+            rows: 元组行列表
+            columns: 行中各列对应的字段名（默认与COLUMNS一致，此时直接按位置构造）
+            
+        Returns:
+            list: 用户对象列表
+        """
+        if columns is None or tuple(columns) == cls.COLUMNS:
+            return [cls(*row) for row in rows]
+        return [cls(**dict(zip(columns, row))) for row in rows]
+    
+    def __getitem__(self, key: Union[str, int]) -> Any:
+        """
+        按字段名或COLUMNS中的下标读取字段值（不构造字典，供表格按列取值）
+        
+        Args:
+            key: 字段名，或字段在COLUMNS中的下标
+            
+        Returns:
+            字段值（未做格式化）
+        """
+        return getattr(self, key if isinstance(key, str) else self.COLUMNS[key])
     
     def to_dict(self, include_password: bool = False) -> Dict[str, Any]:
         """
@@ -68,8 +140,8 @@ class User:
             'real_name': self.real_name,
             'role': self.role,
             'status': self.status,
-            'create_time': self.create_time.strftime('%Y-%m-%d %H:%M:%S') if self.create_time else None,
-            'update_time': self.update_time.strftime('%Y-%m-%d %H:%M:%S') if self.update_time else None
+            'create_time': self.create_time.isoformat(sep=' ', timespec='seconds') if self.create_time else None,
+            'update_time': self.update_time.isoformat(sep=' ', timespec='seconds') if self.update_time else None
         }
         
         if include_password:
@@ -104,7 +176,9 @@ class User:
     @staticmethod
     def encrypt_password(password: str) -> str:
         """
-        加密密码（使用MD5）
+        加密密码（PBKDF2-HMAC-SHA256，每个密码使用随机盐）
+        
+        存储格式为 algorithm$iterations$salt$hash，共约87个字符。
         
         Args:
             password: 明文密码
@@ -112,12 +186,33 @@ class User:
         Returns:
             str: 加密后的密码
         """
-        return hashlib.md5(password.encode('utf-8')).hexdigest()
+        salt = _b64encode(secrets.token_bytes(PASSWORD_SALT_BYTES))
+        hashed = _pbkdf2(password, salt, PASSWORD_ITERATIONS)
+        return f"{PASSWORD_ALGORITHM}${PASSWORD_ITERATIONS}${salt}${hashed}"
+    
+    @staticmethod
+    def encrypt_many(passwords: List[str]) -> List[str]:
+        """
+        批量加密密码（批量导入用户时使用）
+        
+        hashlib.pbkdf2_hmac计算期间释放GIL，多个密码在线程池中并行计算，耗时随CPU核数下降
+        
+        Args:
+            passwords: 明文密码列表
+            
+        Returns:
+            list: 与passwords顺序一致的加密后密码列表
+        """
+        workers = min(len(passwords), os.cpu_count() or 1)
+        if workers <= 1:
+            return [User.encrypt_password(password) for password in passwords]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(User.encrypt_password, passwords))
     
     @staticmethod
     def verify_password(password: str, hashed_password: str) -> bool:
         """
-        验证密码
+        验证密码（常量时间比较；兼容旧版本的MD5摘要）
         
         Args:
             password: 明文密码
@@ -126,7 +221,36 @@ class User:
         Returns:
             bool: 密码是否正确
         """
-        return User.encrypt_password(password) == hashed_password
+        if not password or not hashed_password:
+            return False
+        
+        if _LEGACY_MD5_PATTERN.match(hashed_password):
+            expected = hashlib.md5(password.encode('utf-8')).hexdigest()
+            return hmac.compare_digest(expected, hashed_password)
+        
+        try:
+            algorithm, iterations, salt, hashed = hashed_password.split('$')
+            iterations = int(iterations)
+        except ValueError:
+            return False
+        if algorithm != PASSWORD_ALGORITHM:
+            return False
+        return hmac.compare_digest(_pbkdf2(password, salt, iterations), hashed)
+    
+    @staticmethod
+    def needs_rehash(hashed_password: str) -> bool:
+        """
+        判断已存储的密码是否需要按当前参数重新加密（旧版MD5摘要或迭代次数已调整）
+        
+        Args:
+            hashed_password: 加密后的密码
+            
+        Returns:
+            bool: 是否需要重新加密
+        """
+        if not hashed_password:
+            return False
+        return not hashed_password.startswith(f"{PASSWORD_ALGORITHM}${PASSWORD_ITERATIONS}$")
     
     def is_active(self) -> bool:
         """
@@ -140,3 +264,7 @@ class User:
     def __repr__(self):
         return f"<User(id={self.id}, username='{self.username}', role='{self.role}', status={self.status})>"
 
+
+# 按字段生成的专用from_dict构造函数（类定义完成后生成一次；时间字段可接收to_dict输出的ISO格式字符串）
+User._from_dict = staticmethod(compile_from_dict(User, {'create_time': as_datetime, 'update_time': as_datetime}))
+
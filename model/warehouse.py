@@ -5,19 +5,25 @@
 """
 
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Sequence, Union
 from decimal import Decimal
+from model.converters import as_datetime, as_decimal, compile_from_dict
 
 
 class Warehouse:
     """仓库信息模型类"""
     
+    # 表字段（与__init__参数顺序一致，按位置构造对象时使用）
+    COLUMNS = ('id', 'warehouse_code', 'warehouse_name', 'address', 'manager', 'phone', 'capacity',
+               'description', 'status', 'create_time', 'update_time')
+    __slots__ = COLUMNS
+    
     def __init__(self, id: Optional[int] = None, warehouse_code: str = None,
                  warehouse_name: str = None, address: Optional[str] = None,
                  manager: Optional[str] = None, phone: Optional[str] = None,
                  capacity: Optional[Decimal] = None, description: Optional[str] = None,
                  status: int = 1, create_time: Optional[datetime] = None,
-                 update_time: Optional[datetime] = None, **kwargs):
+                 update_time: Optional[datetime] = None):
         """
         初始化仓库对象
         
@@ -57,14 +63,49 @@ class Warehouse:
         Returns:
             Warehouse: 仓库对象
         """
-        # 处理capacity字段
-        if 'capacity' in data and data['capacity'] is not None:
-            if isinstance(data['capacity'], str):
-                data['capacity'] = Decimal(data['capacity'])
-            elif isinstance(data['capacity'], (int, float)):
-                data['capacity'] = Decimal(str(data['capacity']))
+        # 逐字段取值的专用构造函数见类定义后的compile_from_dict（处理capacity字段）
+        return cls._from_dict(data)
+    
+    @classmethod
+    def from_row(cls, row: tuple) -> 'Warehouse':
+        """
+        从元组行创建对象（字段顺序与COLUMNS一致）
+        
+        Args:
+            row: 按COLUMNS顺序查询得到的元组
+            
+        Returns:
+            Warehouse: 仓库对象
+        """
+        return cls(*row)
+    
+    @classmethod
+    def from_rows(cls, rows: Sequence[tuple], columns: Optional[Sequence[str]] = None) -> List['Warehouse']:
+        """
+        从元组行批量创建对象
         
-        return cls(**data)
+        Args:
+            rows: 元组行列表
+            columns: 行中各列对应的字段名（默认与COLUMNS一致，此时直接按位置构造）
+            
+        Returns:
+            list: 仓库对象列表
+        """
+        if columns is None or tuple(columns) == cls.COLUMNS:
+            return [cls(*row) for row in rows]
+        return [cls(**dict(zip(columns, row))) for row in rows]
+    
+    def __getitem__(self, key: Union[str, int]) -> Any:
+        """
+        按字段名或COLUMNS中的下标读取字段值（不构造字典，供表格按列取值）
+        
+        Args:
+            key: 字段名，或字段在COLUMNS中的下标
+            
+        Returns:
+            字段值（未做格式化）
+        """
+        return getattr(self, key if isinstance(key, str) else self.COLUMNS[key])
     
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -83,8 +124,8 @@ class Warehouse:
             'capacity': float(self.capacity) if self.capacity is not None else None,
             'description': self.description,
             'status': self.status,
-            'create_time': self.create_time.strftime('%Y-%m-%d %H:%M:%S') if self.create_time else None,
-            'update_time': self.update_time.strftime('%Y-%m-%d %H:%M:%S') if self.update_time else None
+            'create_time': self.create_time.isoformat(sep=' ', timespec='seconds') if self.create_time else None,
+            'update_time': self.update_time.isoformat(sep=' ', timespec='seconds') if self.update_time else None
         }
     
     def validate(self) -> tuple:
@@ -113,3 +154,10 @@ class Warehouse:
     def __repr__(self):
         return f"<Warehouse(id={self.id}, warehouse_code='{self.warehouse_code}', warehouse_name='{self.warehouse_name}')>"
 
+
+# 按字段生成的专用from_dict构造函数（类定义完成后生成一次；时间字段可接收to_dict输出的ISO格式字符串）
+Warehouse._from_dict = staticmethod(compile_from_dict(Warehouse, {
+    'capacity': as_decimal,
+    'create_time': as_datetime, 'update_time': as_datetime
+}))
+
@@ -7,7 +7,7 @@
 from typing import List, Optional
 from dao.base_info_dao import BaseInfoDAO
 from model.base_info import BaseInfo
-from utils.validator import Validator
+from utils.validator import VALIDATOR
 from utils.logger import Logger
 
 logger = Logger.get_logger(__name__)
@@ -18,8 +18,8 @@ class BaseInfoService:
     
     def __init__(self):
         """初始化Service"""
-        self.dao = BaseInfoDAO()
-        self.validator = Validator()
+        self.dao = BaseInfoDAO.instance()
+        self.validator = VALIDATOR
     
     def add_base_info(self, base_info: BaseInfo) -> BaseInfo:
         """
@@ -96,10 +96,7 @@ class BaseInfoService:
         Raises:
             Exception: 删除失败时抛出异常
         """
-        # 检查是否被引用
-        if self.dao.check_reference(id):
-            raise Exception("该基础信息已被其他表引用，无法删除")
-        
+        # 引用检查由DAO在删除语句中完成
         result = self.dao.delete(id)
         logger.info(f"删除基础信息成功: ID={id}")
         return result
@@ -8,6 +8,7 @@ from typing import List, Optional, Dict, Any
 from dao.inventory_dao import InventoryDAO
 from dao.product_dao import ProductDAO
 from model.inventory import Inventory
+from model.product import Product
 from utils.logger import Logger
 
 logger = Logger.get_logger(__name__)
@@ -18,8 +19,8 @@ class InventoryService:
     
     def __init__(self):
         """初始化Service"""
-        self.dao = InventoryDAO()
-        self.product_dao = ProductDAO()
+        self.dao = InventoryDAO.instance()
+        self.product_dao = ProductDAO.instance()
     
     def get_inventory(self, warehouse_id: int, product_id: int) -> Optional[Inventory]:
         """
@@ -95,6 +96,20 @@ class InventoryService:
                 'max_stock': product.max_stock if product else 0
             }
         
+        return self.evaluate_stock_warning(inventory, product)
+    
+    @staticmethod
+    def evaluate_stock_warning(inventory: Inventory, product: Optional[Product]) -> Dict[str, Any]:
+        """
+        根据库存数量和货品的库存上下限判断预警（不查询数据库，适合调用方已加载库存和货品时逐行判断）
+        
+        Args:
+            inventory: 库存对象
+            product: 货品对象（不存在时为None，此时不预警）
+            
+        Returns:
+            dict: 预警信息，字段同check_stock_warning
+        """
         current_quantity = inventory.quantity
         min_stock = product.min_stock if product else 0
         max_stock = product.max_stock if product else 0
@@ -124,16 +139,18 @@ class InventoryService:
         Returns:
             list: 预警信息列表，每个元素包含库存信息和预警类型
         """
-        all_inventory = self.dao.get_all()
-        warnings = []
-        
-        for inventory in all_inventory:
-            warning_info = self.check_stock_warning(inventory.warehouse_id, inventory.product_id)
-            if warning_info['has_warning']:
-                warning_info['inventory'] = inventory
-                warnings.append(warning_info)
-        
-        return warnings
+        # 预警条件在数据库端联表筛选，只返回命中的记录
+        return [
+            {
+                'has_warning': True,
+                'warning_type': row['warning_type'],
+                'current_quantity': row['inventory'].quantity,
+                'min_stock': row['product'].min_stock,
+                'max_stock': row['product'].max_stock,
+                'inventory': row['inventory']
+            }
+            for row in self.dao.get_stock_warnings()
+        ]
     
     def get_low_stock(self) -> List[Dict[str, Any]]:
         """
@@ -142,21 +159,16 @@ class InventoryService:
         Returns:
             list: 低库存信息列表
         """
-        all_inventory = self.dao.get_all()
-        low_stocks = []
-        
-        for inventory in all_inventory:
-            product = self.product_dao.get_by_id(inventory.product_id)
-            if product and inventory.quantity < product.min_stock:
-                low_stocks.append({
-                    'inventory': inventory,
-                    'product': product,
-                    'current_quantity': inventory.quantity,
-                    'min_stock': product.min_stock,
-                    'difference': inventory.quantity - product.min_stock
-                })
-        
-        return low_stocks
+        return [
+            {
+                'inventory': row['inventory'],
+                'product': row['product'],
+                'current_quantity': row['inventory'].quantity,
+                'min_stock': row['product'].min_stock,
+                'difference': row['inventory'].quantity - row['product'].min_stock
+            }
+            for row in self.dao.get_low_stock()
+        ]
     
     def get_over_stock(self) -> List[Dict[str, Any]]:
         """
@@ -165,19 +177,14 @@ class InventoryService:
         Returns:
             list: 超库存信息列表
         """
-        all_inventory = self.dao.get_all()
-        over_stocks = []
-        
-        for inventory in all_inventory:
-            product = self.product_dao.get_by_id(inventory.product_id)
-            if product and product.max_stock > 0 and inventory.quantity > product.max_stock:
-                over_stocks.append({
-                    'inventory': inventory,
-                    'product': product,
-                    'current_quantity': inventory.quantity,
-                    'max_stock': product.max_stock,
-                    'difference': inventory.quantity - product.max_stock
-                })
-        
-        return over_stocks
+        return [
+            {
+                'inventory': row['inventory'],
+                'product': row['product'],
+                'current_quantity': row['inventory'].quantity,
+                'max_stock': row['product'].max_stock,
+                'difference': row['inventory'].quantity - row['product'].max_stock
+            }
+            for row in self.dao.get_over_stock()
+        ]
 
@@ -4,26 +4,31 @@
 实现货品的业务逻辑处理
 """
 
+import re
 from typing import List, Optional
 from datetime import datetime
 from decimal import Decimal
 from dao.product_dao import ProductDAO
 from dao.base_info_dao import BaseInfoDAO
 from model.product import Product
-from utils.validator import Validator
+from utils.validator import VALIDATOR
 from utils.logger import Logger
 
 logger = Logger.get_logger(__name__)
 
+# 可能是货品编码的关键词：不含空白和中文等非ASCII字符，长度不超过product_code字段（VARCHAR(50)）；
+# 不符合时（如按中文名称搜索）跳过按编码精确查询
+_CODE_KEYWORD_RE = re.compile(r'[!-~]{1,50}')
+
 
 class ProductService:
     """货品信息Service类"""
     
     def __init__(self):
         """初始化Service"""
-        self.dao = ProductDAO()
-        self.base_info_dao = BaseInfoDAO()
-        self.validator = Validator()
+        self.dao = ProductDAO.instance()
+        self.base_info_dao = BaseInfoDAO.instance()
+        self.validator = VALIDATOR
     
     def add_product(self, product: Product) -> Product:
         """
@@ -59,6 +64,44 @@ class ProductService:
         logger.info(f"添加货品信息成功: ID={product.id}, product_code={product.product_code}")
         return product
     
+    def add_products(self, products: List[Product]) -> int:
+        """
+        批量导入货品（全部校验通过后一个事务插入）
+        
+        Args:
+            products: 货品对象列表（未提供product_code的自动生成连续编码）
+            
+        Returns:
+            int: 导入的货品数（导入成功后回填各对象的id）
+            
+        Raises:
+            ValueError: 任一货品数据验证失败或编码重复时抛出异常（不导入任何货品）
+        """
+        # 未提供编码的货品一次取号得到连续编码
+        missing = [product for product in products if not product.product_code]
+        for product, product_code in zip(missing, self.generate_product_codes(len(missing))):
+            product.product_code = product_code
+        
+        errors = []
+        seen = set()
+        for index, product in enumerate(products, start=1):
+            is_valid, product_errors = self.validate_product(product)
+            if not is_valid:
+                errors.append(f"第{index}行: " + "; ".join(product_errors))
+            elif product.product_code in seen:
+                errors.append(f"第{index}行: 货品编码{product.product_code}重复")
+            seen.add(product.product_code)
+        if errors:
+            raise ValueError("\n".join(errors))
+        
+        existing = self.dao.get_existing_codes([product.product_code for product in products])
+        if existing:
+            raise ValueError(f"货品编码已存在: {', '.join(sorted(existing))}")
+        
+        count = self.dao.insert_many(products)
+        logger.info(f"批量导入货品成功: 货品数={count}")
+        return count
+    
     def update_product(self, product: Product) -> bool:
         """
         更新货品信息
@@ -103,10 +146,7 @@ class ProductService:
         Raises:
             Exception: 删除失败时抛出异常
         """
-        # 检查是否被引用
-        if self.dao.check_reference(id):
-            raise Exception("该货品已被库存表或出入库记录表引用，无法删除")
-        
+        # 引用检查由DAO在删除语句中完成
         result = self.dao.delete(id)
         logger.info(f"删除货品信息成功: ID={id}")
         return result
@@ -145,10 +185,11 @@ class ProductService:
         Returns:
             list: 货品对象列表
         """
-        # 先按编码精确查询
-        product = self.dao.get_by_code(keyword)
-        if product:
-            return [product]
+        # 先按编码精确查询（关键词不可能是编码时省去这次查询）
+        if _CODE_KEYWORD_RE.fullmatch(keyword):
+            product = self.dao.get_by_code(keyword)
+            if product:
+                return [product]
         
         # 再按名称模糊查询
         return self.dao.search_by_name(keyword)
@@ -162,6 +203,15 @@ class ProductService:
         """
         return self.dao.get_all()
     
+    def get_product_summary_list(self) -> List[Product]:
+        """
+        获取所有货品的摘要信息（仅包含ID、编码、名称、状态）
+        
+        Returns:
+            list: 货品对象列表
+        """
+        return self.dao.get_summary_all()
+    
     def generate_product_code(self) -> str:
         """
         生成货品编码（格式：P+日期+序号）
@@ -169,22 +219,28 @@ class ProductService:
         Returns:
             str: 生成的货品编码
         """
+        return self.generate_product_codes(1)[0]
+    
+    def generate_product_codes(self, count: int) -> List[str]:
+        """
+        生成连续的货品编码（格式：P+日期+序号，一次取号预留count个连续序号）
+        
+        Args:
+            count: 需要生成的编码数量
+            
+        Returns:
+            list: 生成的货品编码列表
+        """
+        if count <= 0:
+            return []
+        
         date_str = datetime.now().strftime('%Y%m%d')
         prefix = f'P{date_str}'
         
-        # 查询当天已有的最大序号（使用参数化查询）
-        sql = "SELECT product_code FROM product WHERE product_code LIKE %s ORDER BY product_code DESC LIMIT 1"
-        params = (f'{prefix}%',)
-        result = self.dao.fetch_one(sql, params)
+        # 当天序号由序列表原子自增得到，并发生成不会重复
+        first_num = self.dao.next_sequence(prefix, 'product', 'product_code', count)
         
-        if result:
-            last_code = result['product_code']
-            last_num = int(last_code[-4:])  # 取最后4位作为序号
-            new_num = last_num + 1
-        else:
-            new_num = 1
-        
-        return f"{prefix}{new_num:04d}"
+        return [f"{prefix}{num:04d}" for num in range(first_num, first_num + count)]
     
     def validate_product(self, product: Product) -> tuple:
         """
@@ -208,16 +264,19 @@ class ProductService:
         if not is_valid:
             errors.append(error_msg)
         
-        # 验证category_id和unit_id必须从base_info表中选择
+        # 验证category_id和unit_id必须从base_info表中选择（两者一次查询）
+        base_infos = self.base_info_dao.get_by_ids(
+            id for id in (product.category_id, product.unit_id) if id
+        )
         if product.category_id:
-            category = self.base_info_dao.get_by_id(product.category_id)
+            category = base_infos.get(product.category_id)
             if not category or category.info_type != 'category':
                 errors.append("类别ID无效或不是类别类型")
             elif category.status == 0:
                 errors.append("所选类别已禁用")
         
         if product.unit_id:
-            unit = self.base_info_dao.get_by_id(product.unit_id)
+            unit = base_infos.get(product.unit_id)
             if not unit or unit.info_type != 'unit':
                 errors.append("单位ID无效或不是单位类型")
             elif unit.status == 0:
@@ -4,7 +4,9 @@
 实现各种查询和统计功能
 """
 
-from typing import List, Optional, Dict, Any
+import functools
+import itertools
+from typing import List, Optional, Dict, Any, Iterable, Iterator, Tuple
 from datetime import datetime
 from dao.stock_dao import StockDAO
 from dao.inventory_dao import InventoryDAO
@@ -13,22 +15,53 @@ from dao.warehouse_dao import WarehouseDAO
 from dao.supplier_client_dao import SupplierClientDAO
 from model.stock_record import StockRecord
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment
 from utils.logger import Logger
 
 logger = Logger.get_logger(__name__)
 
+# 按StockRecord.COLUMNS顺序列出字段，配合元组游标和StockRecord.from_row使用
+_STOCK_RECORD_COLUMNS = ', '.join(f'sr.{column}' for column in StockRecord.COLUMNS)
+# 组合查询条件：(条件键, SQL片段, 是否为LIKE条件)，顺序即SQL中的条件顺序
+_CONDITION_FILTERS = (
+    ('warehouse_id', " AND sr.warehouse_id=%s", False),
+    ('product_id', " AND sr.product_id=%s", False),
+    ('supplier_client_id', " AND sr.supplier_client_id=%s", False),
+    ('record_type', " AND sr.record_type=%s", False),
+    ('start_date', " AND sr.record_date >= %s", False),
+    ('end_date', " AND sr.record_date <= %s", False),
+    ('record_no', " AND sr.record_no LIKE CONCAT('%%', %s, '%%')", True),
+    ('operator', " AND sr.operator LIKE CONCAT('%%', %s, '%%')", True),
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _build_condition_sql(flags: Tuple[bool, ...]) -> str:
+    """
+    按启用的查询条件组合生成SQL（每种组合只拼接一次）
+    
+    Args:
+        flags: 与_CONDITION_FILTERS一一对应的条件是否启用
+        
+    Returns:
+        str: 查询SQL
+    """
+    return (f"SELECT {_STOCK_RECORD_COLUMNS} FROM stock_record sr WHERE 1=1"
+            + ''.join(fragment for (_, fragment, _), enabled in zip(_CONDITION_FILTERS, flags) if enabled)
+            + " ORDER BY sr.record_date DESC, sr.id DESC")
+
 
 class QueryService:
     """查询统计Service类"""
     
     def __init__(self):
         """初始化Service"""
-        self.stock_dao = StockDAO()
-        self.inventory_dao = InventoryDAO()
-        self.product_dao = ProductDAO()
-        self.warehouse_dao = WarehouseDAO()
-        self.supplier_client_dao = SupplierClientDAO()
+        self.stock_dao = StockDAO.instance()
+        self.inventory_dao = InventoryDAO.instance()
+        self.product_dao = ProductDAO.instance()
+        self.warehouse_dao = WarehouseDAO.instance()
+        self.supplier_client_dao = SupplierClientDAO.instance()
     
     def query_stock_records(self, conditions: Dict[str, Any]) -> List[StockRecord]:
         """
@@ -48,47 +81,41 @@ class QueryService:
         Returns:
             list: 出入库记录对象列表
         """
-        sql = """
-            SELECT sr.* FROM stock_record sr WHERE 1=1
+        sql, params = self._build_condition_query(conditions)
+        return self.stock_dao.fetch_all(sql, params, StockRecord.from_row)
+    
+    def iter_stock_records(self, conditions: Dict[str, Any]) -> Iterator[StockRecord]:
         """
-        params = []
-        
-        if conditions.get('warehouse_id'):
-            sql += " AND sr.warehouse_id=%s"
-            params.append(conditions['warehouse_id'])
-        
-        if conditions.get('product_id'):
-            sql += " AND sr.product_id=%s"
-            params.append(conditions['product_id'])
+        流式查询出入库记录（服务端游标逐条返回，适合导出等大数据量场景）
         
-        if conditions.get('supplier_client_id'):
-            sql += " AND sr.supplier_client_id=%s"
-            params.append(conditions['supplier_client_id'])
+        注意：遍历结束前会一直占用一个数据库连接
         
-        if conditions.get('record_type'):
-            sql += " AND sr.record_type=%s"
-            params.append(conditions['record_type'])
-        
-        if conditions.get('start_date'):
-            sql += " AND sr.record_date >= %s"
-            params.append(conditions['start_date'])
-        
-        if conditions.get('end_date'):
-            sql += " AND sr.record_date <= %s"
-            params.append(conditions['end_date'])
-        
-        if conditions.get('record_no'):
-            sql += " AND sr.record_no LIKE %s"
-            params.append(f"%{conditions['record_no']}%")
-        
-        if conditions.get('operator'):
-            sql += " AND sr.operator LIKE %s"
-            params.append(f"%{conditions['operator']}%")
-        
-        sql += " ORDER BY sr.record_date DESC, sr.id DESC"
+        Args:
+            conditions: 查询条件字典，同query_stock_records
+            
+        Yields:
+            StockRecord: 出入库记录对象
+        """
+        sql, params = self._build_condition_query(conditions)
+        yield from self.stock_dao.execute_query_iter(sql, params, StockRecord.from_row)
+    
+    def _build_condition_query(self, conditions: Dict[str, Any]) -> Tuple[str, Optional[tuple]]:
+        """
+        按查询条件生成SQL和参数
         
-        results = self.stock_dao.fetch_all(sql, tuple(params) if params else None)
-        return [StockRecord.from_dict(row) for row in results]
+        Args:
+            conditions: 查询条件字典，同query_stock_records
+            
+        Returns:
+            tuple: (SQL语句, 参数元组或None)
+        """
+        values = [conditions.get(key) for key, _, _ in _CONDITION_FILTERS]
+        sql = _build_condition_sql(tuple(bool(value) for value in values))
+        params = tuple(
+            self.stock_dao.escape_like(value) if is_like else value
+            for (_, _, is_like), value in zip(_CONDITION_FILTERS, values) if value
+        )
+        return sql, params or None
     
     def query_stock_records_by_date(self, start_date: datetime, end_date: datetime) -> List[StockRecord]:
         """
@@ -124,6 +151,22 @@ class QueryService:
             conditions['end_date'] = end_date
         return self.query_stock_records(conditions)
     
+    def query_stock_record_details_by_warehouse(self, warehouse_id: int,
+                                                start_date: Optional[datetime] = None,
+                                                end_date: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        按仓库查询出入库记录及其仓库、货品、供应商/客户名称（一次联表查询）
+        
+        Args:
+            warehouse_id: 仓库ID
+            start_date: 开始日期（可选）
+            end_date: 结束日期（可选）
+            
+        Returns:
+            list: 记录信息列表（见StockDAO.get_by_warehouse_joined）
+        """
+        return self.stock_dao.get_by_warehouse_joined(warehouse_id, start_date, end_date)
+    
     def query_stock_records_by_product(self, product_id: int,
                                       start_date: Optional[datetime] = None,
                                       end_date: Optional[datetime] = None) -> List[StockRecord]:
@@ -181,35 +224,14 @@ class QueryService:
                 - low_stock_count: 低库存货品数
                 - over_stock_count: 超库存货品数
         """
-        if warehouse_id:
-            inventories = self.inventory_dao.get_by_warehouse(warehouse_id)
-        else:
-            inventories = self.inventory_dao.get_all()
-        
-        total_quantity = 0
-        total_value = 0
-        product_count = len(set(inv.product_id for inv in inventories))
-        low_stock_count = 0
-        over_stock_count = 0
-        
-        for inventory in inventories:
-            total_quantity += inventory.quantity
-            product = self.product_dao.get_by_id(inventory.product_id)
-            if product and product.price:
-                total_value += float(inventory.quantity * product.price)
-            
-            if product:
-                if inventory.quantity < product.min_stock:
-                    low_stock_count += 1
-                if product.max_stock > 0 and inventory.quantity > product.max_stock:
-                    over_stock_count += 1
+        stats = self.inventory_dao.get_statistics(warehouse_id=warehouse_id)
         
         return {
-            'total_quantity': total_quantity,
-            'total_value': round(total_value, 2),
-            'product_count': product_count,
-            'low_stock_count': low_stock_count,
-            'over_stock_count': over_stock_count
+            'total_quantity': stats['total_quantity'],
+            'total_value': round(float(stats['total_value']), 2),
+            'product_count': stats['product_count'],
+            'low_stock_count': stats['low_stock_count'],
+            'over_stock_count': stats['over_stock_count']
         }
     
     def get_product_statistics(self, product_id: int) -> Dict[str, Any]:
@@ -222,20 +244,32 @@ class QueryService:
         Returns:
             dict: 统计结果
         """
-        inventories = self.inventory_dao.get_by_product(product_id)
+        stats = self.inventory_dao.get_statistics(product_id=product_id)
         product = self.product_dao.get_by_id(product_id)
         
-        total_quantity = sum(inv.quantity for inv in inventories)
-        total_value = 0
-        if product and product.price:
-            total_value = float(total_quantity * product.price)
+        return self._format_product_statistics(product_id, product, stats)
+    
+    def get_all_product_statistics(self) -> List[Dict[str, Any]]:
+        """
+        获取所有货品的统计（一次分组聚合，不再逐个货品查询）
         
+        Returns:
+            list: 统计结果列表，按货品列表顺序，字段同get_product_statistics
+        """
+        grouped = self.inventory_dao.get_statistics_by_product()
+        return [self._format_product_statistics(product.id, product, grouped.get(product.id))
+                for product in self.product_dao.get_summary_all()]
+    
+    @staticmethod
+    def _format_product_statistics(product_id: int, product, stats: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """组装货品统计结果（stats为None表示该货品没有库存）"""
+        stats = stats or {}
         return {
             'product_id': product_id,
             'product_name': product.product_name if product else '',
-            'total_quantity': total_quantity,
-            'total_value': round(total_value, 2),
-            'warehouse_count': len(inventories)
+            'total_quantity': stats.get('total_quantity', 0),
+            'total_value': round(float(stats.get('total_value', 0)), 2),
+            'warehouse_count': stats.get('warehouse_count', 0)
         }
     
     def get_warehouse_statistics(self, warehouse_id: int) -> Dict[str, Any]:
@@ -248,22 +282,33 @@ class QueryService:
         Returns:
             dict: 统计结果
         """
-        inventories = self.inventory_dao.get_by_warehouse(warehouse_id)
+        stats = self.inventory_dao.get_statistics(warehouse_id=warehouse_id)
         warehouse = self.warehouse_dao.get_by_id(warehouse_id)
         
-        total_quantity = sum(inv.quantity for inv in inventories)
-        total_value = 0
-        for inventory in inventories:
-            product = self.product_dao.get_by_id(inventory.product_id)
-            if product and product.price:
-                total_value += float(inventory.quantity * product.price)
+        return self._format_warehouse_statistics(warehouse_id, warehouse, stats)
+    
+    def get_all_warehouse_statistics(self) -> List[Dict[str, Any]]:
+        """
+        获取所有仓库的统计（一次分组聚合，不再逐个仓库查询）
         
+        Returns:
+            list: 统计结果列表，按仓库列表顺序，字段同get_warehouse_statistics
+        """
+        grouped = self.inventory_dao.get_statistics_by_warehouse()
+        return [self._format_warehouse_statistics(warehouse.id, warehouse, grouped.get(warehouse.id))
+                for warehouse in self.warehouse_dao.get_all()]
+    
+    @staticmethod
+    def _format_warehouse_statistics(warehouse_id: int, warehouse,
+                                     stats: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """组装仓库统计结果（stats为None表示该仓库没有库存）"""
+        stats = stats or {}
         return {
             'warehouse_id': warehouse_id,
             'warehouse_name': warehouse.warehouse_name if warehouse else '',
-            'total_quantity': total_quantity,
-            'total_value': round(total_value, 2),
-            'product_count': len(inventories)
+            'total_quantity': stats.get('total_quantity', 0),
+            'total_value': round(float(stats.get('total_value', 0)), 2),
+            'product_count': stats.get('product_count', 0)
         }
     
     def get_supplier_client_statistics(self, supplier_client_id: int,
@@ -280,29 +325,15 @@ class QueryService:
         Returns:
             dict: 统计结果
         """
-        conditions = {'supplier_client_id': supplier_client_id}
-        if start_date:
-            conditions['start_date'] = start_date
-        if end_date:
-            conditions['end_date'] = end_date
-        
-        records = self.query_stock_records(conditions)
+        # 入库/出库的数量和金额由数据库条件聚合得出，不再读取全部记录逐条累加
+        stats = self.stock_dao.get_statistics(supplier_client_id=supplier_client_id,
+                                              start_date=start_date, end_date=end_date)
         supplier_client = self.supplier_client_dao.get_by_id(supplier_client_id)
         
-        in_amount = 0
-        out_amount = 0
-        in_quantity = 0
-        out_quantity = 0
-        
-        for record in records:
-            if record.record_type == 1:  # 入库
-                in_quantity += record.quantity
-                if record.total_amount:
-                    in_amount += float(record.total_amount)
-            else:  # 出库
-                out_quantity += record.quantity
-                if record.total_amount:
-                    out_amount += float(record.total_amount)
+        in_quantity = int(stats['in_stock']['quantity'])
+        out_quantity = int(stats['out_stock']['quantity'])
+        in_amount = stats['in_stock']['amount']
+        out_amount = stats['out_stock']['amount']
         
         return {
             'supplier_client_id': supplier_client_id,
@@ -314,13 +345,13 @@ class QueryService:
             'net_amount': round(in_amount - out_amount, 2)
         }
     
-    def export_to_excel(self, data: List[Dict[str, Any]], file_path: str, 
+    def export_to_excel(self, data: Iterable[Dict[str, Any]], file_path: str, 
                        sheet_name: str = 'Sheet1', headers: Optional[List[str]] = None) -> bool:
         """
-        导出数据到Excel
+        导出数据到Excel（只写模式逐行写入文件，内存占用不随行数增长）
         
         Args:
-            data: 要导出的数据列表（字典列表）
+            data: 要导出的数据（字典列表，或逐条生成字典的迭代器）
             file_path: 文件路径
             sheet_name: Sheet名称
             headers: 表头列表（如果为None，则使用data中第一个字典的键）
@@ -329,29 +360,35 @@ class QueryService:
             bool: 是否导出成功
         """
         try:
-            wb = Workbook()
-            ws = wb.active
-            ws.title = sheet_name
+            rows = iter(data)
             
             # 设置表头
             if headers:
                 header_row = headers
-            elif data:
-                header_row = list(data[0].keys())
             else:
-                return False
+                first = next(rows, None)
+                if first is None:
+                    return False
+                header_row = list(first.keys())
+                rows = itertools.chain((first,), rows)
+            
+            wb = Workbook(write_only=True)
+            ws = wb.create_sheet(sheet_name)
             
             # 写入表头
-            for col, header in enumerate(header_row, 1):
-                cell = ws.cell(row=1, column=col, value=header)
-                cell.font = Font(bold=True)
-                cell.alignment = Alignment(horizontal='center')
+            header_font = Font(bold=True)
+            header_alignment = Alignment(horizontal='center')
+            header_cells = []
+            for header in header_row:
+                cell = WriteOnlyCell(ws, value=header)
+                cell.font = header_font
+                cell.alignment = header_alignment
+                header_cells.append(cell)
+            ws.append(header_cells)
             
             # 写入数据
-            for row_idx, row_data in enumerate(data, 2):
-                for col_idx, header in enumerate(header_row, 1):
-                    value = row_data.get(header, '')
-                    ws.cell(row=row_idx, column=col_idx, value=value)
+            for row_data in rows:
+                ws.append([row_data.get(header, '') for header in header_row])
             
             # 保存文件
             wb.save(file_path)
@@ -360,4 +397,21 @@ class QueryService:
         except Exception as e:
             logger.error(f"导出Excel失败: {str(e)}")
             raise Exception(f"导出Excel失败: {str(e)}")
+    
+    def export_stock_records(self, conditions: Dict[str, Any], file_path: str,
+                             sheet_name: str = '出入库记录') -> bool:
+        """
+        按查询条件导出出入库记录到Excel（边查询边写入，内存占用不随记录数增长）
+        
+        Args:
+            conditions: 查询条件字典，同query_stock_records
+            file_path: 文件路径
+            sheet_name: Sheet名称
+            
+        Returns:
+            bool: 是否导出成功
+        """
+        records = self.iter_stock_records(conditions)
+        return self.export_to_excel((record.to_dict() for record in records), file_path,
+                                    sheet_name=sheet_name, headers=list(StockRecord.COLUMNS))
 
@@ -4,7 +4,8 @@
 实现入库/出库的业务逻辑处理
 """
 
-from typing import List, Optional, Dict, Any
+import functools
+from typing import List, Optional, Dict, Any, Iterable, Tuple
 from datetime import datetime
 from decimal import Decimal
 from dao.stock_dao import StockDAO
@@ -12,22 +13,95 @@ from dao.inventory_dao import InventoryDAO
 from dao.warehouse_dao import WarehouseDAO
 from dao.product_dao import ProductDAO
 from model.stock_record import StockRecord
-from utils.validator import Validator
+from model.warehouse import Warehouse
+from model.product import Product
+from model.supplier_client import SupplierClient
+from utils.validator import VALIDATOR
 from utils.logger import Logger
 
 logger = Logger.get_logger(__name__)
 
+# 入库/出库表单下拉框数据（一次往返查询，见 get_form_options）
+_SQL_FORM_WAREHOUSES = f"SELECT {', '.join(Warehouse.COLUMNS)} FROM warehouse WHERE status=1 ORDER BY id"
+_FORM_PRODUCT_COLUMNS = ('id', 'product_code', 'product_name', 'status')
+_SQL_FORM_PRODUCTS = f"SELECT {', '.join(_FORM_PRODUCT_COLUMNS)} FROM product WHERE status=1 ORDER BY id"
+_SQL_FORM_SUPPLIER_CLIENTS = f"SELECT {', '.join(SupplierClient.COLUMNS)} FROM supplier_client WHERE type=%s ORDER BY id"
+# 出入库记录插入（与库存变更在同一事务中执行，见_save_in_transaction）：
+# 仓库和货品均为启用状态时才插入，状态校验与插入在同一条语句中完成
+_SQL_INSERT_RECORD = """
+    INSERT INTO stock_record (record_no, record_type, warehouse_id, product_id, 
+                            quantity, unit_price, total_amount, supplier_client_id, 
+                            operator, record_date, remark)
+    SELECT %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s FROM DUAL
+    WHERE EXISTS (SELECT 1 FROM warehouse WHERE id=%s AND status=1)
+        AND EXISTS (SELECT 1 FROM product WHERE id=%s AND status=1)
+"""
+# 插入被拒绝时查询原因（状态为NULL表示不存在）
+_SQL_CHECK_REFERENCE_STATUS = """
+    SELECT (SELECT status FROM warehouse WHERE id=%s) AS warehouse_status,
+        (SELECT status FROM product WHERE id=%s) AS product_status
+"""
+# 出入库记录搜索（按StockRecord.COLUMNS顺序列出字段，配合元组游标使用）
+_SQL_SEARCH_STOCK_RECORDS = f"SELECT {', '.join(StockRecord.COLUMNS)} FROM stock_record WHERE 1=1"
+# 搜索条件：(条件键, SQL片段, 是否为LIKE条件)，顺序即SQL中的条件顺序
+_SEARCH_FILTERS = (
+    ('warehouse_id', " AND warehouse_id=%s", False),
+    ('product_id', " AND product_id=%s", False),
+    ('record_type', " AND record_type=%s", False),
+    ('start_date', " AND record_date >= %s", False),
+    ('end_date', " AND record_date <= %s", False),
+    ('record_no', " AND record_no LIKE CONCAT('%%', %s, '%%')", True),
+    ('operator', " AND operator LIKE CONCAT('%%', %s, '%%')", True),
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _build_search_sql(flags: Tuple[bool, ...]) -> str:
+    """
+    按启用的搜索条件组合生成SQL（每种组合只拼接一次）
+    
+    Args:
+        flags: 与_SEARCH_FILTERS一一对应的条件是否启用
+        
+    Returns:
+        str: 搜索SQL
+    """
+    return (_SQL_SEARCH_STOCK_RECORDS
+            + ''.join(fragment for (_, fragment, _), enabled in zip(_SEARCH_FILTERS, flags) if enabled)
+            + " ORDER BY record_date DESC, id DESC")
+
 
 class StockService:
     """入库/出库管理Service类"""
     
     def __init__(self):
         """初始化Service"""
-        self.dao = StockDAO()
-        self.inventory_dao = InventoryDAO()
-        self.warehouse_dao = WarehouseDAO()
-        self.product_dao = ProductDAO()
-        self.validator = Validator()
+        self.dao = StockDAO.instance()
+        self.inventory_dao = InventoryDAO.instance()
+        self.warehouse_dao = WarehouseDAO.instance()
+        self.product_dao = ProductDAO.instance()
+        self.validator = VALIDATOR
+    
+    def get_form_options(self, record_type: int) -> Tuple[List[Warehouse], List[Product], List[SupplierClient]]:
+        """
+        获取入库/出库表单的下拉框数据（启用的仓库、启用的货品摘要、供应商或客户），一次数据库往返
+        
+        Args:
+            record_type: 记录类型（1-入库取供应商，2-出库取客户）
+            
+        Returns:
+            tuple: (仓库列表, 货品列表, 供应商/客户列表)
+        """
+        warehouse_rows, product_rows, supplier_client_rows = self.dao.multi_fetch([
+            (_SQL_FORM_WAREHOUSES, None),
+            (_SQL_FORM_PRODUCTS, None),
+            (_SQL_FORM_SUPPLIER_CLIENTS, (1 if record_type == 1 else 2,))
+        ], as_tuples=True)
+        return (
+            Warehouse.from_rows(warehouse_rows),
+            Product.from_rows(product_rows, _FORM_PRODUCT_COLUMNS),
+            SupplierClient.from_rows(supplier_client_rows)
+        )
     
     def add_in_stock(self, stock_record: StockRecord) -> StockRecord:
         """
@@ -55,65 +129,23 @@ class StockService:
         if not is_valid:
             raise ValueError("; ".join(errors))
         
-        # 验证仓库状态必须为启用
-        warehouse = self.warehouse_dao.get_by_id(stock_record.warehouse_id)
-        if not warehouse:
-            raise Exception("仓库不存在")
-        if warehouse.status != 1:
-            raise Exception("仓库已禁用，无法进行入库操作")
-        
-        # 验证货品状态必须为启用
-        product = self.product_dao.get_by_id(stock_record.product_id)
-        if not product:
-            raise Exception("货品不存在")
-        if product.status != 1:
-            raise Exception("货品已禁用，无法进行入库操作")
-        
         # 自动计算总金额
         stock_record.calculate_total_amount()
         
-        # 使用事务同时插入记录和更新库存
-        connection = None
+        # 使用事务同时插入记录和更新库存（死锁/锁等待超时时整体重试）
+        # 仓库/货品状态在插入语句中判定，不再事先逐项查询
         try:
-            connection = self.dao.db_connection.get_connection()
-            with connection.cursor() as cursor:
-                # 插入出入库记录
-                sql_record = """
-                    INSERT INTO stock_record (record_no, record_type, warehouse_id, product_id, 
-                                            quantity, unit_price, total_amount, supplier_client_id, 
-                                            operator, record_date, remark)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """
-                params_record = (
-                    stock_record.record_no,
-                    stock_record.record_type,
-                    stock_record.warehouse_id,
-                    stock_record.product_id,
-                    stock_record.quantity,
-                    stock_record.unit_price,
-                    stock_record.total_amount,
-                    stock_record.supplier_client_id,
-                    stock_record.operator,
-                    stock_record.record_date,
-                    stock_record.remark
-                )
-                cursor.execute(sql_record, params_record)
-                stock_record.id = cursor.lastrowid
-                
-                # 更新库存
-                self._update_inventory_in_transaction(cursor, stock_record, True)
-                
-                connection.commit()
-                logger.info(f"添加入库记录成功: ID={stock_record.id}, record_no={stock_record.record_no}")
-                return stock_record
+            self.dao.run_in_transaction(
+                lambda cursor: self._save_in_transaction(cursor, stock_record, True))
+            logger.info(f"添加入库记录成功: ID={stock_record.id}, record_no={stock_record.record_no}")
+            return stock_record
         except Exception as e:
-            if connection:
-                connection.rollback()
             logger.error(f"添加入库记录失败: {str(e)}")
             raise
         finally:
-            if connection:
-                self.dao.db_connection.close_connection(connection)
+            # 无论提交还是回滚，都使该库存和出入库统计的缓存失效
+            self.inventory_dao.invalidate(stock_record.warehouse_id, stock_record.product_id)
+            self.dao.invalidate_statistics()
     
     def add_out_stock(self, stock_record: StockRecord) -> StockRecord:
         """
@@ -141,75 +173,173 @@ class StockService:
         if not is_valid:
             raise ValueError("; ".join(errors))
         
-        # 验证仓库状态必须为启用
-        warehouse = self.warehouse_dao.get_by_id(stock_record.warehouse_id)
-        if not warehouse:
-            raise Exception("仓库不存在")
-        if warehouse.status != 1:
-            raise Exception("仓库已禁用，无法进行出库操作")
-        
-        # 验证货品状态必须为启用
-        product = self.product_dao.get_by_id(stock_record.product_id)
-        if not product:
-            raise Exception("货品不存在")
-        if product.status != 1:
-            raise Exception("货品已禁用，无法进行出库操作")
-        
-        # 验证库存数量必须充足
-        if not self.inventory_dao.check_stock(
-            stock_record.warehouse_id, stock_record.product_id, stock_record.quantity
-        ):
-            inventory = self.inventory_dao.get_by_warehouse_product(
-                stock_record.warehouse_id, stock_record.product_id
-            )
-            current_stock = inventory.quantity if inventory else 0
-            raise Exception(f"库存不足，当前库存：{current_stock}，需要：{stock_record.quantity}")
-        
         # 自动计算总金额
         stock_record.calculate_total_amount()
         
-        # 使用事务同时插入记录和更新库存
-        connection = None
+        # 使用事务同时插入记录和更新库存（死锁/锁等待超时时整体重试）
+        # 仓库/货品状态和库存是否充足均在事务的语句中判定，不再事先逐项查询
         try:
-            connection = self.dao.db_connection.get_connection()
-            with connection.cursor() as cursor:
-                # 插入出入库记录
-                sql_record = """
-                    INSERT INTO stock_record (record_no, record_type, warehouse_id, product_id, 
-                                            quantity, unit_price, total_amount, supplier_client_id, 
-                                            operator, record_date, remark)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """
-                params_record = (
-                    stock_record.record_no,
-                    stock_record.record_type,
-                    stock_record.warehouse_id,
-                    stock_record.product_id,
-                    stock_record.quantity,
-                    stock_record.unit_price,
-                    stock_record.total_amount,
-                    stock_record.supplier_client_id,
-                    stock_record.operator,
-                    stock_record.record_date,
-                    stock_record.remark
-                )
-                cursor.execute(sql_record, params_record)
-                stock_record.id = cursor.lastrowid
-                
-                # 更新库存（减少）
-                self._update_inventory_in_transaction(cursor, stock_record, False)
-                
-                connection.commit()
-                logger.info(f"添加出库记录成功: ID={stock_record.id}, record_no={stock_record.record_no}")
-                return stock_record
+            self.dao.run_in_transaction(
+                lambda cursor: self._save_in_transaction(cursor, stock_record, False))
+            logger.info(f"添加出库记录成功: ID={stock_record.id}, record_no={stock_record.record_no}")
+            return stock_record
         except Exception as e:
-            if connection:
-                connection.rollback()
             logger.error(f"添加出库记录失败: {str(e)}")
             raise
         finally:
-            if connection:
-                self.dao.db_connection.close_connection(connection)
+            # 无论提交还是回滚，都使该库存和出入库统计的缓存失效
+            self.inventory_dao.invalidate(stock_record.warehouse_id, stock_record.product_id)
+            self.dao.invalidate_statistics()
+    
+    def add_in_stock_bulk(self, stock_records: List[StockRecord]) -> int:
+        """
+        批量入库（全部校验通过后一个事务完成：记录多行插入，库存按仓库+货品合并后一次累加）
+        
+        Args:
+            stock_records: 入库记录对象列表（未提供单据号的自动生成连续单据号）
+            
+        Returns:
+            int: 导入的记录数（导入成功后回填各对象的id）
+            
+        Raises:
+            ValueError: 任一记录数据验证失败时抛出异常（不导入任何记录）
+            Exception: 仓库或货品不存在、已禁用时抛出异常（不导入任何记录）
+        """
+        if not stock_records:
+            return 0
+        
+        errors = []
+        for index, stock_record in enumerate(stock_records, start=1):
+            stock_record.record_type = 1
+            is_valid, record_errors = self.validate_stock_record(stock_record, require_record_no=False)
+            if not is_valid:
+                errors.append(f"第{index}行: " + "; ".join(record_errors))
+        if errors:
+            raise ValueError("\n".join(errors))
+        
+        # 引用的仓库和货品各一次IN查询，不再逐条get_by_id
+        warehouses = self.warehouse_dao.get_by_ids(r.warehouse_id for r in stock_records)
+        products = self.product_dao.get_by_ids(r.product_id for r in stock_records)
+        for index, stock_record in enumerate(stock_records, start=1):
+            warehouse = warehouses.get(stock_record.warehouse_id)
+            product = products.get(stock_record.product_id)
+            if not warehouse:
+                errors.append(f"第{index}行: 仓库不存在")
+            elif warehouse.status != 1:
+                errors.append(f"第{index}行: 仓库已禁用，无法进行入库操作")
+            if not product:
+                errors.append(f"第{index}行: 货品不存在")
+            elif product.status != 1:
+                errors.append(f"第{index}行: 货品已禁用，无法进行入库操作")
+            stock_record.calculate_total_amount()
+        if errors:
+            raise Exception("\n".join(errors))
+        
+        # 全部校验通过后再取号，被拒绝的批次不消耗单据号；未提供单据号的记录一次取号得到连续单据号
+        missing = [stock_record for stock_record in stock_records if not stock_record.record_no]
+        for stock_record, record_no in zip(missing, self.generate_record_nos(1, len(missing))):
+            stock_record.record_no = record_no
+        
+        # 同一仓库+货品的入库数量合并为一次累加，最后入库日期取最晚的一条
+        changes = {}
+        for stock_record in stock_records:
+            key = (stock_record.warehouse_id, stock_record.product_id)
+            quantity, record_date = changes.get(key, (0, stock_record.record_date))
+            changes[key] = (quantity + stock_record.quantity, max(record_date, stock_record.record_date))
+        inventory_changes = [key + change for key, change in sorted(changes.items())]
+        
+        # 事务中重新加锁确认仓库和货品仍为启用状态，再插入记录并累加库存（死锁/锁等待超时时整体重试）
+        def save(cursor) -> int:
+            self._check_active_in_transaction(warehouses, products)
+            count = self.dao.insert_many(stock_records)
+            self.inventory_dao.apply_in_quantities(cursor, inventory_changes)
+            return count
+        
+        try:
+            count = self.dao.run_in_transaction(save)
+            logger.info(f"批量入库成功: 记录数={count}, 库存变更数={len(inventory_changes)}")
+            return count
+        except Exception as e:
+            logger.error(f"批量入库失败: {str(e)}")
+            raise
+        finally:
+            for warehouse_id, product_id in changes:
+                self.inventory_dao.invalidate(warehouse_id, product_id)
+            self.dao.invalidate_statistics()
+    
+    def _check_active_in_transaction(self, warehouse_ids: Iterable[int], product_ids: Iterable[int]):
+        """
+        在事务中加共享锁确认仓库和货品均为启用状态（锁持有到事务结束，期间不会被禁用）（内部方法）
+        
+        Args:
+            warehouse_ids: 仓库ID集合
+            product_ids: 货品ID集合
+            
+        Raises:
+            Exception: 有仓库或货品已不存在或已禁用时抛出异常
+        """
+        warehouse_ids = set(warehouse_ids)
+        inactive = warehouse_ids - self.warehouse_dao.lock_active_ids(warehouse_ids)
+        if inactive:
+            raise Exception(f"仓库已禁用或不存在，无法进行入库操作: ID={', '.join(map(str, sorted(inactive)))}")
+        product_ids = set(product_ids)
+        inactive = product_ids - self.product_dao.lock_active_ids(product_ids)
+        if inactive:
+            raise Exception(f"货品已禁用或不存在，无法进行入库操作: ID={', '.join(map(str, sorted(inactive)))}")
+    
+    def _save_in_transaction(self, cursor, stock_record: StockRecord, is_in: bool):
+        """
+        在事务中插入出入库记录并更新库存（内部方法）
+        
+        Args:
+            cursor: 数据库游标
+            stock_record: 出入库记录对象
+            is_in: 是否为入库
+        """
+        params_record = (
+            stock_record.record_no,
+            stock_record.record_type,
+            stock_record.warehouse_id,
+            stock_record.product_id,
+            stock_record.quantity,
+            stock_record.unit_price,
+            stock_record.total_amount,
+            stock_record.supplier_client_id,
+            stock_record.operator,
+            stock_record.record_date,
+            stock_record.remark,
+            stock_record.warehouse_id,
+            stock_record.product_id
+        )
+        if not cursor.execute(_SQL_INSERT_RECORD, params_record):
+            self._raise_reference_error(cursor, stock_record, is_in)
+        stock_record.id = cursor.lastrowid
+        
+        # 更新库存（出库扣减带数量条件，库存是否充足在同一事务中判定）
+        self._update_inventory_in_transaction(cursor, stock_record, is_in)
+    
+    def _raise_reference_error(self, cursor, stock_record: StockRecord, is_in: bool):
+        """
+        出入库记录未插入时查询仓库和货品状态并抛出对应异常（内部方法）
+        
+        Args:
+            cursor: 数据库游标
+            stock_record: 出入库记录对象
+            is_in: 是否为入库
+            
+        Raises:
+            Exception: 仓库或货品不存在、已禁用
+        """
+        cursor.execute(_SQL_CHECK_REFERENCE_STATUS, (stock_record.warehouse_id, stock_record.product_id))
+        result = cursor.fetchone()
+        action = "入库" if is_in else "出库"
+        if result['warehouse_status'] is None:
+            raise Exception("仓库不存在")
+        if result['warehouse_status'] != 1:
+            raise Exception(f"仓库已禁用，无法进行{action}操作")
+        if result['product_status'] is None:
+            raise Exception("货品不存在")
+        raise Exception(f"货品已禁用，无法进行{action}操作")
     
     def _update_inventory_in_transaction(self, cursor, stock_record: StockRecord, is_in: bool):
         """
@@ -220,47 +350,10 @@ class StockService:
             stock_record: 出入库记录对象
             is_in: 是否为入库
         """
-        warehouse_id = stock_record.warehouse_id
-        product_id = stock_record.product_id
-        quantity = stock_record.quantity
-        record_date = stock_record.record_date
-        
-        # 查询是否存在库存记录
-        sql_check = "SELECT id, quantity FROM inventory WHERE warehouse_id=%s AND product_id=%s"
-        cursor.execute(sql_check, (warehouse_id, product_id))
-        existing = cursor.fetchone()
-        
-        if existing:
-            # 更新现有记录
-            if is_in:
-                new_quantity = existing['quantity'] + quantity
-                sql_update = """
-                    UPDATE inventory 
-                    SET quantity=%s, last_in_date=%s 
-                    WHERE warehouse_id=%s AND product_id=%s
-                """
-                cursor.execute(sql_update, (new_quantity, record_date, warehouse_id, product_id))
-            else:
-                new_quantity = existing['quantity'] - quantity
-                if new_quantity < 0:
-                    raise Exception(f"库存不足，当前库存：{existing['quantity']}，需要：{quantity}")
-                sql_update = """
-                    UPDATE inventory 
-                    SET quantity=%s, last_out_date=%s 
-                    WHERE warehouse_id=%s AND product_id=%s
-                """
-                cursor.execute(sql_update, (new_quantity, record_date, warehouse_id, product_id))
-        else:
-            # 创建新记录（只允许入库时创建）
-            if not is_in:
-                raise Exception("库存不存在，无法出库")
-            
-            new_quantity = quantity
-            sql_insert = """
-                INSERT INTO inventory (warehouse_id, product_id, quantity, last_in_date)
-                VALUES (%s, %s, %s, %s)
-            """
-            cursor.execute(sql_insert, (warehouse_id, product_id, new_quantity, record_date))
+        quantity_change = stock_record.quantity if is_in else -stock_record.quantity
+        self.inventory_dao.apply_quantity_change(cursor, stock_record.warehouse_id,
+                                                 stock_record.product_id, quantity_change,
+                                                 is_in, stock_record.record_date)
     
     def get_stock_record(self, id: int) -> Optional[StockRecord]:
         """
@@ -286,9 +379,10 @@ class StockService:
         """
         return self.dao.get_by_record_no(record_no)
     
-    def search_stock_records(self, conditions: Dict[str, Any]) -> List[StockRecord]:
+    def search_stock_records(self, conditions: Dict[str, Any], limit: Optional[int] = None,
+                             offset: int = 0) -> List[StockRecord]:
         """
-        根据条件搜索出入库记录
+        根据条件搜索出入库记录（指定limit时只取一页，数据库端分页）
         
         Args:
             conditions: 查询条件字典，可包含：
@@ -299,45 +393,23 @@ class StockService:
                 - end_date: 结束日期
                 - record_no: 单据号（模糊查询）
                 - operator: 操作人（模糊查询）
+            limit: 每页记录数（可选，None表示返回全部）
+            offset: 跳过的记录数（指定limit时有效）
             
         Returns:
             list: 出入库记录对象列表
         """
-        sql = "SELECT * FROM stock_record WHERE 1=1"
-        params = []
-        
-        if conditions.get('warehouse_id'):
-            sql += " AND warehouse_id=%s"
-            params.append(conditions['warehouse_id'])
-        
-        if conditions.get('product_id'):
-            sql += " AND product_id=%s"
-            params.append(conditions['product_id'])
-        
-        if conditions.get('record_type'):
-            sql += " AND record_type=%s"
-            params.append(conditions['record_type'])
-        
-        if conditions.get('start_date'):
-            sql += " AND record_date >= %s"
-            params.append(conditions['start_date'])
-        
-        if conditions.get('end_date'):
-            sql += " AND record_date <= %s"
-            params.append(conditions['end_date'])
-        
-        if conditions.get('record_no'):
-            sql += " AND record_no LIKE %s"
-            params.append(f"%{conditions['record_no']}%")
-        
-        if conditions.get('operator'):
-            sql += " AND operator LIKE %s"
-            params.append(f"%{conditions['operator']}%")
-        
-        sql += " ORDER BY record_date DESC, id DESC"
+        values = [conditions.get(key) for key, _, _ in _SEARCH_FILTERS]
+        sql = _build_search_sql(tuple(bool(value) for value in values))
+        params = tuple(
+            self.dao.escape_like(value) if is_like else value
+            for (_, _, is_like), value in zip(_SEARCH_FILTERS, values) if value
+        )
+        if limit is not None:
+            sql += " LIMIT %s OFFSET %s"
+            params += (limit, offset)
         
-        results = self.dao.fetch_all(sql, tuple(params) if params else None)
-        return [StockRecord.from_dict(row) for row in results]
+        return self.dao.fetch_all(sql, params or None, StockRecord.from_row)
     
     def get_statistics(self, conditions: Dict[str, Any]) -> dict:
         """
@@ -353,7 +425,8 @@ class StockService:
             conditions.get('warehouse_id'),
             conditions.get('product_id'),
             conditions.get('start_date'),
-            conditions.get('end_date')
+            conditions.get('end_date'),
+            supplier_client_id=conditions.get('supplier_client_id')
         )
     
     def generate_record_no(self, record_type: int) -> str:
@@ -366,6 +439,22 @@ class StockService:
         Returns:
             str: 生成的单据号
         """
+        return self.generate_record_nos(record_type, 1)[0]
+    
+    def generate_record_nos(self, record_type: int, count: int) -> List[str]:
+        """
+        批量生成单据号（一次取号得到count个连续序号）
+        
+        Args:
+            record_type: 记录类型（1-入库，2-出库）
+            count: 单据号个数
+            
+        Returns:
+            list: 生成的单据号列表
+        """
+        if count <= 0:
+            return []
+        
         date_str = datetime.now().strftime('%Y%m%d')
         
         if record_type == 1:
@@ -375,19 +464,10 @@ class StockService:
         else:
             prefix = f'SR{date_str}'
         
-        # 查询当天已有的最大序号
-        sql = "SELECT record_no FROM stock_record WHERE record_no LIKE %s ORDER BY record_no DESC LIMIT 1"
-        params = (f'{prefix}%',)
-        result = self.dao.fetch_one(sql, params)
+        # 当天序号由序列表原子自增得到，并发生成不会重复
+        first_num = self.dao.next_sequence(prefix, 'stock_record', 'record_no', count)
         
-        if result:
-            last_code = result['record_no']
-            last_num = int(last_code[-4:])  # 取最后4位作为序号
-            new_num = last_num + 1
-        else:
-            new_num = 1
-        
-        return f"{prefix}{new_num:04d}"
+        return [f"{prefix}{num:04d}" for num in range(first_num, first_num + count)]
     
     def calculate_total_amount(self, quantity: int, unit_price: Optional[Decimal]) -> Decimal:
         """
@@ -401,15 +481,16 @@ class StockService:
             Decimal: 总金额
         """
         if quantity and unit_price:
-            return Decimal(str(quantity)) * unit_price
+            return quantity * unit_price
         return Decimal('0')
     
-    def validate_stock_record(self, stock_record: StockRecord) -> tuple:
+    def validate_stock_record(self, stock_record: StockRecord, require_record_no: bool = True) -> tuple:
         """
         验证出入库记录数据
         
         Args:
             stock_record: 出入库记录对象
+            require_record_no: 是否要求单据号不能为空（批量导入时单据号在验证通过后才生成）
             
         Returns:
             tuple: (是否有效, 错误信息列表)
@@ -417,9 +498,10 @@ class StockService:
         errors = []
         
         # 验证record_no不能为空
-        is_valid, error_msg = self.validator.validate_not_empty(stock_record.record_no, "单据号")
-        if not is_valid:
-            errors.append(error_msg)
+        if require_record_no:
+            is_valid, error_msg = self.validator.validate_not_empty(stock_record.record_no, "单据号")
+            if not is_valid:
+                errors.append(error_msg)
         
         # 验证record_type
         if stock_record.record_type not in [1, 2]:
@@ -8,7 +8,7 @@ from typing import List, Optional
 from datetime import datetime
 from dao.supplier_client_dao import SupplierClientDAO
 from model.supplier_client import SupplierClient
-from utils.validator import Validator
+from utils.validator import VALIDATOR
 from utils.logger import Logger
 
 logger = Logger.get_logger(__name__)
@@ -19,8 +19,8 @@ class SupplierClientService:
     
     def __init__(self):
         """初始化Service"""
-        self.dao = SupplierClientDAO()
-        self.validator = Validator()
+        self.dao = SupplierClientDAO.instance()
+        self.validator = VALIDATOR
     
     def add_supplier_client(self, supplier_client: SupplierClient) -> SupplierClient:
         """
@@ -100,10 +100,7 @@ class SupplierClientService:
         Raises:
             Exception: 删除失败时抛出异常
         """
-        # 检查是否被引用
-        if self.dao.check_reference(id):
-            raise Exception("该供应商/客户已被出入库记录表引用，无法删除")
-        
+        # 引用检查由DAO在删除语句中完成
         result = self.dao.delete(id)
         logger.info(f"删除供应商/客户信息成功: ID={id}")
         return result
@@ -132,12 +129,13 @@ class SupplierClientService:
         """
         return self.dao.get_by_code(code)
     
-    def search_supplier_client(self, keyword: str) -> List[SupplierClient]:
+    def search_supplier_client(self, keyword: str, prefix: bool = False) -> List[SupplierClient]:
         """
         搜索供应商/客户
         
         Args:
             keyword: 搜索关键词
+            prefix: 名称是否只做前缀匹配
             
         Returns:
             list: 供应商/客户对象列表
@@ -148,7 +146,7 @@ class SupplierClientService:
             return [supplier_client]
         
         # 再按名称模糊查询
-        return self.dao.search_by_name(keyword)
+        return self.dao.search_by_name(keyword, prefix)
     
     def get_all_supplier_client(self) -> List[SupplierClient]:
         """
@@ -196,17 +194,8 @@ class SupplierClientService:
         else:
             prefix = f'SC{date_str}'
         
-        # 查询当天已有的最大序号
-        sql = "SELECT code FROM supplier_client WHERE code LIKE %s ORDER BY code DESC LIMIT 1"
-        params = (f'{prefix}%',)
-        result = self.dao.fetch_one(sql, params)
-        
-        if result:
-            last_code = result['code']
-            last_num = int(last_code[-4:])  # 取最后4位作为序号
-            new_num = last_num + 1
-        else:
-            new_num = 1
+        # 当天序号由序列表原子自增得到，并发生成不会重复
+        new_num = self.dao.next_sequence(prefix, 'supplier_client', 'code')
         
         return f"{prefix}{new_num:04d}"
     
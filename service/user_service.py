@@ -7,7 +7,7 @@
 from typing import List, Optional
 from dao.user_dao import UserDAO
 from model.user import User
-from utils.validator import Validator
+from utils.validator import VALIDATOR
 from utils.logger import Logger
 
 logger = Logger.get_logger(__name__)
@@ -18,8 +18,8 @@ class UserService:
     
     def __init__(self):
         """初始化Service"""
-        self.dao = UserDAO()
-        self.validator = Validator()
+        self.dao = UserDAO.instance()
+        self.validator = VALIDATOR
     
     def add_user(self, user: User) -> User:
         """
@@ -68,6 +68,48 @@ class UserService:
         logger.info(f"添加用户成功: ID={user.id}, username={user.username}")
         return user
     
+    def add_users(self, users: List[User]) -> int:
+        """
+        批量导入用户（全部校验通过后并行加密密码，一个事务插入）
+        
+        Args:
+            users: 用户对象列表（password为明文）
+            
+        Returns:
+            int: 导入的用户数（导入成功后回填各对象的id）
+            
+        Raises:
+            ValueError: 任一用户数据验证失败或用户名重复时抛出异常（不导入任何用户）
+        """
+        errors = []
+        seen = set()
+        for index, user in enumerate(users, start=1):
+            is_valid, user_errors = self.validate_user(user)
+            if is_valid:
+                is_valid, error_msg = self.validate_password(user.password)
+                user_errors = [error_msg]
+            if not is_valid:
+                errors.append(f"第{index}行: " + "; ".join(user_errors))
+            elif user.username in seen:
+                errors.append(f"第{index}行: 用户名{user.username}重复")
+            seen.add(user.username)
+        if errors:
+            raise ValueError("\n".join(errors))
+        
+        existing = self.dao.get_existing_usernames([user.username for user in users])
+        if existing:
+            raise ValueError(f"用户名已存在: {', '.join(sorted(existing))}")
+        
+        # 密码加密存储
+        for user, password in zip(users, User.encrypt_many([user.password for user in users])):
+            user.password = password
+            if not user.role:
+                user.role = 'admin'
+        
+        count = self.dao.insert_many(users)
+        logger.info(f"批量导入用户成功: 用户数={count}")
+        return count
+    
     def update_user(self, user: User) -> bool:
         """
         更新用户信息（不能修改密码）
@@ -117,15 +159,11 @@ class UserService:
         Raises:
             Exception: 删除失败时抛出异常
         """
-        # 检查是否为默认管理员
-        user = self.dao.get_by_id(id)
-        if user and user.username == 'admin':
-            raise Exception("默认管理员不能删除")
-        
         # 检查不能删除自己
         if current_user_id and id == current_user_id:
             raise Exception("不能删除自己")
         
+        # 默认管理员检查由DAO在删除语句中完成
         result = self.dao.delete(id)
         logger.info(f"删除用户成功: ID={id}")
         return result
@@ -199,13 +237,13 @@ class UserService:
             ValueError: 验证失败时抛出异常
             Exception: 业务规则检查失败时抛出异常
         """
-        # 获取用户信息
-        user = self.dao.get_by_id(user_id)
-        if not user:
+        # 获取用户密码（查询用户信息时不包含密码列）
+        password = self.dao.get_password(user_id)
+        if password is None:
             raise Exception("用户不存在")
         
         # 验证旧密码
-        if not User.verify_password(old_password, user.password):
+        if not User.verify_password(old_password, password):
             raise ValueError("旧密码不正确")
         
         # 验证新密码长度
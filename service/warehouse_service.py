@@ -8,7 +8,7 @@ from typing import List, Optional
 from datetime import datetime
 from dao.warehouse_dao import WarehouseDAO
 from model.warehouse import Warehouse
-from utils.validator import Validator
+from utils.validator import VALIDATOR
 from utils.logger import Logger
 
 logger = Logger.get_logger(__name__)
@@ -19,8 +19,8 @@ class WarehouseService:
     
     def __init__(self):
         """初始化Service"""
-        self.dao = WarehouseDAO()
-        self.validator = Validator()
+        self.dao = WarehouseDAO.instance()
+        self.validator = VALIDATOR
     
     def add_warehouse(self, warehouse: Warehouse) -> Warehouse:
         """
@@ -100,10 +100,7 @@ class WarehouseService:
         Raises:
             Exception: 删除失败时抛出异常
         """
-        # 检查是否被引用
-        if self.dao.check_reference(id):
-            raise Exception("该仓库已被库存表或出入库记录表引用，无法删除")
-        
+        # 引用检查由DAO在删除语句中完成
         result = self.dao.delete(id)
         logger.info(f"删除仓库信息成功: ID={id}")
         return result
@@ -132,12 +129,13 @@ class WarehouseService:
         """
         return self.dao.get_by_code(warehouse_code)
     
-    def search_warehouse(self, keyword: str) -> List[Warehouse]:
+    def search_warehouse(self, keyword: str, prefix: bool = False) -> List[Warehouse]:
         """
         搜索仓库（按编码或名称）
         
         Args:
             keyword: 搜索关键词
+            prefix: 名称是否只做前缀匹配
             
         Returns:
             list: 仓库对象列表
@@ -148,7 +146,7 @@ class WarehouseService:
             return [warehouse]
         
         # 再按名称模糊查询
-        return self.dao.search_by_name(keyword)
+        return self.dao.search_by_name(keyword, prefix)
     
     def get_all_warehouse(self) -> List[Warehouse]:
         """
@@ -178,17 +176,8 @@ class WarehouseService:
         date_str = datetime.now().strftime('%Y%m%d')
         prefix = f'WH{date_str}'
         
-        # 查询当天已有的最大序号
-        sql = "SELECT warehouse_code FROM warehouse WHERE warehouse_code LIKE %s ORDER BY warehouse_code DESC LIMIT 1"
-        params = (f'{prefix}%',)
-        result = self.dao.fetch_one(sql, params)
-        
-        if result:
-            last_code = result['warehouse_code']
-            last_num = int(last_code[-4:])  # 取最后4位作为序号
-            new_num = last_num + 1
-        else:
-            new_num = 1
+        # 当天序号由序列表原子自增得到，并发生成不会重复
+        new_num = self.dao.next_sequence(prefix, 'warehouse', 'warehouse_code')
         
         return f"{prefix}{new_num:04d}"
     
@@ -31,7 +31,7 @@ INSERT INTO base_info (info_type, info_name, info_code, description, status) VAL
 
 -- ============================================
 -- 2. 插入默认管理员用户
--- 密码：admin123 (使用MD5加密后的值)
+-- 密码：admin123 (使用MD5加密后的值，首次登录成功后自动升级为PBKDF2-SHA256)
 -- MD5('admin123') = 0192023a7bbd73250516f069df18b500
 -- ============================================
 INSERT INTO user (username, password, real_name, role, status) VALUES
@@ -58,6 +58,6 @@ INSERT INTO supplier_client (code, name, type, contact_person, phone, email, add
 -- 注意：密码加密说明
 -- 默认管理员密码：admin123
 -- MD5加密后的值：0192023a7bbd73250516f069df18b500
--- 如需修改密码，请使用MD5或其他加密算法对密码进行加密后更新
+-- 如需修改密码，请在系统中修改（以PBKDF2-SHA256加盐存储）；直接写入MD5值也可登录，登录后自动升级
 -- ============================================
 
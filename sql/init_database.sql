@@ -32,7 +32,7 @@ CREATE TABLE base_info (
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='基础信息表';
 
 -- 创建索引
-CREATE INDEX idx_info_type ON base_info(info_type);
+CREATE INDEX idx_info_type_status ON base_info(info_type, status);
 
 -- ============================================
 -- 2. 货品信息表（product）
@@ -58,6 +58,8 @@ CREATE TABLE product (
 -- 创建索引
 CREATE INDEX idx_category_id ON product(category_id);
 CREATE INDEX idx_unit_id ON product(unit_id);
+-- 货品名称全文索引（ngram解析器支持中文子串搜索，需MySQL 5.7.6+）
+CREATE FULLTEXT INDEX ft_product_name ON product(product_name) WITH PARSER ngram;
 
 -- ============================================
 -- 3. 仓库信息表（warehouse）
@@ -76,6 +78,9 @@ CREATE TABLE warehouse (
     update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间'
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='仓库信息表';
 
+-- 创建索引
+CREATE INDEX idx_warehouse_name ON warehouse(warehouse_name);
+
 -- ============================================
 -- 4. 供应商/客户信息表（supplier_client）
 -- ============================================
@@ -96,6 +101,7 @@ CREATE TABLE supplier_client (
 
 -- 创建索引
 CREATE INDEX idx_type ON supplier_client(type);
+CREATE INDEX idx_name ON supplier_client(name);
 
 -- ============================================
 -- 5. 入库/出库记录表（stock_record）
@@ -120,9 +126,12 @@ CREATE TABLE stock_record (
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='入库/出库记录表';
 
 -- 创建索引
-CREATE INDEX idx_warehouse_id ON stock_record(warehouse_id);
-CREATE INDEX idx_product_id ON stock_record(product_id);
-CREATE INDEX idx_record_type ON stock_record(record_type);
+-- 按仓库/货品/供应商客户+日期查询并按日期倒序排序时直接使用索引顺序（同时满足外键和引用检查）
+-- InnoDB二级索引末尾隐含主键id，组合索引即 (条件列, record_date, id)，ORDER BY record_date DESC, id DESC 无需filesort
+CREATE INDEX idx_warehouse_date ON stock_record(warehouse_id, record_date);
+CREATE INDEX idx_product_date ON stock_record(product_id, record_date);
+CREATE INDEX idx_supplier_client_date ON stock_record(supplier_client_id, record_date);
+CREATE INDEX idx_type_date ON stock_record(record_type, record_date);
 CREATE INDEX idx_record_date ON stock_record(record_date);
 
 -- ============================================
@@ -135,6 +144,7 @@ CREATE TABLE inventory (
     quantity INT DEFAULT 0 COMMENT '库存数量',
     last_in_date DATETIME COMMENT '最后入库日期',
     last_out_date DATETIME COMMENT '最后出库日期',
+    version INT NOT NULL DEFAULT 0 COMMENT '版本号（每次变更库存数量时递增）',
     update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
     UNIQUE KEY uk_warehouse_product (warehouse_id, product_id),
     FOREIGN KEY (warehouse_id) REFERENCES warehouse(id) ON UPDATE CASCADE,
@@ -159,6 +169,14 @@ CREATE TABLE user (
     update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间'
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='用户表';
 
+-- ============================================
+-- 8. 编号序列表（code_sequence）
+-- ============================================
+CREATE TABLE code_sequence (
+    prefix VARCHAR(20) PRIMARY KEY COMMENT '编号前缀（如RK20240101）',
+    next_val INT NOT NULL COMMENT '该前缀最近分配的序号'
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='编号序列表（单据号、仓库编码、供应商/客户编码按前缀原子自增）';
+
 -- ============================================
 -- 脚本执行完成
 -- ============================================
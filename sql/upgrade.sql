@@ -0,0 +1,66 @@
+-- ============================================
+-- 仓库货品管理系统 - 数据库升级脚本
+-- 数据库：warehouse_manage
+-- 说明：用于已按旧版 init_database.sql 建库的数据库，按顺序执行
+--       每条语句只需执行一次（重复执行会报字段/索引已存在）
+-- ============================================
+
+USE warehouse_manage;
+
+-- --------------------------------------------
+-- 库存表（inventory）增加版本号字段
+-- --------------------------------------------
+ALTER TABLE inventory
+    ADD COLUMN version INT NOT NULL DEFAULT 0 COMMENT '版本号（每次变更库存数量时递增）' AFTER last_out_date;
+
+-- --------------------------------------------
+-- 货品信息表（product）增加名称全文索引（需MySQL 5.7.6+）
+-- 未执行时货品名称搜索自动使用LIKE查询
+-- --------------------------------------------
+CREATE FULLTEXT INDEX ft_product_name ON product(product_name) WITH PARSER ngram;
+
+-- --------------------------------------------
+-- 基础信息表（base_info）按类型+状态查询的组合索引，替换原单列索引
+-- --------------------------------------------
+CREATE INDEX idx_info_type_status ON base_info(info_type, status);
+DROP INDEX idx_info_type ON base_info;
+
+-- --------------------------------------------
+-- 出入库记录表（stock_record）显式建立供应商/客户ID索引（删除供应商/客户时的引用检查使用）
+-- --------------------------------------------
+CREATE INDEX idx_supplier_client_id ON stock_record(supplier_client_id);
+
+-- --------------------------------------------
+-- 出入库记录表（stock_record）按仓库/货品+日期的组合索引，替换原单列索引
+-- --------------------------------------------
+CREATE INDEX idx_warehouse_date ON stock_record(warehouse_id, record_date);
+DROP INDEX idx_warehouse_id ON stock_record;
+CREATE INDEX idx_product_date ON stock_record(product_id, record_date);
+DROP INDEX idx_product_id ON stock_record;
+
+-- --------------------------------------------
+-- 仓库信息表、供应商/客户信息表增加名称索引（名称前缀搜索使用）
+-- --------------------------------------------
+CREATE INDEX idx_warehouse_name ON warehouse(warehouse_name);
+CREATE INDEX idx_name ON supplier_client(name);
+
+-- --------------------------------------------
+-- 出入库记录表（stock_record）按类型+日期的组合索引，替换原单列索引（按类型分页查询使用）
+-- --------------------------------------------
+CREATE INDEX idx_type_date ON stock_record(record_type, record_date);
+DROP INDEX idx_record_type ON stock_record;
+
+-- --------------------------------------------
+-- 出入库记录表（stock_record）按供应商/客户+日期的组合索引，替换原单列索引（往来统计和按供应商/客户查询使用）
+-- --------------------------------------------
+CREATE INDEX idx_supplier_client_date ON stock_record(supplier_client_id, record_date);
+DROP INDEX idx_supplier_client_id ON stock_record;
+
+-- --------------------------------------------
+-- 新增编号序列表（code_sequence），单据号、仓库编码、供应商/客户编码按前缀原子自增
+-- 已有编号无需迁移：各前缀首次取号时从已有编号的最大序号接续
+-- --------------------------------------------
+CREATE TABLE code_sequence (
+    prefix VARCHAR(20) PRIMARY KEY COMMENT '编号前缀（如RK20240101）',
+    next_val INT NOT NULL COMMENT '该前缀最近分配的序号'
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='编号序列表（单据号、仓库编码、供应商/客户编码按前缀原子自增）';
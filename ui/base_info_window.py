@@ -163,7 +163,7 @@ class BaseInfoWindow(QWidget):
                     row,
                     6,
                     QTableWidgetItem(
-                        item.create_time.strftime("%Y-%m-%d %H:%M:%S")
+                        item.create_time.isoformat(sep=" ", timespec="seconds")
                         if item.create_time
                         else ""
                     ),
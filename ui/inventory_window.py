@@ -154,7 +154,8 @@ class InventoryWindow(QWidget):
                     if keyword not in code and keyword not in name:
                         continue
 
-                warning_info = self.inventory_service.check_stock_warning(inv.warehouse_id, inv.product_id)
+                # 库存和货品均已加载，直接判断预警，不再逐行查询数据库
+                warning_info = self.inventory_service.evaluate_stock_warning(inv, product)
                 warning_type = warning_info["warning_type"]
                 # 预警筛选
                 if warning_filter == "low" and warning_type != "low":
@@ -194,14 +195,14 @@ class InventoryWindow(QWidget):
                     row,
                     8,
                     QTableWidgetItem(
-                        inv.last_in_date.strftime("%Y-%m-%d %H:%M:%S") if inv.last_in_date else ""
+                        inv.last_in_date.isoformat(sep=" ", timespec="seconds") if inv.last_in_date else ""
                     ),
                 )
                 self.table.setItem(
                     row,
                     9,
                     QTableWidgetItem(
-                        inv.last_out_date.strftime("%Y-%m-%d %H:%M:%S") if inv.last_out_date else ""
+                        inv.last_out_date.isoformat(sep=" ", timespec="seconds") if inv.last_out_date else ""
                     ),
                 )
 
@@ -154,7 +154,7 @@ class ProductWindow(QWidget):
                     row,
                     10,
                     QTableWidgetItem(
-                        p.create_time.strftime("%Y-%m-%d %H:%M:%S") if p.create_time else ""
+                        p.create_time.isoformat(sep=" ", timespec="seconds") if p.create_time else ""
                     ),
                 )
         except Exception as e:
@@ -167,7 +167,7 @@ class RecordQueryWindow(QWidget):
             # 货品
             self.combo_product.clear()
             self.combo_product.addItem("全部", None)
-            products: List[Product] = self.product_service.get_all_product()
+            products: List[Product] = self.product_service.get_product_summary_list()
             for p in products:
                 self.combo_product.addItem(f"{p.product_code}-{p.product_name}", p.id)
 
@@ -222,7 +222,7 @@ class RecordQueryWindow(QWidget):
             records: List[StockRecord] = self.query_service.query_stock_records(cond)
 
             warehouses = {w.id: w for w in self.warehouse_service.get_all_warehouse()}
-            products = {p.id: p for p in self.product_service.get_all_product()}
+            products = {p.id: p for p in self.product_service.get_product_summary_list()}
             sc_map = {s.id: s for s in self.supplier_service.get_all_supplier_client()}
 
             self.table.setRowCount(len(records))
@@ -263,7 +263,7 @@ class RecordQueryWindow(QWidget):
                     row,
                     10,
                     QTableWidgetItem(
-                        r.record_date.strftime("%Y-%m-%d %H:%M:%S") if r.record_date else ""
+                        r.record_date.isoformat(sep=" ", timespec="seconds") if r.record_date else ""
                     ),
                 )
                 self.table.setItem(row, 11, QTableWidgetItem(r.remark or ""))
@@ -304,6 +304,10 @@ class RecordQueryWindow(QWidget):
         self.label_net_qty.setText("净入库数量: 0")
         self.label_net_amt.setText("净入库金额: 0.00")
 
+    def _cell_text(self, row: int, column: int) -> str:
+        item = self.table.item(row, column)
+        return item.text() if item else ""
+
     def _on_export(self):
         try:
             from PySide6.QtWidgets import QFileDialog
@@ -336,13 +340,11 @@ class RecordQueryWindow(QWidget):
                 "操作日期",
                 "备注",
             ]
-            data = []
-            for r in range(row_count):
-                row_dict: Dict[str, Any] = {}
-                for c, header in enumerate(headers):
-                    item = self.table.item(r, c)
-                    row_dict[header] = item.text() if item else ""
-                data.append(row_dict)
+            # 逐行生成导出数据，由export_to_excel边读取边写入
+            data = (
+                {header: self._cell_text(r, c) for c, header in enumerate(headers)}
+                for r in range(row_count)
+            )
 
             self.query_service.export_to_excel(
                 data,
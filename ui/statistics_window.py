@@ -96,7 +96,7 @@ class StatisticsWindow(QWidget):
             # 货品列表
             self.combo_product.clear()
             self.combo_product.addItem("全部", None)
-            products: List[Product] = self.product_service.get_all_product()
+            products: List[Product] = self.product_service.get_product_summary_list()
             for p in products:
                 self.combo_product.addItem(f"{p.product_code}-{p.product_name}", p.id)
         except Exception as e:
@@ -123,16 +123,15 @@ class StatisticsWindow(QWidget):
             ])
 
             wh_id = self.combo_warehouse.currentData()
-            warehouses: List[Warehouse]
             if wh_id:
                 w = self.warehouse_service.get_warehouse(wh_id)
-                warehouses = [w] if w else []
+                stats_list = [self.query_service.get_warehouse_statistics(w.id)] if w else []
             else:
-                warehouses = self.warehouse_service.get_all_warehouse()
+                # 全部仓库：一次分组统计，不再逐个仓库查询
+                stats_list = self.query_service.get_all_warehouse_statistics()
 
-            self.table.setRowCount(len(warehouses))
-            for row, w in enumerate(warehouses):
-                stats = self.query_service.get_warehouse_statistics(w.id)
+            self.table.setRowCount(len(stats_list))
+            for row, stats in enumerate(stats_list):
                 self.table.setItem(row, 0, QTableWidgetItem(stats.get("warehouse_name", "")))
                 self.table.setItem(row, 1, QTableWidgetItem(str(stats.get("total_quantity", 0))))
                 self.table.setItem(
@@ -157,16 +156,15 @@ class StatisticsWindow(QWidget):
             ])
 
             prod_id = self.combo_product.currentData()
-            products: List[Product]
             if prod_id:
                 p = self.product_service.get_product(prod_id)
-                products = [p] if p else []
+                stats_list = [self.query_service.get_product_statistics(p.id)] if p else []
             else:
-                products = self.product_service.get_all_product()
+                # 全部货品：一次分组统计，不再逐个货品查询
+                stats_list = self.query_service.get_all_product_statistics()
 
-            self.table.setRowCount(len(products))
-            for row, p in enumerate(products):
-                stats = self.query_service.get_product_statistics(p.id)
+            self.table.setRowCount(len(stats_list))
+            for row, stats in enumerate(stats_list):
                 self.table.setItem(row, 0, QTableWidgetItem(stats.get("product_name", "")))
                 self.table.setItem(row, 1, QTableWidgetItem(str(stats.get("total_quantity", 0))))
                 self.table.setItem(
@@ -202,11 +200,14 @@ class StatisticsWindow(QWidget):
                 "备注",
             ])
 
+            # 仓库名称一次取全量映射，避免逐行按ID查询
+            warehouses = {w.id: w for w in self.warehouse_service.get_all_warehouse()}
+
             self.table.setRowCount(len(rows))
             for row, (wtype, info) in enumerate(rows):
                 inv = info["inventory"]
                 product = info["product"]
-                wh = self.warehouse_service.get_warehouse(inv.warehouse_id)
+                wh = warehouses.get(inv.warehouse_id)
                 self.table.setItem(row, 0, QTableWidgetItem(wtype))
                 self.table.setItem(row, 1, QTableWidgetItem(wh.warehouse_name if wh else ""))
                 self.table.setItem(row, 2, QTableWidgetItem(product.product_name if product else ""))
@@ -6,7 +6,7 @@
 
 from datetime import datetime, date
 from decimal import Decimal
-from typing import List, Optional
+from typing import Optional
 
 from PySide6.QtCore import Qt, QDate
 from PySide6.QtWidgets import (
@@ -18,11 +18,7 @@ from PySide6.QtWidgets import (
 from service.stock_service import StockService
 from service.warehouse_service import WarehouseService
 from service.product_service import ProductService
-from service.supplier_client_service import SupplierClientService
 from model.stock_record import StockRecord
-from model.warehouse import Warehouse
-from model.product import Product
-from model.supplier_client import SupplierClient
 from utils.logger import Logger
 
 
@@ -37,7 +33,6 @@ class StockInWindow(QWidget):
         self.stock_service = StockService()
         self.warehouse_service = WarehouseService()
         self.product_service = ProductService()
-        self.supplier_service = SupplierClientService()
         self._init_ui()
         self._load_basic_data()
         self._reset_form()
@@ -158,21 +153,21 @@ class StockInWindow(QWidget):
     # ------------- 数据加载 -------------
     def _load_basic_data(self):
         try:
+            # 启用的仓库、货品和供应商一次查询取回
+            warehouses, products, suppliers = self.stock_service.get_form_options(1)
+
             # 仓库（启用的）
-            warehouses: List[Warehouse] = self.warehouse_service.get_active_warehouses()
             self.combo_warehouse.clear()
             for w in warehouses:
                 self.combo_warehouse.addItem(w.warehouse_name, w.id)
 
             # 货品（启用的）
-            products: List[Product] = self.product_service.get_all_product()
             self.combo_product.clear()
             for p in products:
                 if p.status == 1:
                     self.combo_product.addItem(f"{p.product_code}-{p.product_name}", p.id)
 
             # 供应商
-            suppliers: List[SupplierClient] = self.supplier_service.get_suppliers()
             self.combo_supplier.clear()
             self.combo_supplier.addItem("(可选)", None)
             for s in suppliers:
@@ -193,7 +188,7 @@ class StockInWindow(QWidget):
 
             # 预取名称
             warehouses = {w.id: w for w in self.warehouse_service.get_all_warehouse()}
-            products = {p.id: p for p in self.product_service.get_all_product()}
+            products = {p.id: p for p in self.product_service.get_product_summary_list()}
 
             self.table.setRowCount(len(records))
             for row, r in enumerate(records):
@@ -206,7 +201,7 @@ class StockInWindow(QWidget):
                 self.table.setItem(
                     row,
                     6,
-                    QTableWidgetItem(r.record_date.strftime("%Y-%m-%d %H:%M:%S") if r.record_date else ""),
+                    QTableWidgetItem(r.record_date.isoformat(sep=" ", timespec="seconds") if r.record_date else ""),
                 )
         except Exception as e:
             logger.error(f"加载今日入库记录失败: {e}")
@@ -6,7 +6,7 @@
 
 from datetime import datetime, date
 from decimal import Decimal
-from typing import List, Optional
+from typing import Optional
 
 from PySide6.QtCore import Qt, QDate
 from PySide6.QtWidgets import (
@@ -18,12 +18,8 @@ from PySide6.QtWidgets import (
 from service.stock_service import StockService
 from service.warehouse_service import WarehouseService
 from service.product_service import ProductService
-from service.supplier_client_service import SupplierClientService
 from service.inventory_service import InventoryService
 from model.stock_record import StockRecord
-from model.warehouse import Warehouse
-from model.product import Product
-from model.supplier_client import SupplierClient
 from utils.logger import Logger
 
 
@@ -38,7 +34,6 @@ class StockOutWindow(QWidget):
         self.stock_service = StockService()
         self.warehouse_service = WarehouseService()
         self.product_service = ProductService()
-        self.supplier_service = SupplierClientService()
         self.inventory_service = InventoryService()
         self._init_ui()
         self._load_basic_data()
@@ -160,18 +155,18 @@ class StockOutWindow(QWidget):
     # ----------- 数据加载 -----------
     def _load_basic_data(self):
         try:
-            warehouses: List[Warehouse] = self.warehouse_service.get_active_warehouses()
+            # 启用的仓库、货品和客户一次查询取回
+            warehouses, products, clients = self.stock_service.get_form_options(2)
+
             self.combo_warehouse.clear()
             for w in warehouses:
                 self.combo_warehouse.addItem(w.warehouse_name, w.id)
 
-            products: List[Product] = self.product_service.get_all_product()
             self.combo_product.clear()
             for p in products:
                 if p.status == 1:
                     self.combo_product.addItem(f"{p.product_code}-{p.product_name}", p.id)
 
-            clients: List[SupplierClient] = self.supplier_service.get_clients()
             self.combo_client.clear()
             self.combo_client.addItem("(可选)", None)
             for c in clients:
@@ -190,7 +185,7 @@ class StockOutWindow(QWidget):
             records = qs.query_stock_records({"record_type": 2, "start_date": start, "end_date": end})
 
             warehouses = {w.id: w for w in self.warehouse_service.get_all_warehouse()}
-            products = {p.id: p for p in self.product_service.get_all_product()}
+            products = {p.id: p for p in self.product_service.get_product_summary_list()}
 
             self.table.setRowCount(len(records))
             for row, r in enumerate(records):
@@ -203,7 +198,7 @@ class StockOutWindow(QWidget):
                 self.table.setItem(
                     row,
                     6,
-                    QTableWidgetItem(r.record_date.strftime("%Y-%m-%d %H:%M:%S") if r.record_date else ""),
+                    QTableWidgetItem(r.record_date.isoformat(sep=" ", timespec="seconds") if r.record_date else ""),
                 )
         except Exception as e:
             logger.error(f"加载今日出库记录失败: {e}")
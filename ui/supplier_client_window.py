@@ -150,7 +150,7 @@ class SupplierClientWindow(QWidget):
                     row,
                     9,
                     QTableWidgetItem(
-                        r.create_time.strftime("%Y-%m-%d %H:%M:%S") if r.create_time else ""
+                        r.create_time.isoformat(sep=" ", timespec="seconds") if r.create_time else ""
                     ),
                 )
         except Exception as e:
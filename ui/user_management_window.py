@@ -118,12 +118,12 @@ class UserManagementWindow(QWidget):
                 self.table.setItem(
                     row,
                     5,
-                    QTableWidgetItem(u.create_time.strftime("%Y-%m-%d %H:%M:%S") if u.create_time else ""),
+                    QTableWidgetItem(u.create_time.isoformat(sep=" ", timespec="seconds") if u.create_time else ""),
                 )
                 self.table.setItem(
                     row,
                     6,
-                    QTableWidgetItem(u.update_time.strftime("%Y-%m-%d %H:%M:%S") if u.update_time else ""),
+                    QTableWidgetItem(u.update_time.isoformat(sep=" ", timespec="seconds") if u.update_time else ""),
                 )
         except Exception as e:
             logger.error(f"加载用户数据失败: {e}")
@@ -121,7 +121,7 @@ class WarehouseWindow(QWidget):
                     row,
                     8,
                     QTableWidgetItem(
-                        w.create_time.strftime("%Y-%m-%d %H:%M:%S") if w.create_time else ""
+                        w.create_time.isoformat(sep=" ", timespec="seconds") if w.create_time else ""
                     ),
                 )
         except Exception as e:
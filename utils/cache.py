@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+缓存工具类
+提供线程安全的进程内TTL+LRU缓存，以及用于DAO查询方法的缓存装饰器
+"""
+
+import copy
+import functools
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class TTLCache:
+    """带过期时间的LRU缓存（线程安全）"""
+    
+    _MISSING = object()
+    
+    def __init__(self, maxsize: int = 512, ttl: float = 60):
+        """
+        初始化缓存
+        
+        Args:
+            maxsize: 最大缓存条目数，超出时淘汰最久未使用的条目
+            ttl: 缓存有效期（秒）
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        获取缓存值
+        
+        Args:
+            key: 缓存键
+            default: 未命中或已过期时返回的默认值
+            
+        Returns:
+            缓存值或默认值
+        """
+        with self._lock:
+            item = self._data.get(key, self._MISSING)
+            if item is self._MISSING:
+                return default
+            expire_at, value = item
+            if expire_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+    
+    def set(self, key: Hashable, value: Any):
+        """
+        写入缓存值
+        
+        Args:
+            key: 缓存键
+            value: 缓存值
+        """
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def pop(self, key: Hashable):
+        """
+        删除缓存条目
+        
+        Args:
+            key: 缓存键
+        """
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+    
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
+def cached(ttl: float = 60, maxsize: int = 256) -> Callable:
+    """
+    DAO查询方法的TTL缓存装饰器
+    
+    以调用参数（不含self）为键，同一方法的所有实例共享一份缓存；结果为None时同样缓存。
+    命中时返回结果的浅拷贝（列表则逐个拷贝元素），调用方修改返回的对象不会影响缓存。
+    被装饰的方法提供cache_clear()，写操作后调用以清空缓存：
+    
+        @cached(ttl=60)
+        def get_all(self): ...
+        
+        self.get_all.cache_clear()
+    
+    Args:
+        ttl: 缓存有效期（秒）
+        maxsize: 最大缓存条目数
+        
+    Returns:
+        Callable: 装饰器
+    """
+    def decorator(func: Callable) -> Callable:
+        cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items()))) if kwargs else args
+            value = cache.get(key, TTLCache._MISSING)
+            if value is TTLCache._MISSING:
+                value = func(self, *args, **kwargs)
+                cache.set(key, value)
+            if isinstance(value, list):
+                return [copy.copy(item) for item in value]
+            return copy.copy(value)
+        
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    
+    return decorator
+
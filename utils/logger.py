@@ -6,6 +6,7 @@
 
 import logging
 import os
+import threading
 from logging.handlers import RotatingFileHandler
 from datetime import datetime
 
@@ -15,6 +16,10 @@ class Logger:
     
     _loggers = {}
     _log_dir = 'logs'
+    _lock = threading.Lock()
+    # 所有日志记录器共用的格式和控制台处理器（首次获取日志记录器时创建）
+    _formatter = None
+    _console_handler = None
     
     @classmethod
     def _ensure_log_dir(cls):
@@ -22,6 +27,25 @@ class Logger:
         if not os.path.exists(cls._log_dir):
             os.makedirs(cls._log_dir)
     
+    @classmethod
+    def _init_shared(cls):
+        """创建共用的日志格式和控制台处理器（只执行一次）"""
+        if cls._formatter is not None:
+            return
+        
+        cls._ensure_log_dir()
+        
+        # 日志格式
+        cls._formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
+        
+        # 控制台处理器
+        cls._console_handler = logging.StreamHandler()
+        cls._console_handler.setLevel(logging.INFO)
+        cls._console_handler.setFormatter(cls._formatter)
+    
     @classmethod
     def get_logger(cls, name='warehouse_system'):
         """
@@ -33,45 +57,39 @@ class Logger:
         Returns:
             logging.Logger: 日志记录器对象
         """
-        if name in cls._loggers:
-            return cls._loggers[name]
-        
-        cls._ensure_log_dir()
-        
-        # 创建日志记录器
-        logger = logging.getLogger(name)
-        logger.setLevel(logging.DEBUG)
-        
-        # 避免重复添加处理器
-        if logger.handlers:
+        logger = cls._loggers.get(name)
+        if logger is not None:
             return logger
         
-        # 日志格式
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        
-        # 文件处理器（按日期分割）
-        log_file = os.path.join(cls._log_dir, f'{name}_{datetime.now().strftime("%Y%m%d")}.log')
-        file_handler = RotatingFileHandler(
-            log_file,
-            maxBytes=10 * 1024 * 1024,  # 10MB
-            backupCount=5,
-            encoding='utf-8'
-        )
-        file_handler.setLevel(logging.DEBUG)
-        file_handler.setFormatter(formatter)
-        
-        # 控制台处理器
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        console_handler.setFormatter(formatter)
-        
-        # 添加处理器
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
-        
-        cls._loggers[name] = logger
-        return logger
+        with cls._lock:
+            if name in cls._loggers:
+                return cls._loggers[name]
+            
+            cls._init_shared()
+            
+            # 创建日志记录器
+            logger = logging.getLogger(name)
+            logger.setLevel(logging.DEBUG)
+            
+            # 避免重复添加处理器
+            if not logger.handlers:
+                # 文件处理器（按日期分割；delay=True使日志文件在首次写入时才打开，
+                # 导入时只获取日志记录器而从不写日志的模块不再占用文件句柄）
+                log_file = os.path.join(cls._log_dir, f'{name}_{datetime.now().strftime("%Y%m%d")}.log')
+                file_handler = RotatingFileHandler(
+                    log_file,
+                    maxBytes=10 * 1024 * 1024,  # 10MB
+                    backupCount=5,
+                    encoding='utf-8',
+                    delay=True
+                )
+                file_handler.setLevel(logging.DEBUG)
+                file_handler.setFormatter(cls._formatter)
+                
+                # 添加处理器
+                logger.addHandler(file_handler)
+                logger.addHandler(cls._console_handler)
+            
+            cls._loggers[name] = logger
+            return logger
 
@@ -185,3 +185,7 @@ class Validator:
         
         return len(errors) == 0, errors
 
+
+# 共享的验证器实例（验证方法均为静态方法，无实例状态）
+VALIDATOR = Validator()
+